@@ -1,12 +1,16 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 import uvicorn
 from config import PORT, logger
-from middleware import setup_cors
+from middleware import setup_cors, setup_metrics, setup_server_timing, setup_profiling
 from routes.schedule_routes import router as schedule_router
 from controllers.route_controller import router as route_router
 from routes.constraint_routes import router as constraint_router
+from routes.job_routes import router as job_router
+from routes.admin_routes import router as admin_router
 from utils import get_supabase_client
+from services.gurobi_env_pool import get_env_pool
+from services.metrics import external_call, render_metrics
 
 app = FastAPI(
     title="Scheduler API",
@@ -14,22 +18,42 @@ app = FastAPI(
     version="1.3.0"
 )
 
-# Set up CORS middleware
+# Set up CORS, request metrics, Server-Timing and profiling middleware
 setup_cors(app)
+setup_metrics(app)
+setup_server_timing(app)
+setup_profiling(app)
 
 # Include routers
 app.include_router(schedule_router)
 app.include_router(route_router)
 app.include_router(constraint_router)  # AI constraint parsing
+app.include_router(job_router)  # Async optimization jobs
+app.include_router(admin_router)  # Profiles and other admin diagnostics
+
+@app.on_event("startup")
+def start_gurobi_env_pool():
+    """Start this worker's Gurobi environments before the first request arrives."""
+    get_env_pool().start()
+
+@app.on_event("shutdown")
+def close_gurobi_env_pool():
+    get_env_pool().close()
 
 @app.get("/")
 def home():
     return {
         "status": "Scheduler API active",
         "version": "1.3.0",
-        "features": ["gurobi_optimization", "ai_constraints", "route_optimization"]
+        "features": ["gurobi_optimization", "ai_constraints", "route_optimization", "async_jobs"]
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics of all workers (request latency, solver phases, model sizes, external calls)."""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
 @app.get("/health")
 def health_check():
     """Health check endpoint that verifies database connectivity"""
@@ -37,12 +61,14 @@ def health_check():
         # Test Supabase connection
         supabase = get_supabase_client()
         # Simple query to test connection
-        result = supabase.table("employees").select("id").limit(1).execute()
+        with external_call("supabase", "health_check"):
+            result = supabase.table("employees").select("id").limit(1).execute()
         
         return {
             "status": "healthy",
             "database": "connected",
-            "version": "1.2.1"
+            "version": "1.2.1",
+            "gurobi_env_pool": get_env_pool().stats()
         }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -0,0 +1 @@
+"""Benchmark suite for the schedule optimizer (see benchmarks/run.py)."""
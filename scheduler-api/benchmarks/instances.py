@@ -0,0 +1,179 @@
+"""
+Synthetic scheduling instances for the benchmark suite.
+
+Instances look like real departments: a mix of full- and part-time work percentages,
+experience levels 1-5, employee preferences (preferred / excluded shifts and days, weekly
+limits, hard and medium blocked slots) and AI constraints (vacations, soft wishes and a few
+hard_required shifts). Staffing and experience requirements are derived from the workforce
+so every size stays within reach of a feasible schedule. The same spec and seed always
+produce the same instance.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+from models import EmployeePreference, HardBlockedSlot, MediumBlockedSlot
+
+SHIFT_TYPES = ["day", "evening", "night"]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# (value, weight) mixes drawn per employee
+WORK_PERCENTAGE_MIX = [(100, 50), (80, 20), (75, 10), (50, 15), (25, 5)]
+EXPERIENCE_MIX = [(1, 20), (2, 30), (3, 25), (4, 15), (5, 10)]
+
+# First day of every instance (a Monday)
+START_DATE = datetime(2025, 3, 3)
+
+# Share of the workforce's daily shift capacity that the minimum staffing asks for
+STAFFING_LOAD = 0.6
+
+# Benchmark suites: (employees, days) per case
+SUITES = {
+    "smoke": [(10, 7), (25, 14)],
+    "standard": [(10, 7), (50, 14), (100, 31), (250, 31)],
+    "full": [(10, 7), (25, 14), (50, 14), (100, 31), (250, 31), (500, 31), (1000, 31)],
+}
+
+
+@dataclass
+class InstanceSpec:
+    """Size and generator settings of one benchmark instance."""
+    employees: int
+    days: int
+    seed: int = 0
+    preference_share: float = 0.4  # Employees with individual preferences
+    ai_share: float = 0.1          # Employees with AI constraints
+    optimize_for_cost: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"e{self.employees}_d{self.days}_s{self.seed}" + ("_cost" if self.optimize_for_cost else "")
+
+
+def _weighted(rng: random.Random, mix: List[tuple]):
+    values, weights = zip(*mix)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _blocked_slots(rng: random.Random, dates: List[str], slot_type, max_slots: int = 3) -> List:
+    """Up to max_slots distinct dates, each blocking the whole day or one shift type."""
+    slots = []
+    for date in rng.sample(dates, min(rng.randint(0, max_slots), len(dates))):
+        shift_types = ["all_day"] if rng.random() < 0.4 else [rng.choice(SHIFT_TYPES)]
+        slots.append(slot_type(date=date, shift_types=shift_types))
+    return slots or None
+
+
+def _preference(rng: random.Random, employee_id: str, dates: List[str]) -> EmployeePreference:
+    """Random mix of the preference features planners use."""
+    fields: Dict[str, Any] = {"employee_id": employee_id}
+    if rng.random() < 0.5:
+        fields["preferred_shifts"] = rng.sample(SHIFT_TYPES, rng.randint(1, 2))
+        fields["preferred_shifts_strict"] = rng.random() < 0.1
+    if rng.random() < 0.15:
+        fields["excluded_shifts"] = ["night"]
+    if rng.random() < 0.3:
+        dropped = set(rng.sample(WEEKDAYS, rng.randint(1, 2)))
+        fields["available_days"] = [day for day in WEEKDAYS if day not in dropped]
+        fields["available_days_strict"] = rng.random() < 0.3
+    elif rng.random() < 0.1:
+        fields["excluded_days"] = [rng.choice(WEEKDAYS)]
+    if rng.random() < 0.2:
+        fields["max_shifts_per_week"] = rng.choice([3, 4])
+    fields["hard_blocked_slots"] = _blocked_slots(rng, dates, HardBlockedSlot)
+    fields["medium_blocked_slots"] = _blocked_slots(rng, dates, MediumBlockedSlot)
+    return EmployeePreference(**fields)
+
+
+def _ai_constraints(rng: random.Random, employee: Dict[str, Any], dates: List[str], allow_required: bool) -> List[Dict]:
+    """Vacation (hard_unavailable), a soft wish and, for some full-timers, one hard_required shift."""
+    constraints = []
+    if len(dates) > 2 and rng.random() < 0.6:
+        start = rng.randrange(len(dates) - 2)
+        constraints.append({
+            "employee_id": employee["id"],
+            "dates": dates[start:start + rng.randint(2, 5)],
+            "shifts": [],
+            "constraint_type": "hard_unavailable",
+            "priority": 1000,
+            "original_text": f"{employee['first_name']} är ledig",
+        })
+    if rng.random() < 0.6:
+        constraints.append({
+            "employee_id": employee["id"],
+            "dates": rng.sample(dates, min(rng.randint(1, 3), len(dates))),
+            "shifts": [rng.choice(["dag", "kväll", "natt"])],
+            "constraint_type": "soft_preference",
+            "priority": rng.choice([100, 500]),
+            "original_text": f"{employee['first_name']} vill helst inte jobba",
+        })
+    if allow_required and employee["work_percentage"] >= 80 and rng.random() < 0.3:
+        busy = {date for constraint in constraints if constraint["constraint_type"] == "hard_unavailable" for date in constraint["dates"]}
+        free = [date for date in dates if date not in busy]
+        if free:
+            constraints.append({
+                "employee_id": employee["id"],
+                "dates": [rng.choice(free)],
+                "shifts": ["dag"],
+                "constraint_type": "hard_required",
+                "priority": 1000,
+                "original_text": f"{employee['first_name']} måste jobba dag",
+            })
+    return constraints
+
+
+def generate_instance(spec: InstanceSpec) -> Dict[str, Any]:
+    """
+    Build one benchmark instance.
+
+    Args:
+        spec: Size, seed and generator shares
+
+    Returns:
+        Keyword arguments for GurobiScheduleOptimizer.optimize_schedule (employees, dates,
+        staffing requirements, employee_preferences, ai_constraints, random_seed)
+    """
+    rng = random.Random(f"{spec.seed}-{spec.employees}-{spec.days}")
+    end_date = START_DATE + timedelta(days=spec.days - 1)
+    dates = [(START_DATE + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(spec.days)]
+
+    employees = [
+        {
+            "id": f"bench-{i:04d}",
+            "first_name": f"Employee{i}",
+            "last_name": "Benchmark",
+            "work_percentage": _weighted(rng, WORK_PERCENTAGE_MIX),
+            "experience_level": _weighted(rng, EXPERIENCE_MIX),
+            "hourly_rate": rng.randint(180, 320),
+            "department": "Benchmark",
+            "role": rng.choice(["Sjuksköterska", "Undersköterska", "Läkare"]),
+        }
+        for i in range(spec.employees)
+    ]
+
+    preferences, ai_constraints = [], []
+    for employee in employees:
+        has_preference = rng.random() < spec.preference_share
+        if has_preference:
+            preferences.append(_preference(rng, employee["id"], dates))
+        if rng.random() < spec.ai_share:
+            ai_constraints.extend(_ai_constraints(rng, employee, dates, allow_required=not has_preference))
+
+    # Minimum staff: STAFFING_LOAD of the shifts the workforce can cover per day, over 3 shift types
+    daily_capacity = sum(emp["work_percentage"] for emp in employees) / 100.0 * 5 / 7
+    min_staff = max(1, int(STAFFING_LOAD * daily_capacity / len(SHIFT_TYPES)))
+    return {
+        "employees": employees,
+        "start_date": START_DATE,
+        "end_date": end_date,
+        "min_staff_per_shift": min_staff,
+        "max_staff_per_shift": min_staff + max(1, min_staff // 2),
+        "min_experience_per_shift": max(1, int(min_staff * 1.5)),
+        "include_weekends": True,
+        "optimize_for_cost": spec.optimize_for_cost,
+        "employee_preferences": preferences,
+        "ai_constraints": ai_constraints,
+        "random_seed": spec.seed,
+    }
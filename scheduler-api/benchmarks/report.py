@@ -0,0 +1,102 @@
+"""
+Benchmark report helpers: phase categories and regression checks against a baseline.
+
+A report is a JSON document with one entry per (instance, optimizer) case. Each case keeps
+the raw SolveLog phase records and a per-category summary (milliseconds):
+
+    input_processing  - preference compilation and feasibility screens
+    variable_creation - decision variables of the Gurobi model
+    constraints       - constraints, preference blocks and AI bounds
+    objective         - objective terms and helper variables
+    model_build       - solver-neutral model (open-source backends build it in one go)
+    optimize          - solver / heuristic runs, including relaxation attempts
+    extraction        - assignment tensor, statistics and shift list
+    diagnosis         - IIS computation (diagnose_infeasibility only)
+    other             - everything outside a phase (setup, checks, warm start)
+"""
+
+import statistics
+from typing import List, Dict, Any, Optional
+
+CATEGORIES = (
+    "input_processing", "variable_creation", "constraints", "objective", "model_build",
+    "optimize", "extraction", "diagnosis", "other",
+)
+
+# Sub-phase counters (SolveLog.step) and the category they belong to
+STEP_CATEGORIES = {
+    "variables_ms": "variable_creation",
+    "constraints_ms": "constraints",
+    "objective_ms": "objective",
+    "model_ms": "model_build",
+}
+
+# Category of the time a phase spends outside its steps
+PHASE_CATEGORIES = {
+    "compile_preferences": "input_processing",
+    "feasibility_screen": "input_processing",
+    "feasibility_screen_relaxed": "input_processing",
+    "build_model": "other",
+    "solve": "optimize",
+    "heuristic": "optimize",
+    "heuristic_start": "optimize",
+    "extract_solution": "extraction",
+    "diagnose_infeasibility": "diagnosis",
+}
+
+
+def categorize_phases(phases: List[Dict[str, Any]], wall_ms: float) -> Dict[str, float]:
+    """Milliseconds per category for one run's SolveLog phase records."""
+    totals = dict.fromkeys(CATEGORIES, 0.0)
+    phase_ms = 0.0
+    for record in phases:
+        phase_ms += record["ms"]
+        remainder = record["ms"]
+        for counter, category in STEP_CATEGORIES.items():
+            if counter in record:
+                totals[category] += record[counter]
+                remainder -= record[counter]
+        name = record["phase"]
+        category = "optimize" if name.startswith("relaxation_") else PHASE_CATEGORIES.get(name, "other")
+        totals[category] += max(remainder, 0.0)
+    totals["other"] += max(wall_ms - phase_ms, 0.0)
+    return {category: round(ms, 1) for category, ms in totals.items()}
+
+
+def median_summary(runs: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Median wall time and per-category time over repeated runs of a case."""
+    summary = {"wall_ms": round(statistics.median(run["wall_ms"] for run in runs), 1)}
+    for category in CATEGORIES:
+        summary[category] = round(statistics.median(run["phases"][category] for run in runs), 1)
+    return summary
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+                    min_delta_ms: float = 50.0, objective_tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+    """
+    Regressions of a report against a baseline report.
+
+    A timing regresses when it is more than tolerance (relative) and min_delta_ms (absolute)
+    slower than the baseline; an objective regresses when it is lower (the model maximizes)
+    by more than objective_tolerance relative. Cases missing from either report are skipped.
+
+    Returns:
+        One {"case", "metric", "baseline", "current"} entry per regression
+    """
+    baseline_cases = {(case["name"], case["optimizer_requested"]): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in current.get("cases", []):
+        before = baseline_cases.get((case["name"], case["optimizer_requested"]))
+        if before is None or case.get("error") or before.get("error"):
+            continue
+        label = f"{case['name']} [{case['optimizer_requested']}]"
+        for metric, value in case["summary"].items():
+            old = before["summary"].get(metric)
+            if old is not None and value > old * (1 + tolerance) and value - old > min_delta_ms:
+                regressions.append({"case": label, "metric": metric, "baseline": old, "current": value})
+        old_objective: Optional[float] = before.get("objective")
+        objective = case.get("objective")
+        if old_objective is not None and objective is not None:
+            if objective < old_objective - objective_tolerance * max(abs(old_objective), 1.0):
+                regressions.append({"case": label, "metric": "objective", "baseline": old_objective, "current": objective})
+    return regressions
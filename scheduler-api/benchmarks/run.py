@@ -0,0 +1,252 @@
+"""
+Run the scheduling benchmark suite and write a JSON report.
+
+Usage (from scheduler-api/):
+    python -m benchmarks.run --suite standard
+    python -m benchmarks.run --sizes 100x31,500x31 --optimizer gurobi --optimizer highs
+    python -m benchmarks.run --suite smoke --baseline benchmarks/results/baseline.json
+
+Every run executes in a fresh process (peak RSS is per run and Gurobi state does not
+leak between cases), drives GurobiScheduleOptimizer directly on a generated instance and
+records its SolveLog phases, model size and memory. With --baseline the exit code is 1
+when a timing or objective regressed (see benchmarks.report.compare_reports).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Benchmarks run offline: config only needs placeholder Supabase credentials, nothing connects
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from benchmarks.instances import SUITES, InstanceSpec, generate_instance
+from benchmarks.report import categorize_phases, median_summary, compare_reports
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_case(spec: InstanceSpec, optimizer: str, deadline_ms: Optional[int], use_matrix_api: bool,
+             trace_memory: bool, verbose: bool) -> Dict[str, Any]:
+    """
+    Solve one instance once (in the current process) and measure it.
+
+    Returns:
+        Run record: wall time, raw phases, categorized phases, model size, memory and outcome
+    """
+    import logging
+    from fastapi import HTTPException
+    from config import logger
+    from services.gurobi_env_pool import get_env_pool
+    from services.gurobi_optimizer_service import GurobiScheduleOptimizer
+    from services.solve_budget import SolveBudget
+
+    if not verbose:
+        logger.setLevel(logging.WARNING)
+    # Environments are started at worker boot in production, not per request
+    get_env_pool().start()
+
+    instance = generate_instance(spec)
+    rss_before = _peak_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+
+    schedule_optimizer = GurobiScheduleOptimizer()
+    record: Dict[str, Any] = {"error": None}
+    started = time.perf_counter()
+    try:
+        result = schedule_optimizer.optimize_schedule(
+            **instance,
+            optimizer=optimizer,
+            use_matrix_api=use_matrix_api,
+            solve_budget=SolveBudget(deadline_ms=deadline_ms),
+        )
+        record.update({
+            "optimizer": result.get("optimizer"),
+            "status": result.get("optimization_status") or ("optimal" if result.get("objective_value") is not None else "unknown"),
+            "objective": result.get("objective_value"),
+            "shifts": len(result["schedule"]),
+            "coverage_percentage": result["statistics"]["coverage"]["coverage_percentage"],
+            "relaxed": result.get("relaxed_constraints") is not None,
+            "message": result.get("message"),
+        })
+    except HTTPException as e:
+        record.update({"status": "failed", "error": f"{e.status_code}: {e.detail}"[:500]})
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    if trace_memory:
+        record["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    phases = schedule_optimizer.solve_log.phases
+    sized = [phase for phase in phases if "vars" in phase]
+    record.update({
+        "wall_ms": round(wall_ms, 1),
+        "phases": categorize_phases(phases, wall_ms),
+        "phase_log": phases,
+        "model": {key: sized[0][key] for key in ("vars", "constrs", "nonzeros") if key in sized[0]} if sized else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": rss_before,
+    })
+    return record
+
+
+def _run_isolated(queue, *args):
+    """Child process entry: run one case and send its record (or the exception) back."""
+    try:
+        queue.put(run_case(*args))
+    except Exception as e:
+        queue.put({"status": "crashed", "error": f"{type(e).__name__}: {str(e)}"[:500]})
+
+
+def run_isolated(*args, timeout: float = 3600) -> Dict[str, Any]:
+    """run_case in a fresh spawned process, so memory peaks and solver state are per run."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_isolated, args=(queue, *args))
+    process.start()
+    try:
+        return queue.get(timeout=timeout)
+    except Exception:
+        return {"status": "crashed", "error": f"no result within {timeout:.0f}s (exit code {process.exitcode})"}
+    finally:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+
+
+def parse_sizes(value: str) -> List[tuple]:
+    """"100x31,500x14" → [(100, 31), (500, 14)]."""
+    sizes = []
+    for item in value.split(","):
+        employees, days = item.lower().split("x")
+        sizes.append((int(employees), int(days)))
+    return sizes
+
+
+def environment_info() -> Dict[str, Any]:
+    """Code version, interpreter, solver versions and machine for the report header."""
+    import numpy
+    import scipy
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "scipy": scipy.__version__,
+    }
+    try:
+        import gurobipy
+        info["gurobi"] = ".".join(str(part) for part in gurobipy.gurobi.version())
+    except Exception:
+        info["gurobi"] = None
+    try:
+        info["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(__file__), timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        info["git_commit"] = None
+    return info
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GurobiScheduleOptimizer on synthetic instances")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="standard", help="Instance sizes to run")
+    parser.add_argument("--sizes", type=parse_sizes, help="Explicit sizes, e.g. 100x31,500x31 (overrides --suite)")
+    parser.add_argument("--seeds", type=int, default=1, help="Instances per size (seeds 0..n-1)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per instance; the summary uses medians")
+    parser.add_argument("--optimizer", action="append", help="Engine to run (repeatable, default gurobi)")
+    parser.add_argument("--cost", action="store_true", help="Benchmark cost minimization mode")
+    parser.add_argument("--matrix-api", action="store_true", help="Build the Gurobi model with the matrix API")
+    parser.add_argument("--deadline-ms", type=int, default=60000, help="Solve budget per run")
+    parser.add_argument("--trace-memory", action="store_true", help="Also record the Python heap peak (tracemalloc slows the run)")
+    parser.add_argument("--in-process", action="store_true", help="Run cases in this process (debugging)")
+    parser.add_argument("--output", help="Report path (default benchmarks/results/report-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Report to compare against; exit code 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=50.0, help="Absolute slowdown that counts as a regression")
+    parser.add_argument("--verbose", action="store_true", help="Keep the optimizer's INFO logging")
+    args = parser.parse_args(argv)
+
+    optimizers = args.optimizer or ["gurobi"]
+    sizes = args.sizes or SUITES[args.suite]
+    specs = [InstanceSpec(employees, days, seed, optimize_for_cost=args.cost) for employees, days in sizes for seed in range(args.seeds)]
+
+    cases = []
+    for spec in specs:
+        for optimizer in optimizers:
+            runs = []
+            for _ in range(args.repeat):
+                case_args = (spec, optimizer, args.deadline_ms, args.matrix_api, args.trace_memory, args.verbose)
+                runs.append(run_case(*case_args) if args.in_process else run_isolated(*case_args))
+            completed = [run for run in runs if "phases" in run]
+            last = (completed or runs)[-1]
+            case = {
+                "name": spec.name,
+                "spec": asdict(spec),
+                "optimizer_requested": optimizer,
+                **{key: last.get(key) for key in ("optimizer", "status", "objective", "shifts", "coverage_percentage", "model", "error")},
+                "summary": median_summary(completed) if completed else None,
+                "peak_rss_mb": max((run["peak_rss_mb"] for run in completed), default=None),
+                "runs": runs,
+            }
+            if args.trace_memory and completed:
+                case["python_peak_mb"] = max(run["python_peak_mb"] for run in completed)
+            cases.append(case)
+            summary = case["summary"] or {}
+            print(
+                f"{spec.name:<22} {optimizer:<9} → {str(case['optimizer']):<9} {str(case['status']):<10} "
+                f"obj={case['objective']} wall={summary.get('wall_ms')}ms "
+                f"build={sum(summary.get(key, 0) for key in ('variable_creation', 'constraints', 'objective', 'model_build')):.1f}ms "
+                f"solve={summary.get('optimize')}ms rss={case['peak_rss_mb']}MB"
+                + (f" error={case['error'][:120]}" if case["error"] else ""),
+                flush=True,
+            )
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "settings": {
+            "optimizers": optimizers,
+            "deadline_ms": args.deadline_ms,
+            "matrix_api": args.matrix_api,
+            "repeat": args.repeat,
+            "trace_memory": args.trace_memory,
+        },
+        "cases": cases,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"report-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Report written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(report, json.load(f), tolerance=args.tolerance, min_delta_ms=args.min_delta_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} {regression['metric']}: {regression['baseline']} → {regression['current']}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
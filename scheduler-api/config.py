@@ -14,6 +14,8 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
 )
 logger = logging.getLogger("scheduler-api")
+# Gurobi's solver log is captured per request (services/solve_log.py); keep only its warnings here
+logging.getLogger("gurobipy").setLevel(logging.WARNING)
 
 # Load environment variables
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -47,3 +49,50 @@ GUROBI_CONSTRAINTS = {
         }
     }
 }
+
+# Async optimization jobs (shared by all Gunicorn workers through one SQLite file)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "/tmp/scheduler-jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))                  # Concurrent solves per worker process
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 20))         # Queued + running jobs across all workers
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", 24))  # Finished jobs are purged after this
+
+# Per-request solve budget caps (requests may ask for less, never more)
+SOLVE_MAX_DEADLINE_MS = int(os.getenv("SOLVE_MAX_DEADLINE_MS", 600000))  # 10 minutes (nightly runs)
+SOLVE_MAX_THREADS = int(os.getenv("SOLVE_MAX_THREADS", min(4, os.cpu_count() or 1)))  # Gurobi Threads per solve (0 = all cores)
+SOLVE_MAX_NODE_LIMIT = int(os.getenv("SOLVE_MAX_NODE_LIMIT", 0))        # 0 = no server-side node cap
+
+# Long-lived Gurobi environments per worker process (license checkout happens once at startup)
+GUROBI_ENV_POOL_SIZE = int(os.getenv("GUROBI_ENV_POOL_SIZE", 2))             # Envs created at startup
+GUROBI_ENV_ACQUIRE_TIMEOUT = float(os.getenv("GUROBI_ENV_ACQUIRE_TIMEOUT", 5))  # Seconds to wait for a free env
+
+# Infeasibility diagnostics (IIS) when a request sets diagnose_infeasibility
+IIS_TIME_LIMIT = float(os.getenv("IIS_TIME_LIMIT", 10))  # Seconds; also bounded by the request deadline
+
+# NumPy heuristic engine (optimizer="heuristic", fallback without a Gurobi license, MIP start)
+HEURISTIC_TIME_LIMIT = float(os.getenv("HEURISTIC_TIME_LIMIT", 5))              # Seconds of local search when it builds the schedule
+HEURISTIC_START_TIME_LIMIT = float(os.getenv("HEURISTIC_START_TIME_LIMIT", 1))  # Seconds when it only seeds Gurobi
+HEURISTIC_FALLBACK = os.getenv("HEURISTIC_FALLBACK", "true").lower() in ("1", "true", "yes")  # Use it when Gurobi has no usable license
+
+# Prometheus metrics: set (gunicorn.conf.py does) to aggregate /metrics across Gunicorn workers
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Solver telemetry of every Gurobi solve (JSON lines, rotated); empty path disables the file
+SOLVER_TELEMETRY_LOG = os.getenv("SOLVER_TELEMETRY_LOG", "/tmp/scheduler-solver-telemetry.jsonl")
+SOLVER_TELEMETRY_LOG_MAX_MB = float(os.getenv("SOLVER_TELEMETRY_LOG_MAX_MB", 20))  # Rotate at this size
+SOLVER_TELEMETRY_LOG_BACKUPS = int(os.getenv("SOLVER_TELEMETRY_LOG_BACKUPS", 5))   # Rotated files kept
+
+# Tuned Gurobi parameters per instance size class (tools/tune_solver_params.py); missing file = defaults
+SOLVER_PARAMS_FILE = os.getenv("SOLVER_PARAMS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "solver_params.json"))
+
+# Slow-request capture for offline replay (tools/replay_capture.py); 0 disables it
+SLOW_CAPTURE_SECONDS = float(os.getenv("SLOW_CAPTURE_SECONDS", 0))                # Capture calls slower than this
+SLOW_CAPTURE_DIR = os.getenv("SLOW_CAPTURE_DIR", "/tmp/scheduler-captures")        # One directory per case
+SLOW_CAPTURE_ANONYMIZE = os.getenv("SLOW_CAPTURE_ANONYMIZE", "true").lower() in ("1", "true", "yes")  # Strip names, ids, addresses
+SLOW_CAPTURE_MODEL_FORMAT = os.getenv("SLOW_CAPTURE_MODEL_FORMAT", "mps")         # mps, lp, mps.gz, lp.gz, ...
+SLOW_CAPTURE_MAX_CASES = int(os.getenv("SLOW_CAPTURE_MAX_CASES", 100))            # Older cases are deleted
+
+# Admin-only diagnostics (?profile=1, /admin/...); disabled while ADMIN_TOKEN is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/scheduler-profiles")                   # Collapsed-stack profiles
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))   # Sampling period
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 50))                      # Older profiles are deleted
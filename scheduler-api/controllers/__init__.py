@@ -1,6 +1,6 @@
 
 """Controllers package for the scheduler API."""
 
-from controllers.optimization_controller import handle_optimization_request
+from controllers.optimization_controller import handle_optimization_request, run_optimization_request
 
-__all__ = ['handle_optimization_request']
+__all__ = ['handle_optimization_request', 'run_optimization_request']
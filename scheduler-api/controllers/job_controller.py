@@ -0,0 +1,131 @@
+"""Controller for asynchronous schedule optimization jobs (submit / poll / fetch result)."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import json
+import threading
+import traceback
+
+from fastapi import HTTPException
+
+from models import ScheduleRequest
+from config import logger, JOB_STORE_PATH, JOB_WORKERS, JOB_MAX_PENDING, JOB_RETENTION_HOURS
+from controllers.optimization_controller import run_optimization_request
+from services.job_store import JobStore, JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED
+
+# Bounded solver pool per worker process; the job store is shared by all processes
+_executor: Optional[ThreadPoolExecutor] = None
+_store: Optional[JobStore] = None
+_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Shared job store, created (and cleaned of orphaned jobs) on first use."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = JobStore(JOB_STORE_PATH)
+            _store.fail_orphaned()
+            logger.info(f"📦 Job store ready at {JOB_STORE_PATH}")
+        return _store
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="optimization-job")
+        return _executor
+
+
+def submit_optimization_job(request: ScheduleRequest) -> Dict[str, Any]:
+    """Queue an optimization request on the solver pool and return the new job's id."""
+    store = get_job_store()
+    store.purge(JOB_RETENTION_HOURS)
+
+    # Counted and inserted atomically, so concurrent workers cannot overshoot JOB_MAX_PENDING
+    job_id, pending = store.create(request.model_dump(), max_pending=JOB_MAX_PENDING)
+    if job_id is None:
+        logger.warning(f"Rejecting optimization job: {pending} jobs already pending")
+        raise HTTPException(status_code=429, detail=f"Too many pending optimization jobs ({pending}), try again later")
+
+    _get_executor().submit(_run_job, job_id, request)
+    logger.info(f"📥 Queued optimization job {job_id} ({pending + 1} pending)")
+
+    return {
+        "job_id": job_id,
+        "status": JOB_QUEUED,
+        "status_url": f"/jobs/{job_id}",
+        "result_url": f"/jobs/{job_id}/result"
+    }
+
+
+def _run_job(job_id: str, request: ScheduleRequest):
+    """Run one job on a pool thread and record its outcome in the store."""
+    store = get_job_store()
+    store.update(job_id, status=JOB_RUNNING, progress=0.0, message="Starting optimization")
+    logger.info(f"▶️ Running optimization job {job_id}")
+
+    def report_progress(fraction: float, message: str):
+        store.update(job_id, progress=round(fraction, 3), message=message)
+
+    def report_incumbent(event: Dict[str, Any]):
+        if event["type"] == "incumbent" and event["objective"] is not None:
+            gap = f"{event['gap'] * 100:.1f}%" if event["gap"] is not None else "n/a"
+            store.update(job_id, message=f"Best schedule so far: objective {event['objective']:.1f}, gap {gap} after {event['elapsed']:.1f}s")
+
+    try:
+        result = run_optimization_request(request, progress_callback=report_progress, solver_event_callback=report_incumbent)
+        store.update(job_id, status=JOB_COMPLETED, progress=1.0, message=result.get("message", "Schedule optimized successfully"), result=result)
+        logger.info(f"✅ Optimization job {job_id} completed")
+    except HTTPException as e:
+        store.update(job_id, status=JOB_FAILED, message="Optimization failed", error=_stored_error(e.detail), error_status=e.status_code)
+        logger.warning(f"❌ Optimization job {job_id} failed: {e.detail}")
+    except Exception as e:
+        store.update(job_id, status=JOB_FAILED, message="Optimization failed", error=str(e), error_status=500)
+        logger.error(f"💥 Optimization job {job_id} crashed: {str(e)}\n{traceback.format_exc()}")
+
+
+def get_job_status(job_id: str) -> Dict[str, Any]:
+    """Status, progress and timestamps of a job."""
+    job = get_job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "error": _error_detail(job["error"]),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"]
+    }
+
+
+def get_job_result(job_id: str) -> Dict[str, Any]:
+    """Schedule of a completed job; failed jobs re-raise their original error status."""
+    job = get_job_store().get(job_id, include_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=job["error_status"] or 500, detail=_error_detail(job["error"]))
+    if job["status"] != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']} ({job['progress'] * 100:.0f}%)")
+
+    return job["result"]
+
+
+def _stored_error(detail: Any) -> str:
+    """Error column value of an HTTPException detail; structured details (bottlenecks, diagnosis) are kept as JSON."""
+    return detail if isinstance(detail, str) else json.dumps(detail, default=str)
+
+
+def _error_detail(error: Optional[str]) -> Any:
+    """Error of a job as it was raised: structured details are decoded again, plain messages returned as-is."""
+    if error is None or not error.startswith("{"):
+        return error
+    try:
+        return json.loads(error)
+    except ValueError:
+        return error
@@ -2,24 +2,114 @@
 """Controller for handling schedule optimization requests."""
 
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
+import asyncio
+import json
+import threading
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, AsyncIterator
 
 from models import ScheduleRequest
 from config import logger
-from utils import get_supabase_client, fetch_employees, fetch_settings
+from utils import get_supabase_client, fetch_employees, fetch_settings, fetch_published_shifts
 from scheduler_service import optimize_schedule
+from services.gurobi_optimizer_service import RELAXATION_MODES, OPTIMIZERS
+from services.solve_budget import SolveBudget
+from services.request_timing import timed, finish_handler, current_timings
+from services.sampling_profiler import profiled_thread
+from services.slow_capture import start_capture, finish_capture
 from services.ai_constraint_converter import (
     convert_ai_constraints_to_preferences,
     validate_ai_constraint_dates
 )
 
+# Progress callback: (fraction 0-1, message)
+ProgressCallback = Callable[[float, str], None]
+
 async def handle_optimization_request(request: ScheduleRequest):
-    """Handle schedule optimization request logic."""
+    """Handle schedule optimization request logic without blocking the event loop."""
+    def run():
+        with profiled_thread():  # Sampled with the event loop when the request runs with ?profile=1
+            return run_optimization_request(request)
+    return await run_in_threadpool(run)
+
+async def stream_optimization_request(request: ScheduleRequest) -> AsyncIterator[str]:
+    """
+    Run an optimization and yield Server-Sent Events while it solves.
+    
+    Events: "status" (pipeline stage), "incumbent" (new schedule found, with added /
+    removed assignments against the previous one), "progress" (objective, bound, gap,
+    elapsed), then a final "result" (ScheduleResponse payload) or "error". Closing the
+    connection stops the solve.
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    stop_event = threading.Event()
+    
+    def publish(event: Dict[str, Any]):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    def report(fraction: float, message: str):
+        publish({"type": "status", "progress": fraction, "message": message})
+    
+    def run():
+        try:
+            result = run_optimization_request(request, progress_callback=report, solver_event_callback=publish, stop_event=stop_event)
+            publish({"type": "result", "result": result})
+        except HTTPException as e:
+            publish({"type": "error", "status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            publish({"type": "error", "status": 500, "detail": str(e)})
+    
+    loop.run_in_executor(None, run)
+    try:
+        while True:
+            event = await events.get()
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if event["type"] in ("result", "error"):
+                break
+    finally:
+        # Client disconnected (or stream finished): stop the solver if it is still running
+        if not stop_event.is_set():
+            stop_event.set()
+            logger.info("🛑 Optimization stream closed")
+
+def run_optimization_request(
+    request: ScheduleRequest,
+    progress_callback: Optional[ProgressCallback] = None,
+    solver_event_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stop_event: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Fetch data, run the optimizer and build the response payload (blocking).
+    
+    Args:
+        request: Schedule optimization request
+        progress_callback: Optional callback receiving (fraction, message) at each stage
+        solver_event_callback: Optional callback receiving incumbent / progress events from the solver
+        stop_event: Optional threading.Event that stops the solve early
+    
+    Returns:
+        Response dict matching ScheduleResponse
+    """
+    def report(fraction: float, message: str):
+        if progress_callback:
+            progress_callback(fraction, message)
+    
+    capture_token = start_capture("schedule")  # Written to SLOW_CAPTURE_DIR if the request turns out slow
+    outcome: Dict[str, Any] = {"status": "error"}
     try:
         logger.info(f"Processing schedule optimization request: {request}")
         
+        # The deadline covers everything from here: data fetch, model build, solve and fallbacks
+        solve_budget = SolveBudget(
+            deadline_ms=request.deadline_ms,
+            mip_gap=request.mip_gap,
+            threads=request.threads,
+            node_limit=request.node_limit
+        )
+        
         # Validate request
         if not request.start_date or not request.end_date:
             raise HTTPException(status_code=400, detail="Start date and end date are required")
@@ -37,15 +127,24 @@ async def handle_optimization_request(request: ScheduleRequest):
             raise HTTPException(status_code=400, detail="End date must be after start date")
         if date_range > 31:
             raise HTTPException(status_code=400, detail="Maximum scheduling period is 31 days")
+        
+        relaxation_mode = request.relaxation_mode or "rebuild"
+        if relaxation_mode not in RELAXATION_MODES:
+            raise HTTPException(status_code=400, detail=f"Invalid relaxation_mode '{relaxation_mode}': expected one of {', '.join(RELAXATION_MODES)}")
+        optimizer = request.optimizer or "gurobi"
+        if optimizer not in OPTIMIZERS:
+            raise HTTPException(status_code=400, detail=f"Invalid optimizer '{optimizer}': expected one of {', '.join(OPTIMIZERS)}")
 
         # Get Supabase client with connection retry
         try:
-            supabase = get_supabase_client()
+            with timed("supabase.connect"):
+                supabase = get_supabase_client()
         except Exception as e:
             logger.error(f"Failed to connect to Supabase: {str(e)}")
             raise HTTPException(status_code=503, detail="Database connection failed")
         
         # Fetch employees from Supabase
+        report(0.05, "Fetching employees")
         logger.info("Fetching employees from Supabase")
         employees = fetch_employees(supabase, request.department)
 
@@ -83,6 +182,16 @@ async def handle_optimization_request(request: ScheduleRequest):
                 ]
                 logger.info(f"🤖 Passing {len(processed_ai_constraints)} AI constraints directly to Gurobi (Gurobi-ready format)")
         
+        # Previous schedule to warm-start from: explicit schedule first, then published shifts
+        warm_start = None
+        if request.warm_start_schedule:
+            warm_start = [shift.model_dump() for shift in request.warm_start_schedule]
+            logger.info(f"♻️ Received warm start schedule with {len(warm_start)} shifts")
+        elif request.warm_start_from_published:
+            warm_start = fetch_published_shifts(supabase, start_date, end_date, request.department)
+        
+        report(0.2, f"Optimizing schedule for {len(employees)} employees")
+        
         # Call the scheduler service to optimize the schedule
         # Use allow_partial_coverage from request, or False by default (enforce all constraints)
         result = optimize_schedule(
@@ -91,7 +200,7 @@ async def handle_optimization_request(request: ScheduleRequest):
             end_date=end_date, 
             department=request.department, 
             random_seed=random_seed,
-            optimizer=request.optimizer or "gurobi",
+            optimizer=optimizer,
             min_staff_per_shift=request.min_staff_per_shift or 1,
             max_staff_per_shift=request.max_staff_per_shift,  # Pass through - None is valid (means exact staffing)
             min_experience_per_shift=request.min_experience_per_shift or 1,
@@ -100,9 +209,20 @@ async def handle_optimization_request(request: ScheduleRequest):
             optimize_for_cost=request.optimize_for_cost or False,
             employee_preferences=processed_employee_preferences,
             manual_constraints=request.manual_constraints,
-            ai_constraints=processed_ai_constraints  # ← Pass AI constraints directly to Gurobi!
+            ai_constraints=processed_ai_constraints,  # ← Pass AI constraints directly to Gurobi!
+            use_matrix_api=request.use_matrix_api or False,
+            warm_start=warm_start,
+            relaxation_mode=relaxation_mode,
+            solver_event_callback=solver_event_callback,
+            stop_event=stop_event,
+            solve_budget=solve_budget,
+            debug_logging=request.debug_logging or False,
+            diagnose_infeasibility=request.diagnose_infeasibility or False,
+            heuristic_start=request.heuristic_start or False
         )
         
+        report(0.95, "Building response")
+        
         # Debug: log what we got from optimizer
         statistics = result.get("statistics", {})
         coverage_data = statistics.get("coverage", {})
@@ -131,16 +251,32 @@ async def handle_optimization_request(request: ScheduleRequest):
             },
             "total_cost": total_cost,
             "optimizer": result.get("optimizer", "gurobi"),
-            "optimization_status": "optimal" if result.get("objective_value") is not None else "unknown",
+            "optimization_status": result.get("optimization_status") or ("optimal" if result.get("objective_value") is not None else "unknown"),
             "objective_value": result.get("objective_value"),
-            "message": result.get("message", "Schedule optimized successfully")
+            "message": result.get("message", "Schedule optimized successfully"),
+            "relaxed_constraints": result.get("relaxed_constraints"),
+            "infeasibility_diagnosis": result.get("infeasibility_diagnosis")
         }
         
+        if request.include_solver_telemetry:
+            response_data["solver_telemetry"] = result.get("solver_telemetry")
+        
+        # Breakdown so far (Supabase, solver phases); serialization is only in the Server-Timing header
+        timings = current_timings()
+        if request.include_timings and timings is not None:
+            response_data["timings"] = timings.summary()
+        finish_handler()
+        
+        outcome = {key: response_data[key] for key in ("optimizer", "optimization_status", "objective_value", "message")}
         return response_data
-    except HTTPException:
+    except HTTPException as e:
         # Re-raise HTTP exceptions without modification
+        outcome["error"] = f"{e.status_code}: {e.detail}"[:500]
         raise
     except Exception as e:
         error_detail = f"{str(e)}\n{traceback.format_exc()}"
         logger.error(f"Error optimizing schedule: {error_detail}")
+        outcome["error"] = str(e)[:500]
         raise HTTPException(status_code=500, detail=f"Error optimizing schedule: {error_detail}")
+    finally:
+        finish_capture(capture_token, outcome)
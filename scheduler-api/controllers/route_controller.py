@@ -7,6 +7,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any, Tuple
 from services.route_optimizer_service import RouteOptimizerService
+from services.request_timing import current_timings, finish_handler
+from services.slow_capture import start_capture, finish_capture
 from config import logger
 
 router = APIRouter(prefix="/api/route", tags=["route-optimization"])
@@ -27,6 +29,7 @@ class RouteOptimizationRequest(BaseModel):
     startLocation: Optional[Tuple[float, float]] = None  # (lat, lng)
     max_route_time: int = 480  # 8 hours in minutes
     vehicle_speed_kmh: float = 40.0  # Average urban speed
+    include_timings: bool = False  # Return the stage breakdown in `timings` (always in the Server-Timing header)
 
 class RouteOptimizationResponse(BaseModel):
     success: bool
@@ -37,6 +40,7 @@ class RouteOptimizationResponse(BaseModel):
     optimization_stats: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     fallback_route: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, Any]] = None
 
 @router.post("/optimize-route", response_model=RouteOptimizationResponse)
 async def optimize_route(request: RouteOptimizationRequest):
@@ -57,6 +61,8 @@ async def optimize_route(request: RouteOptimizationRequest):
     """
     
     logger.info(f"🎯 Route optimization request received for {len(request.customers)} customers")
+    capture_token = start_capture("route")  # Written to SLOW_CAPTURE_DIR if the request turns out slow
+    outcome: Dict[str, Any] = {"success": False}
     
     try:
         if len(request.customers) < 2:
@@ -100,6 +106,11 @@ async def optimize_route(request: RouteOptimizationRequest):
             vehicle_speed_kmh=request.vehicle_speed_kmh
         )
         
+        outcome = {key: result.get(key) for key in ("success", "objective_value", "totalDistance", "error")}
+        timings = current_timings()
+        timings_field = timings.summary() if request.include_timings and timings is not None else None
+        finish_handler()
+        
         # Return response
         if result.get("success", False):
             logger.info(f"✅ Route optimization successful: {result['totalDistance']:.1f}km, {result['totalTime']:.0f}min")
@@ -109,7 +120,8 @@ async def optimize_route(request: RouteOptimizationRequest):
                 totalTime=result["totalTime"],
                 customers=result["customers"],
                 routeInstructions=result.get("routeInstructions", []),
-                optimization_stats=result.get("optimization_stats", {})
+                optimization_stats=result.get("optimization_stats", {}),
+                timings=timings_field
             )
         else:
             logger.warning(f"⚠️ Route optimization failed, using fallback: {result.get('error', 'Unknown error')}")
@@ -121,7 +133,8 @@ async def optimize_route(request: RouteOptimizationRequest):
                 totalDistance=fallback.get("totalDistance"),
                 totalTime=fallback.get("totalTime"),
                 customers=fallback.get("customers", []),
-                routeInstructions=fallback.get("routeInstructions", [])
+                routeInstructions=fallback.get("routeInstructions", []),
+                timings=timings_field
             )
             
     except HTTPException:
@@ -134,20 +147,24 @@ async def optimize_route(request: RouteOptimizationRequest):
             status_code=500,
             detail=f"Route optimization failed: {str(e)}"
         )
+    finally:
+        finish_capture(capture_token, outcome)
 
 @router.get("/health")
 async def route_health_check():
     """Health check endpoint for route optimization service."""
     try:
-        # Test if Gurobi is available
-        from gurobipy import Model
-        test_model = Model("test")
-        test_model.dispose()
+        # Test if Gurobi is available (on a pooled environment - no extra license checkout)
+        from services.gurobi_env_pool import get_env_pool
+        pool = get_env_pool()
+        with pool.model("test"):
+            pass
         
         return {
             "status": "healthy",
             "service": "route_optimization",
             "gurobi_available": True,
+            "gurobi_env_pool": pool.stats(),
             "message": "Route optimization service is running"
         }
     except ImportError:
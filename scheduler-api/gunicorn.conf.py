@@ -0,0 +1,25 @@
+"""
+Gunicorn settings shared by every deployment (loaded automatically from the working directory).
+
+Prometheus metrics are aggregated across the workers through per-process files in
+PROMETHEUS_MULTIPROC_DIR: the directory is set here, before any worker imports
+prometheus_client, wiped when the master starts (stale samples of a previous run would be
+merged otherwise) and each exiting worker is marked dead, as the multiprocess mode requires.
+Counters and histograms of exited workers keep counting towards the totals.
+"""
+
+import os
+import shutil
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/scheduler-metrics")
+
+
+def on_starting(server):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
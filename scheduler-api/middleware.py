@@ -1,5 +1,12 @@
 
+import time
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from services.metrics import HTTP_REQUEST_SECONDS
+from services.request_timing import start_request, end_request
+from services.sampling_profiler import start_profiling, stop_profiling
+from utils import is_admin_token
 
 def setup_cors(app):
     """Configure CORS middleware for the FastAPI app"""
@@ -9,4 +16,56 @@ def setup_cors(app):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing", "X-Profile-Id", "X-Profile-Url"],  # Readable by the frontend for per-request profiling
     )
+
+def setup_metrics(app):
+    """Record the latency of every request per route template (e.g. /jobs/{job_id})"""
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            if route_path != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(
+                    method=request.method, route=route_path, status=str(status)
+                ).observe(time.perf_counter() - started)
+
+def setup_server_timing(app):
+    """Send each request's time breakdown (services.request_timing) as a Server-Timing header"""
+    @app.middleware("http")
+    async def add_server_timing(request: Request, call_next):
+        timings, token = start_request()
+        try:
+            response = await call_next(request)
+            finished = time.perf_counter()
+            if timings.handler_finished is not None:
+                timings.add("serialize", (finished - timings.handler_finished) * 1000)
+            response.headers["Server-Timing"] = timings.header((finished - timings.started) * 1000)
+            return response
+        finally:
+            end_request(token)
+
+def setup_profiling(app):
+    """Run requests with ?profile=1 under the sampling profiler (admins only, see services.sampling_profiler)"""
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if request.query_params.get("profile", "").lower() not in ("1", "true", "yes"):
+            return await call_next(request)
+        if not is_admin_token(request.headers.get("X-Admin-Token")):
+            return JSONResponse(status_code=403, content={"detail": "Profiling requires a valid X-Admin-Token"})
+        
+        profiler, token = start_profiling()
+        try:
+            response = await call_next(request)
+        finally:
+            profile_id = stop_profiling(profiler, token)
+        response.headers["X-Profile-Id"] = profile_id
+        response.headers["X-Profile-Url"] = f"/admin/profiles/{profile_id}"
+        return response
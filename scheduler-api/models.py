@@ -49,12 +49,19 @@ class EmployeePreference(BaseModel):
     role: Optional[str] = Field(default=None, description="Employee role (e.g., 'Sjuksköterska', 'Läkare')")
     experience_level: Optional[int] = Field(default=1, description="Employee experience points (1-5)")
 
+class WarmStartShift(BaseModel):
+    """Assignment from a previous or user-edited schedule, loaded as a MIP start"""
+    employee_id: str
+    shift_type: str = Field(description="Shift type: 'day', 'evening', 'night'")
+    date: Optional[str] = Field(default=None, description="ISO date string (YYYY-MM-DD); taken from start_time when omitted")
+    start_time: Optional[str] = Field(default=None, description="ISO datetime of the shift start (as returned in 'schedule' or stored in 'shifts')")
+
 class ScheduleRequest(BaseModel):
     start_date: str
     end_date: str
     department: Optional[str] = None
     random_seed: Optional[int] = None
-    optimizer: Optional[str] = Field(default="gurobi", description="Optimizer to use: 'gurobi' only")
+    optimizer: Optional[str] = Field(default="gurobi", description="Optimizer to use: 'gurobi', 'heuristic' (greedy + local search, no solver license needed), or an open-source MILP backend: 'highs' or 'cpsat' (needs ortools)")
     min_staff_per_shift: Optional[int] = Field(default=1, description="Minimum staff required per shift")
     max_staff_per_shift: Optional[int] = Field(default=None, description="Maximum staff per shift (None = use exact min)")
     min_experience_per_shift: Optional[int] = Field(default=1, description="Minimum experience points required per shift")
@@ -64,6 +71,19 @@ class ScheduleRequest(BaseModel):
     employee_preferences: Optional[List[EmployeePreference]] = Field(default=None, description="Individual employee work preferences")
     manual_constraints: Optional[Dict[str, Any]] = Field(default=None, description="Manual constraints from UI")
     ai_constraints: Optional[List[AIConstraint]] = Field(default=[], description="AI-parsed constraints from natural language")
+    use_matrix_api: Optional[bool] = Field(default=False, description="Build the Gurobi model with the matrix API (faster for large departments)")
+    warm_start_schedule: Optional[List[WarmStartShift]] = Field(default=None, description="Previous or edited schedule used as starting solution (partial schedules allowed)")
+    warm_start_from_published: Optional[bool] = Field(default=False, description="Use the published shifts in the period as starting solution when no warm_start_schedule is given")
+    deadline_ms: Optional[int] = Field(default=None, description="Overall time budget in ms for build, solve and fallbacks (capped server-side)")
+    mip_gap: Optional[float] = Field(default=None, description="Relative MIP gap to stop at, e.g. 0.05 for previews, 0.001 for nightly runs")
+    threads: Optional[int] = Field(default=None, description="Solver threads (capped server-side)")
+    node_limit: Optional[int] = Field(default=None, description="Branch-and-bound node limit")
+    relaxation_mode: Optional[str] = Field(default="rebuild", description="When requirements are infeasible: 'rebuild' (retry with lower experience) or 'elastic' (single solve, reports shortfalls)")
+    debug_logging: Optional[bool] = Field(default=False, description="Log every constraint and preference item plus the full Gurobi log (default: one summary record per phase)")
+    diagnose_infeasibility: Optional[bool] = Field(default=False, description="When requirements cannot be met, compute an IIS and report the conflicting requirements (time-capped)")
+    heuristic_start: Optional[bool] = Field(default=False, description="Seed the Gurobi solve with the heuristic schedule as MIP start (faster first incumbent)")
+    include_timings: Optional[bool] = Field(default=False, description="Return the per-phase time breakdown and model size in `timings` (always sent in the Server-Timing header)")
+    include_solver_telemetry: Optional[bool] = Field(default=False, description="Return the statistics of every Gurobi solve (presolve, root relaxation, incumbents, nodes, bottleneck) in `solver_telemetry`")
 
 class ShiftResponse(BaseModel):
     employee_id: str
@@ -100,3 +120,22 @@ class ScheduleResponse(BaseModel):
     optimization_status: str
     objective_value: Optional[float] = None
     message: str
+    relaxed_constraints: Optional[Dict[str, Any]] = None
+    infeasibility_diagnosis: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, Any]] = None
+    solver_telemetry: Optional[List[Dict[str, Any]]] = None
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    result_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str = Field(description="queued, running, completed or failed")
+    progress: float = Field(description="Progress from 0 to 1")
+    message: Optional[str] = None
+    error: Optional[Any] = Field(default=None, description="Error message, or the structured detail (message, bottlenecks, diagnosis) of a failed solve")
+    created_at: float
+    updated_at: float
@@ -0,0 +1,42 @@
+"""
+Admin-only diagnostics routes (require the X-Admin-Token header to match ADMIN_TOKEN)
+Endpoints:
+  - GET /admin/profiles - Stored request profiles, newest first
+  - GET /admin/profiles/{profile_id} - Collapsed stacks of a profiled request (?profile=1)
+"""
+
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from config import PROFILE_DIR
+from services.sampling_profiler import profile_path
+from utils import is_admin_token
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Token is required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+def list_profiles_endpoint():
+    """Ids of the stored profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return {"profiles": []}
+    names = sorted((name for name in os.listdir(PROFILE_DIR) if name.endswith(".collapsed")), reverse=True)
+    return {"profiles": [name[:-len(".collapsed")] for name in names]}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile_endpoint(profile_id: str):
+    """Collapsed stacks ("frame;frame;... samples" per line) for flamegraph.pl, speedscope or inferno."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    with open(path) as f:
+        return f.read()
@@ -13,6 +13,7 @@ from pydantic import BaseModel, Field
 
 from config import logger
 from utils import get_supabase_client
+from services.metrics import external_call
 from services.openai_constraint_service import parse_natural_language_constraint
 from models import AIConstraint
 
@@ -54,7 +55,8 @@ async def parse_constraint(request: ParseConstraintRequest):
         
         # Fetch employees from database
         supabase = get_supabase_client()
-        employees_response = supabase.table("employees").select("id, first_name, last_name, department").execute()
+        with external_call("supabase", "fetch_employees"):
+            employees_response = supabase.table("employees").select("id, first_name, last_name, department").execute()
         employees = employees_response.data
         
         # Filter by department if specified
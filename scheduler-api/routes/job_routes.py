@@ -0,0 +1,32 @@
+"""
+API routes for asynchronous schedule optimization
+Endpoints:
+  - POST /optimize-schedule/jobs - Queue an optimization and return a job id
+  - GET /jobs/{job_id} - Job status and progress
+  - GET /jobs/{job_id}/result - Optimized schedule of a completed job
+"""
+
+from fastapi import APIRouter
+
+from models import ScheduleRequest, ScheduleResponse, JobSubmitResponse, JobStatusResponse
+from controllers.job_controller import submit_optimization_job, get_job_status, get_job_result
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.post("/optimize-schedule/jobs", response_model=JobSubmitResponse, status_code=202)
+def submit_optimization_job_endpoint(request: ScheduleRequest):
+    """Queue a schedule optimization; poll the returned status_url for progress."""
+    return submit_optimization_job(request)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job_status_endpoint(job_id: str):
+    """Status and progress of an optimization job."""
+    return get_job_status(job_id)
+
+
+@router.get("/jobs/{job_id}/result", response_model=ScheduleResponse)
+def get_job_result_endpoint(job_id: str):
+    """Result of a completed optimization job (409 while it is still running)."""
+    return get_job_result(job_id)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from models import ScheduleRequest, ScheduleResponse
-from controllers.optimization_controller import handle_optimization_request
+from controllers.optimization_controller import handle_optimization_request, stream_optimization_request
 
 router = APIRouter()
 
@@ -9,4 +10,17 @@ async def optimize_schedule_endpoint(request: ScheduleRequest):
     """Endpoint for schedule optimization."""
     return await handle_optimization_request(request)
 
+@router.post("/optimize-schedule/diagnose", response_model=ScheduleResponse)
+async def optimize_schedule_diagnose_endpoint(request: ScheduleRequest):
+    """Schedule optimization with IIS diagnostics: infeasible requirements are explained, not just relaxed."""
+    request.diagnose_infeasibility = True
+    return await handle_optimization_request(request)
 
+@router.post("/optimize-schedule/stream")
+async def optimize_schedule_stream_endpoint(request: ScheduleRequest):
+    """Schedule optimization streamed as Server-Sent Events (incumbents, progress, final result)."""
+    return StreamingResponse(
+        stream_optimization_request(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
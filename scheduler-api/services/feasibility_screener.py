@@ -0,0 +1,254 @@
+"""
+Pre-solve feasibility screening on the compiled availability tensors.
+
+Runs before the Gurobi model is built and proves infeasibility in milliseconds for the
+common cases that would otherwise cost a full build, a solve up to its time limit and the
+relaxation loop:
+
+1. Required cells that are blocked, exceed a slot's staff cap or break an employee's limits
+2. Per-slot and per-day supply: open employees vs. minimum staff
+3. Per-slot experience: best reachable experience with the slot's staff cap
+4. Max-flow: can the minimum staff of every slot be assigned at once, respecting one shift
+   per day and each employee's weekly and total limits (employee → week → day → slot)
+
+Every check is a necessary condition, so a failed screen is a proof of infeasibility;
+a passed screen does not guarantee the full model is feasible.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import maximum_flow, breadth_first_order
+
+# Bottlenecks listed in logs and error messages (the report keeps all of them)
+MAX_REPORTED_BOTTLENECKS = 10
+
+# Checks that no staffing or experience relaxation can fix
+REQUIRED_CHECKS = ("required_blocked", "required_conflict")
+
+
+@dataclass
+class FeasibilityReport:
+    """Outcome of the pre-solve screen."""
+    feasible: bool = True
+    staffing_feasible: bool = True          # Every check except the experience check passed
+    max_experience_per_shift: Optional[int] = None  # Highest per-slot experience requirement that passes
+    bottlenecks: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def required_conflict(self) -> bool:
+        """Whether required cells (AI hard_required) conflict with blocks or limits on their own."""
+        return any(b["check"] in REQUIRED_CHECKS for b in self.bottlenecks)
+
+    def summary(self, limit: int = MAX_REPORTED_BOTTLENECKS) -> str:
+        """Human-readable list of the first bottlenecks."""
+        parts = [bottleneck["message"] for bottleneck in self.bottlenecks[:limit]]
+        if len(self.bottlenecks) > limit:
+            parts.append(f"... and {len(self.bottlenecks) - limit} more")
+        return "; ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable report."""
+        return {
+            "feasible": self.feasible,
+            "staffing_feasible": self.staffing_feasible,
+            "max_experience_per_shift": self.max_experience_per_shift,
+            "bottlenecks": self.bottlenecks,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+
+def screen_feasibility(
+    open_cells: np.ndarray,
+    required: np.ndarray,
+    blocked: np.ndarray,
+    slot_demand: np.ndarray,
+    slot_capacity: np.ndarray,
+    experience: np.ndarray,
+    min_experience_per_shift: int,
+    total_limits: np.ndarray,
+    weekly_limits: Optional[np.ndarray],
+    date_strings: List[str],
+    shift_types: List[str],
+    employee_ids: List[str],
+) -> FeasibilityReport:
+    """
+    Screen a scheduling instance for infeasibility before building the model.
+
+    Args:
+        open_cells: bool [employee, day, shift], cells that may be assigned
+        required: bool [employee, day, shift], cells that must be assigned
+        blocked: bool [employee, day, shift], hard-blocked cells
+        slot_demand: int [day, shift], minimum staff per slot (0 = not enforced)
+        slot_capacity: int [day, shift], maximum staff per slot
+        experience: Experience level per employee
+        min_experience_per_shift: Experience required in every slot with demand (0 = none)
+        total_limits: Max shifts per employee over the period
+        weekly_limits: int [employee, week] max shifts per 7-day block (None = no weekly limit)
+        date_strings: 'YYYY-MM-DD' per day index
+        shift_types: Shift type per shift index
+        employee_ids: Employee id per employee index
+
+    Returns:
+        FeasibilityReport with every bottleneck found
+    """
+    started = time.perf_counter()
+    report = FeasibilityReport()
+    n_employees, n_days, n_shifts = open_cells.shape
+    assignable = open_cells & ~required  # Cells still free to choose once required cells are fixed
+
+    def add(check: str, message: str, day: Optional[int] = None, shift: Optional[int] = None, **fields):
+        entry = {"check": check}
+        if day is not None:
+            entry["date"] = date_strings[day]
+        if shift is not None:
+            entry["shift_type"] = shift_types[shift]
+        entry.update(fields)
+        entry["message"] = message
+        report.bottlenecks.append(entry)
+
+    # 1. Required cells must be open and fit every limit on their own
+    for e, d, s in zip(*np.nonzero(required & blocked)):
+        add("required_blocked", f"{employee_ids[e]} is required on {date_strings[d]} {shift_types[s]} but blocked there",
+            d, s, employee_id=employee_ids[e])
+    required_per_day = required.sum(axis=2)
+    for e, d in zip(*np.nonzero(required_per_day > 1)):
+        add("required_conflict", f"{employee_ids[e]} is required for {required_per_day[e, d]} shifts on {date_strings[d]}",
+            d, employee_id=employee_ids[e], required=int(required_per_day[e, d]), available=1)
+    required_per_slot = required.sum(axis=0)
+    for d, s in zip(*np.nonzero(required_per_slot > slot_capacity)):
+        add("required_conflict", f"{date_strings[d]} {shift_types[s]} has {required_per_slot[d, s]} required staff but allows {slot_capacity[d, s]}",
+            d, s, required=int(required_per_slot[d, s]), available=int(slot_capacity[d, s]))
+    required_per_employee = required_per_day.sum(axis=1)
+    for e in np.nonzero(required_per_employee > total_limits)[0]:
+        add("required_conflict", f"{employee_ids[e]} is required for {required_per_employee[e]} shifts but may work {total_limits[e]}",
+            employee_id=employee_ids[e], required=int(required_per_employee[e]), available=int(total_limits[e]))
+    required_per_week = _per_week(required_per_day, weekly_limits)
+    if weekly_limits is not None:
+        for e, w in zip(*np.nonzero(required_per_week > weekly_limits)):
+            add("required_conflict", f"{employee_ids[e]} is required for {required_per_week[e, w]} shifts in week {w + 1} but may work {weekly_limits[e, w]}",
+                employee_id=employee_ids[e], required=int(required_per_week[e, w]), available=int(weekly_limits[e, w]))
+
+    # 2. Per-slot and per-day supply (one shift per employee and day)
+    for d, s in zip(*np.nonzero(slot_demand > slot_capacity)):
+        add("slot_staff", f"{date_strings[d]} {shift_types[s]} needs {slot_demand[d, s]} staff but allows at most {slot_capacity[d, s]}",
+            d, s, required=int(slot_demand[d, s]), available=int(slot_capacity[d, s]))
+    slot_supply = open_cells.sum(axis=0)
+    for d, s in zip(*np.nonzero(slot_supply < slot_demand)):
+        add("slot_staff", f"{date_strings[d]} {shift_types[s]} needs {slot_demand[d, s]} staff but only {slot_supply[d, s]} are available",
+            d, s, required=int(slot_demand[d, s]), available=int(slot_supply[d, s]))
+    day_demand = slot_demand.sum(axis=1)
+    day_supply = open_cells.any(axis=2).sum(axis=0)
+    for d in np.nonzero(day_supply < day_demand)[0]:
+        add("day_staff", f"{date_strings[d]} needs {day_demand[d]} staff but only {day_supply[d]} employees are available that day",
+            d, required=int(day_demand[d]), available=int(day_supply[d]))
+
+    report.staffing_feasible = not report.bottlenecks
+
+    # 3. Per-slot experience: the most experienced open employees up to the slot's staff cap
+    demand_slots = slot_demand > 0
+    if min_experience_per_shift > 0 and demand_slots.any():
+        open_experience = np.where(open_cells, experience[:, None, None], 0.0)
+        ranked = -np.sort(-open_experience, axis=0)  # Descending per slot
+        take = np.arange(n_employees)[:, None, None] < slot_capacity[None, :, :]
+        best_experience = (ranked * take).sum(axis=0)
+        report.max_experience_per_shift = int(np.floor(best_experience[demand_slots].min() + 1e-9))
+        for d, s in zip(*np.nonzero(demand_slots & (best_experience < min_experience_per_shift - 1e-9))):
+            add("slot_experience", f"{date_strings[d]} {shift_types[s]} needs {min_experience_per_shift} experience points but at most {best_experience[d, s]:g} can be staffed",
+                d, s, required=min_experience_per_shift, available=float(best_experience[d, s]))
+
+    # 4. Simultaneous assignment of every slot's minimum staff (only when the cheap checks pass)
+    if report.staffing_feasible and demand_slots.any():
+        _check_matching(add, assignable, required_per_day, required_per_slot, required_per_week,
+                        required_per_employee, slot_demand, total_limits, weekly_limits, date_strings, shift_types)
+        report.staffing_feasible = not any(b["check"] == "matching" for b in report.bottlenecks)
+
+    report.feasible = not report.bottlenecks
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+def _per_week(per_day: np.ndarray, weekly_limits: Optional[np.ndarray]) -> np.ndarray:
+    """Sum [employee, day] counts into [employee, week] blocks of 7 days."""
+    n_employees, n_days = per_day.shape
+    n_weeks = (n_days + 6) // 7 if weekly_limits is None else weekly_limits.shape[1]
+    padded = np.zeros((n_employees, n_weeks * 7), dtype=per_day.dtype)
+    padded[:, :n_days] = per_day
+    return padded.reshape(n_employees, n_weeks, 7).sum(axis=2)
+
+
+def _check_matching(add, assignable, required_per_day, required_per_slot, required_per_week,
+                    required_per_employee, slot_demand, total_limits, weekly_limits, date_strings, shift_types):
+    """
+    Max-flow from employees to slots; a flow below the total remaining demand proves infeasibility.
+
+    Network: source → employee (remaining total limit) → employee-week (remaining weekly limit)
+    → employee-day (1 unless already required that day) → slot (open cell) → sink (remaining demand).
+    Bottleneck slots are those that can still reach the sink in the residual graph, i.e. the
+    smallest set of slots whose combined demand the available staff cannot cover.
+    """
+    n_employees, n_days, n_shifts = assignable.shape
+    n_weeks = (n_days + 6) // 7
+    remaining_demand = np.maximum(slot_demand - required_per_slot, 0)
+    total_demand = int(remaining_demand.sum())
+    if total_demand == 0:
+        return
+
+    # Node numbering
+    source, sink = 0, 1
+    employee_node = 2 + np.arange(n_employees)
+    week_node = 2 + n_employees + np.arange(n_employees * n_weeks).reshape(n_employees, n_weeks)
+    day_node = week_node.max() + 1 + np.arange(n_employees * n_days).reshape(n_employees, n_days)
+    slot_node = day_node.max() + 1 + np.arange(n_days * n_shifts).reshape(n_days, n_shifts)
+    n_nodes = int(slot_node.max()) + 1
+
+    employee_capacity = np.maximum(total_limits - required_per_employee, 0)
+    if weekly_limits is not None:
+        week_capacity = np.maximum(weekly_limits - required_per_week, 0)
+    else:
+        week_capacity = np.full((n_employees, n_weeks), 7)
+    day_capacity = (required_per_day == 0).astype(np.int64)
+    week_of_day = np.arange(n_days) // 7
+
+    cell_e, cell_d, cell_s = np.nonzero(assignable & (remaining_demand[None, :, :] > 0))
+    tails = np.concatenate([
+        np.full(n_employees, source), np.repeat(employee_node, n_weeks), week_node[:, week_of_day].ravel(),
+        day_node[cell_e, cell_d], slot_node.ravel(),
+    ])
+    heads = np.concatenate([
+        employee_node, week_node.ravel(), day_node.ravel(), slot_node[cell_d, cell_s], np.full(n_days * n_shifts, sink),
+    ])
+    capacities = np.concatenate([
+        employee_capacity, week_capacity.ravel(), day_capacity.ravel(), np.ones(cell_e.size, dtype=np.int64),
+        remaining_demand.ravel(),
+    ]).astype(np.int32)
+    graph = sp.csr_matrix((capacities, (tails, heads)), shape=(n_nodes, n_nodes))
+    result = maximum_flow(graph, source, sink, method='dinic')
+    if result.flow_value >= total_demand:
+        return
+
+    # Residual graph: result.flow is antisymmetric, so capacity minus flow also covers reverse edges
+    flow = result.flow.tocsr()
+    residual = (graph - flow).tocsr()
+    residual.eliminate_zeros()
+    residual.data = (residual.data > 0).astype(np.int8)
+    reaches_sink = breadth_first_order(residual.T.tocsr(), sink, directed=True, return_predecessors=False)
+    in_deficient_set = np.zeros(n_nodes, dtype=bool)
+    in_deficient_set[reaches_sink] = True
+
+    shortfall = total_demand - int(result.flow_value)
+    served = np.asarray(flow[slot_node.ravel(), sink].todense()).reshape(n_days, n_shifts)
+    slots = [(d, s) for d, s in zip(*np.nonzero(remaining_demand > 0)) if in_deficient_set[slot_node[d, s]]]
+    needed = int(sum(remaining_demand[d, s] for d, s in slots))
+    names = ", ".join(f"{date_strings[d]} {shift_types[s]}" for d, s in slots[:MAX_REPORTED_BOTTLENECKS])
+    if len(slots) > MAX_REPORTED_BOTTLENECKS:
+        names += f", ... ({len(slots) - MAX_REPORTED_BOTTLENECKS} more)"
+    add("matching", f"{len(slots)} shifts need {needed} more staff but the available employees can cover only "
+        f"{needed - shortfall} of them ({shortfall} short): {names}",
+        required=needed, available=needed - shortfall, shortfall=shortfall,
+        slots=[{"date": date_strings[d], "shift_type": shift_types[s], "required": int(slot_demand[d, s]),
+                "available": int(served[d, s] + required_per_slot[d, s])} for d, s in slots])
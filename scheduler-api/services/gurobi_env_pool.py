@@ -0,0 +1,136 @@
+"""
+Pool of long-lived Gurobi environments, one pool per worker process.
+
+Starting a gp.Env checks out a license, which with WLS / cloud licenses is a network
+round trip on every request when models are created on a fresh default environment.
+The pool starts its environments once when the worker boots and lends them out per
+solve. A gp.Env must not be used by two threads at once, so each concurrent solve
+holds its own environment; when all are busy a new one is started (and kept) rather
+than making the request wait longer than GUROBI_ENV_ACQUIRE_TIMEOUT.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+import gurobipy as gp
+
+from config import logger, GUROBI_ENV_POOL_SIZE, GUROBI_ENV_ACQUIRE_TIMEOUT
+
+
+class GurobiEnvPool:
+    """Thread-safe pool of started gp.Env objects."""
+
+    def __init__(self, size: int = GUROBI_ENV_POOL_SIZE, acquire_timeout: float = GUROBI_ENV_ACQUIRE_TIMEOUT):
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self._idle: "queue.LifoQueue[gp.Env]" = queue.LifoQueue()
+        self._envs: List[gp.Env] = []
+        self._lock = threading.Lock()
+        self.startup_seconds: List[float] = []  # Start-up time of every env created so far
+        self.acquired = 0
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        """Create the initial environments (called once per worker at startup)."""
+        for _ in range(self.size - len(self._envs)):
+            env = self._create_env()
+            if env is None:
+                break
+            self._idle.put(env)
+        if self.startup_seconds:
+            logger.info(
+                f"🏊 Gurobi env pool ready: {len(self._envs)} envs, start-up "
+                f"{sum(self.startup_seconds) / len(self.startup_seconds) * 1000:.0f} ms each"
+            )
+
+    def _create_env(self, reason: str = "pool") -> Optional[gp.Env]:
+        started = time.perf_counter()
+        try:
+            env = gp.Env(empty=True)
+            env.setParam('OutputFlag', 0)  # Models enable output themselves
+            env.start()
+        except gp.GurobiError as e:
+            self.last_error = str(e)
+            logger.warning(f"Could not start Gurobi environment: {str(e)}")
+            return None
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._envs.append(env)
+            self.startup_seconds.append(elapsed)
+        logger.info(f"Started Gurobi environment ({reason}) in {elapsed * 1000:.0f} ms")
+        return env
+
+    def acquire(self) -> Optional[gp.Env]:
+        """
+        Borrow an environment for one solve.
+
+        Returns None if no environment can be started (the caller then falls back to
+        Gurobi's default environment).
+        """
+        if not self._envs:
+            # Cold start (pool not started or every env failed): nothing to wait for
+            return self._count_acquired(self._create_env("cold start"))
+        try:
+            env = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            logger.warning(f"No idle Gurobi env after {self.acquire_timeout}s, starting another one")
+            env = self._create_env("pool exhausted")
+        return self._count_acquired(env)
+
+    def _count_acquired(self, env: Optional[gp.Env]) -> Optional[gp.Env]:
+        if env is not None:
+            with self._lock:
+                self.acquired += 1
+        return env
+
+    def release(self, env: Optional[gp.Env]):
+        """Return a borrowed environment to the pool."""
+        if env is not None:
+            self._idle.put(env)
+
+    @contextmanager
+    def model(self, name: str):
+        """Model on a pooled environment, disposed (and the env returned) on exit."""
+        env = self.acquire()
+        model = gp.Model(name, env=env) if env is not None else gp.Model(name)
+        try:
+            yield model
+        finally:
+            model.dispose()
+            self.release(env)
+
+    def close(self):
+        """Dispose every environment (worker shutdown)."""
+        with self._lock:
+            envs, self._envs = self._envs, []
+        for env in envs:
+            env.dispose()
+        self._idle = queue.LifoQueue()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, usage and env start-up times for health / diagnostics."""
+        startup = self.startup_seconds
+        return {
+            "envs": len(self._envs),
+            "idle": self._idle.qsize(),
+            "acquired_total": self.acquired,
+            "env_startup_ms_avg": round(sum(startup) / len(startup) * 1000, 1) if startup else None,
+            "env_startup_ms_total": round(sum(startup) * 1000, 1),
+            "last_error": self.last_error,
+        }
+
+
+_pool: Optional[GurobiEnvPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_env_pool() -> GurobiEnvPool:
+    """The worker's shared environment pool (created on first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = GurobiEnvPool()
+        return _pool
@@ -9,13 +9,73 @@ This service uses Gurobi's mathematical optimization solver to crea            #
 unfairness in shift distribution.
 """
 
+import time
 import gurobipy as gp
+import numpy as np
+import scipy.sparse as sp
 from gurobipy import GRB
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from fastapi import HTTPException
-from config import logger
+from config import logger, IIS_TIME_LIMIT, HEURISTIC_TIME_LIMIT, HEURISTIC_START_TIME_LIMIT, HEURISTIC_FALLBACK
 from utils import create_date_list
+from services.preference_compiler import compile_preferences, AI_SHIFT_NAME_MAP
+from services.schedule_index import ScheduleIndex
+from services.solve_budget import SolveBudget
+from services.solve_log import SolveLog
+from services.feasibility_screener import screen_feasibility, FeasibilityReport, MAX_REPORTED_BOTTLENECKS
+from services.infeasibility_diagnostics import explain_iis, summarize_causes
+from services.gurobi_env_pool import get_env_pool
+from services.heuristic_scheduler import HeuristicResult, solve_heuristic
+from services.schedule_model import ScheduleProblem, LinearModel, build_linear_model
+from services.solver_backends import BACKENDS, BackendResult, SolverBackend, get_backend
+from services.metrics import observe_solve_phases, record_fallback
+from services.request_timing import record_phases
+from services.solver_telemetry import collect_telemetry, write_rolling_log
+from services.slow_capture import capture_inputs, capture_model
+from services.solver_params import tuned_params
+
+# Infeasibility handling: rebuild the model per experience level, or solve once with elastic slack
+RELAXATION_MODES = ("rebuild", "elastic")
+
+# Solve engines: the Gurobi MIP, the NumPy greedy + local-search heuristic (no license needed)
+# or the solver-neutral model on a registered open-source backend (see services.solver_backends)
+OPTIMIZERS = ("gurobi", "heuristic") + tuple(name for name in BACKENDS if name != "gurobi")
+
+# Gurobi errors that mean the solver cannot run at all; the heuristic takes over (HEURISTIC_FALLBACK)
+GUROBI_UNAVAILABLE_ERRORS = (
+    GRB.Error.NO_LICENSE,
+    GRB.Error.SIZE_LIMIT_EXCEEDED,
+    GRB.Error.NETWORK,
+    GRB.Error.CLOUD,
+    GRB.Error.JOB_REJECTED,
+)
+
+# Share of the remaining deadline given to the first solve when rebuild relaxation may follow
+MAIN_SOLVE_BUDGET_SHARE = 0.6
+
+# Objective penalty per unit of elastic slack (dominates coverage and fairness terms)
+ELASTIC_PENALTY_WEIGHTS = {
+    "min_staff": 1000,
+    "min_experience": 500,
+    "min_coverage": 1000,
+}
+
+# Objective weights per optimization mode, shared by _set_objective and the heuristic engine
+OBJECTIVE_WEIGHTS = {
+    # Each shift counts 100 for coverage minus 10 for its cost; no work% deviation term
+    "cost": {"coverage": 90, "work_percentage_deviation": 0, "total_unfairness": 50,
+             "shift_type_unfairness": 8, "weekend_unfairness": 20},
+    "work_percentage": {"coverage": 100, "work_percentage_deviation": 80, "total_unfairness": 70,
+                        "shift_type_unfairness": 40, "weekend_unfairness": 35},
+}
+
+# Objective weights for soft preferences, compiled into per-cell penalty coefficients
+PREFERENCE_PENALTY_WEIGHTS = {
+    "cost": {"non_preferred_shift": 45, "medium_blocked": 30, "non_preferred_day": 12},
+    "work_percentage": {"non_preferred_shift": 50, "medium_blocked": 30, "non_preferred_day": 12},
+}
 
 class GurobiScheduleOptimizer:
     """
@@ -36,15 +96,39 @@ class GurobiScheduleOptimizer:
     
     def __init__(self):
         self.model = None
-        self.shifts = {}
+        self.env = None  # Pooled gp.Env borrowed for the duration of one optimize_schedule call
+        self.shifts = {}  # (emp_id, day, shift) → Var, per-variable build only
+        self.shift_mvar = None  # Decision variables in cell order, matrix API build only
         self.employees = []
         self.dates = []
+        self.index = None  # ScheduleIndex lookups, built once per solve
         self.scheduled_days = []  # Track which days need coverage
+        self.cell_mask = None  # (employee, day, shift) cells that have a decision variable
+        self.cell_position = None  # [employee, day, shift] → position in cell order (-1 = no variable)
+        self.feasibility = None  # FeasibilityReport of the pre-solve screen
+        self.diagnose = False  # Compute an IIS when the requirements are infeasible
+        self.infeasibility_diagnosis = None
+        self.optimizer = "gurobi"  # Solve engine, see OPTIMIZERS
+        self.heuristic_start = False  # Seed the Gurobi solve with the heuristic schedule
         self.shift_types = ["day", "evening", "night"]
-        
-        # Employee preference tracking for objective function
-        self.employee_shift_preferences = {}  # For preferred shifts
-        self.employee_day_penalties = {}      # For non-preferred days (soft constraints)
+        self.use_matrix_api = False  # Build structural constraints with the Gurobi matrix API
+        self._var_groups = {}  # Aggregate key → (coefficients, variables), see _build_expression_cache
+        self._expr_cache = {}  # Aggregate key → linear expression (matrix API: also aggregation matrices), shared by constraints and objective
+        self.relaxation_mode = "rebuild"
+        self.size_class = None  # Instance size class, see services.solver_params
+        self.solver_params = {}  # Gurobi parameters applied on top of Seed and the solve budget
+        self.elastic_slacks = []  # (family, day, shift, required, slack var) in elastic relaxation mode
+        
+        # Gurobi callbacks, dispatched by _optimize: each is called as callback(model, where)
+        self.solve_callbacks = []
+        self.solver_event_callback = None  # Receives incumbent / progress events while solving
+        self.stop_event = None  # threading.Event; when set the running solve is terminated
+        self._last_progress_time = 0.0
+        self._incumbent_cells = set()
+        self.solve_log = SolveLog()  # Phase summaries, opt-in per-item logging and captured solver output
+        
+        # Compiled preference tensors (hard blocks, required cells, soft penalties)
+        self.compiled_preferences = None
         self.employees_with_custom_weekly_limits = set()  # For weekly constraints
         
         # Shift time mappings
@@ -67,7 +151,18 @@ class GurobiScheduleOptimizer:
         optimize_for_cost: bool = False,
         random_seed: Optional[int] = None,
         employee_preferences: Optional[List] = None,
-        ai_constraints: Optional[List[Dict]] = None
+        ai_constraints: Optional[List[Dict]] = None,
+        use_matrix_api: bool = False,
+        warm_start: Optional[List[Dict]] = None,
+        relaxation_mode: str = "rebuild",
+        solver_event_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        stop_event: Optional[Any] = None,
+        solve_budget: Optional[SolveBudget] = None,
+        debug_logging: bool = False,
+        diagnose_infeasibility: bool = False,
+        optimizer: str = "gurobi",
+        heuristic_start: bool = False,
+        solver_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Main optimization function that creates the optimal schedule.
@@ -85,39 +180,120 @@ class GurobiScheduleOptimizer:
             random_seed: Random seed for reproducible results
             employee_preferences: Individual employee work preferences
             ai_constraints: AI-parsed constraints from Supabase (Gurobi-ready format)
+            use_matrix_api: Build the model from one MVar with sparse constraint matrices
+                (build time scales with matrix size instead of Python-level calls)
+            warm_start: Shifts from a previous or edited schedule (employee_id, shift_type and
+                date or start_time), loaded as Gurobi MIP start; partial schedules are allowed
+            relaxation_mode: How infeasible requirements are handled: "rebuild" retries with
+                progressively lower experience requirements, "elastic" solves once with
+                penalized slack on min staff, min experience and shift type coverage
+            solver_event_callback: Receives a dict per new incumbent (with the schedule diff)
+                and periodic progress (objective, bound, gap, elapsed) during the solve
+            stop_event: threading.Event that stops the solve early; the best incumbent is returned
+            solve_budget: Overall deadline, MIP gap, threads and node limit for this request
+                (None = 30 s first solve, 15 s per relaxation attempt)
+            debug_logging: Log every constraint / preference item and the full Gurobi log
+                (otherwise one summary record per phase)
+            diagnose_infeasibility: When the requirements cannot be met, compute an IIS
+                (time-capped by IIS_TIME_LIMIT) and report the conflicting requirements
+            optimizer: "gurobi", "heuristic" (greedy + local search on NumPy arrays, no
+                solver) or an open-source backend ("highs", "cpsat") solving the same model
+                through services.solver_backends; Gurobi falls back to the heuristic when it
+                has no usable license
+            heuristic_start: Load the heuristic schedule as Gurobi MIP start (warm_start
+                values take precedence on the dates they cover)
+            solver_params: Gurobi parameters for every solve of this request (None = the
+                tuned set of the instance's size class, see services.solver_params)
             
         Returns:
             Dictionary containing the optimized schedule and statistics
         """
         logger.info("Starting Gurobi-based schedule optimization")
+        capture_inputs({
+            "employees": employees,
+            "start_date": start_date,
+            "end_date": end_date,
+            "min_staff_per_shift": min_staff_per_shift,
+            "max_staff_per_shift": max_staff_per_shift,
+            "min_experience_per_shift": min_experience_per_shift,
+            "include_weekends": include_weekends,
+            "allow_partial_coverage": allow_partial_coverage,
+            "optimize_for_cost": optimize_for_cost,
+            "random_seed": random_seed,
+            "employee_preferences": employee_preferences,
+            "ai_constraints": ai_constraints,
+            "use_matrix_api": use_matrix_api,
+            "warm_start": warm_start,
+            "relaxation_mode": relaxation_mode,
+            "solve_budget": solve_budget,
+            "diagnose_infeasibility": diagnose_infeasibility,
+            "optimizer": optimizer,
+            "heuristic_start": heuristic_start,
+        })
         
         try:
             # Initialize data
             self.employees = employees
             self.dates = create_date_list(start_date, end_date)
+            self.index = ScheduleIndex.build(employees, self.dates)  # date / employee lookups for this solve
             self.employee_preferences = employee_preferences or []
             self.ai_constraints = ai_constraints or []
             self.optimize_for_cost = optimize_for_cost
             self.min_staff_per_shift = min_staff_per_shift  # Store for coverage calculation
             self.max_staff_per_shift = max_staff_per_shift
+            self.use_matrix_api = use_matrix_api
+            self.warm_start = warm_start or []
+            self.relaxation_mode = relaxation_mode
+            self.elastic_slacks = []
+            self.solver_event_callback = solver_event_callback
+            self.stop_event = stop_event
+            self.solve_budget = solve_budget or SolveBudget()
+            self._incumbent_cells = set()
+            self.solve_log = SolveLog(debug=debug_logging)
+            self.diagnose = diagnose_infeasibility
+            self.infeasibility_diagnosis = None
+            self.optimizer = optimizer
+            self.heuristic_start = heuristic_start
+            self.size_class, tuned = tuned_params(len(employees), len(self.dates), min_staff_per_shift)
+            self.solver_params = solver_params if solver_params is not None else tuned
+            # Rebuilt per call so a reused optimizer does not stack callbacks from earlier solves
+            self.solve_callbacks = [self.solve_log.capture_solver_output]
+            if solver_event_callback is not None or stop_event is not None:
+                self.solve_callbacks.append(self._progress_callback)
+            self.shifts = {}
             
             logger.info(f"Optimizing schedule for {len(employees)} employees over {len(self.dates)} days")
             logger.info(f"Parameters: min_staff_per_shift={min_staff_per_shift}, max_staff_per_shift={max_staff_per_shift}, min_experience_per_shift={min_experience_per_shift}")
             logger.info(f"Optimization mode: {'COST MINIMIZATION' if optimize_for_cost else 'WORK_PERCENTAGE FILLING (allows overstaffing)'}")
             logger.info(f"Include weekends: {include_weekends}")
+            logger.info(f"Engine: {optimizer}{' (heuristic MIP start)' if heuristic_start and optimizer == 'gurobi' else ''}")
+            logger.info(f"Model build: {'matrix API' if use_matrix_api else 'per-variable'}")
+            logger.info(f"Relaxation mode: {relaxation_mode}")
+            logger.info(f"Solver parameters ({self.size_class}): {self.solver_params or 'Gurobi defaults'}")
             logger.info(f"Employee preferences provided: {len(self.employee_preferences)}")
             logger.info(f"AI constraints provided: {len(self.ai_constraints)}")
             
-            # Log AI constraints summary for debugging
-            if self.ai_constraints:
+            # Log AI constraints and employee preferences (debug logging only)
+            if self.solve_log.debug:
                 for constraint in self.ai_constraints:
-                    emp_name = next((e.get('name', 'Unknown') for e in employees if e.get('id') == constraint.get('employee_id')), 'Unknown')
-                    logger.info(f"  AI Constraint: {emp_name} - {constraint.get('constraint_type')} on {len(constraint.get('dates', []))} dates")
-            
-            # Log employee preferences for debugging
-            if self.employee_preferences:
+                    emp_name = self.index.employee_name(constraint.get('employee_id'))
+                    self.solve_log.detail("  AI Constraint: %s - %s on %d dates", emp_name, constraint.get('constraint_type'), len(constraint.get('dates', [])))
                 for pref in self.employee_preferences:
-                    logger.info(f"  Employee {pref.employee_id}: available_days={pref.available_days or []}, max_shifts_per_week={pref.max_shifts_per_week or 5}")
+                    self.solve_log.detail("  Employee %s: available_days=%s, max_shifts_per_week=%s", pref.employee_id, pref.available_days or [], pref.max_shifts_per_week or 5)
+            
+            # Compile every preference source into blocked / required / penalty tensors
+            with self.solve_log.phase("compile_preferences") as counters:
+                self.compiled_preferences = compile_preferences(
+                    employees=self.employees,
+                    dates=self.dates,
+                    shift_types=self.shift_types,
+                    employee_preferences=self.employee_preferences,
+                    ai_constraints=self.ai_constraints,
+                    penalty_weights=PREFERENCE_PENALTY_WEIGHTS["cost" if optimize_for_cost else "work_percentage"],
+                    index=self.index
+                )
+                counters["blocked_cells"] = int(self.compiled_preferences.blocked.sum())
+                counters["required_cells"] = int(self.compiled_preferences.required.sum())
             
             # Check if we have enough employees for basic coverage
             if include_weekends:
@@ -161,7 +337,7 @@ class GurobiScheduleOptimizer:
                         max_shifts_for_this_emp = 1
                 
                 total_capacity += max_shifts_for_this_emp
-                logger.debug(f"Employee {emp.get('first_name', 'Unknown')} ({work_percentage}%): max {max_shifts_for_this_emp} shifts over {total_weeks:.1f} weeks (exact: {max_shifts_exact:.2f}, experience: {emp.get('experience_level', 1)})")
+                self.solve_log.detail("Employee %s (%s%%): max %d shifts over %.1f weeks (exact: %.2f, experience: %s)", emp.get('first_name', 'Unknown'), work_percentage, max_shifts_for_this_emp, total_weeks, max_shifts_exact, emp.get('experience_level', 1))
             
             max_possible_shifts = total_capacity
             
@@ -170,7 +346,9 @@ class GurobiScheduleOptimizer:
             logger.info(f"Employee capacity: {max_possible_shifts} shifts possible (considering work_percentage for {len(employees)} employees)")
             
             if actual_shift_requirements > max_possible_shifts:
-                if not allow_partial_coverage:
+                if self.relaxation_mode == "elastic" and not allow_partial_coverage:
+                    logger.warning(f"Not enough capacity: need {actual_shift_requirements} shifts but only {max_possible_shifts} possible - elastic relaxation will report the shortfall")
+                elif not allow_partial_coverage:
                     logger.error(f"Impossible to fulfill requirements: need {actual_shift_requirements} shifts but only {max_possible_shifts} possible")
                     raise HTTPException(
                         status_code=400,
@@ -191,99 +369,127 @@ class GurobiScheduleOptimizer:
                 logger.info(f"Experience per shift requirement: {min_experience_per_shift} points per shift")
                 
                 # Simple heuristic check: if we don't have enough total experience even with max shifts
-                if total_experience_available < min_experience_per_shift and not allow_partial_coverage:
+                if total_experience_available < min_experience_per_shift and not allow_partial_coverage and self.relaxation_mode != "elastic":
                     logger.error(f"Insufficient experience: highest experience level is {max(emp.get('experience_level', 1) for emp in self.employees)} but need {min_experience_per_shift}")
                     raise HTTPException(
                         status_code=400,
                         detail=f"Insufficient experience: need {min_experience_per_shift} experience points per shift but highest employee experience is {max(emp.get('experience_level', 1) for emp in self.employees)}"
                     )
             
-            # Create Gurobi model
-            self.model = gp.Model("HealthcareScheduler")
-            
-            # Set random seed if provided
-            if random_seed is not None:
-                self.model.setParam('Seed', random_seed)
-                logger.info(f"Set Gurobi random seed: {random_seed}")
-            
-            # Suppress Gurobi output for cleaner logs
-            self.model.setParam('OutputFlag', 1)  # Enable output for debugging
-            self.model.setParam('TimeLimit', 30)  # 30 seconds should be enough for small problems
-            
-            # Create decision variables
-            self._create_variables()
-            
-            # Add constraints
-            self._add_constraints(min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage)
+            # Decide which cells get a variable, then screen the instance before building anything
+            self._select_variable_cells(include_weekends)
+            with self.solve_log.phase("feasibility_screen") as counters:
+                self.feasibility = self._screen_feasibility(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage)
+                counters["feasible"] = self.feasibility.feasible
+                counters["bottlenecks"] = len(self.feasibility.bottlenecks)
             
-            # Add employee preference constraints
-            self._add_employee_preference_constraints()
-            
-            # Add AI constraints (from natural language parsing)
-            self._add_ai_constraints()
-            
-            # Set objective function
-            self._set_objective()
+            if self.optimizer == "heuristic":
+                return self._solve_heuristic(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage, random_seed)
+            if self.optimizer != "gurobi":
+                return self._solve_with_backend(min_staff_per_shift, min_experience_per_shift, include_weekends,
+                                                allow_partial_coverage, random_seed)
             
-            # Optimize
-            logger.info("Starting Gurobi optimization...")
-            self.model.optimize()
+            if self._skip_main_solve(min_experience_per_shift):
+                status, sol_count = GRB.INFEASIBLE, 0
+            else:
+                status, sol_count = self._build_and_solve(
+                    random_seed, min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage
+                )
             
             # Process results
-            if self.model.status == GRB.OPTIMAL:
+            if status == GRB.OPTIMAL:
                 logger.info("Found optimal solution!")
-                return self._extract_solution()
-            elif self.model.status == GRB.SUBOPTIMAL:
+                return self._extract_elastic_solution()
+            elif status == GRB.SUBOPTIMAL:
                 logger.info("Found suboptimal but feasible solution!")
-                return self._extract_solution()
-            elif self.model.status == GRB.TIME_LIMIT and self.model.SolCount > 0:
-                logger.warning("Time limit reached but found feasible solution!")
-                return self._extract_solution()
-            elif self.model.status == GRB.INFEASIBLE or self.model.status == GRB.INF_OR_UNBD:
-                logger.warning(f"Initial optimization failed with status: {self.model.status}")
+                return self._extract_elastic_solution()
+            elif status in (GRB.TIME_LIMIT, GRB.NODE_LIMIT) and sol_count > 0:
+                logger.warning("Time or node limit reached but found feasible solution!")
+                return self._extract_elastic_solution()
+            elif status == GRB.INTERRUPTED and sol_count > 0:
+                logger.warning("Optimization stopped early - returning best schedule found so far")
+                result = self._extract_elastic_solution()
+                result['optimization_status'] = "stopped"
+                return result
+            elif self.relaxation_mode == "elastic" and status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD):
+                # Staffing, experience and coverage are already elastic - remaining conflicts
+                # come from hard preferences / AI constraints, which rebuilding would not fix
+                logger.error(f"Elastic optimization failed with status: {status}")
+                if self.diagnose:
+                    self.infeasibility_diagnosis = self._diagnose_infeasibility(
+                        min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage
+                    )
+                raise HTTPException(
+                    status_code=400,
+                    detail=self._error_detail("No feasible schedule found even with elastic staffing, experience and coverage requirements. Hard employee preferences or AI constraints conflict with each other.")
+                )
+            elif status == GRB.INFEASIBLE or status == GRB.INF_OR_UNBD:
+                logger.warning(f"Initial optimization failed with status: {status}")
                 logger.warning("Attempting to find best-effort solution with relaxed constraints...")
                 
+                # Explain why the original requirements fail before relaxing them
+                if self.diagnose:
+                    self.infeasibility_diagnosis = self._diagnose_infeasibility(
+                        min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage
+                    )
+                
                 # Try progressive relaxation of experience constraints
                 original_experience_requirement = min_experience_per_shift
-                relaxation_attempts = []
-                
-                # Create a list of progressively lower experience requirements to try
-                if original_experience_requirement > 1:
-                    for experience_level in range(original_experience_requirement - 1, 0, -1):
-                        relaxation_attempts.append(experience_level)
-                
-                # Always try with minimum experience = 1 as final fallback
-                if 1 not in relaxation_attempts:
-                    relaxation_attempts.append(1)
+                relaxation_attempts = self._relaxation_levels(min_staff_per_shift, original_experience_requirement, allow_partial_coverage)
                 
-                for attempt_experience in relaxation_attempts:
-                    logger.warning(f"Trying with relaxed experience requirement: {attempt_experience} (was {original_experience_requirement})")
-                    
-                    # Create new model for relaxed constraints
-                    self.model = gp.Model("ScheduleOptimization_Relaxed")
-                    self.shifts = {}
+                for attempt_number, attempt_experience in enumerate(relaxation_attempts):
+                    if self.solve_budget.exhausted():
+                        logger.warning(f"Solve deadline reached after {self.solve_budget.elapsed():.1f}s - skipping remaining relaxation attempts")
+                        break
                     
-                    # Recreate variables and constraints with relaxed requirements
-                    self._create_variables()
-                    self._add_constraints(min_staff_per_shift, attempt_experience, include_weekends, allow_partial_coverage)
-                    self._add_employee_preference_constraints()
-                    self._set_objective()
+                    logger.warning(f"Trying with relaxed experience requirement: {attempt_experience} (was {original_experience_requirement})")
                     
-                    # Try optimization with relaxed constraints
-                    self.model.setParam('OutputFlag', 0)  # Reduce output for fallback attempts
-                    self.model.setParam('TimeLimit', 15)  # Shorter time limit for fallback attempts
-                    self.model.optimize()
+                    with self.solve_log.phase(f"relaxation_experience_{attempt_experience}") as counters:
+                        # Create new model for relaxed constraints
+                        self.model = self._new_model("ScheduleOptimization_Relaxed")
+                        self.shifts = {}
+                        
+                        # Recreate variables and constraints with relaxed requirements
+                        with self.solve_log.step(counters, "variables"):
+                            self._create_variables()
+                        with self.solve_log.step(counters, "constraints"):
+                            self._add_constraints(min_staff_per_shift, attempt_experience, include_weekends, allow_partial_coverage)
+                            lap = self.solve_log.lap_timer()
+                            self._add_employee_preference_constraints()
+                            lap("preferences")
+                        with self.solve_log.step(counters, "objective"):
+                            self._set_objective()
+                        self._apply_warm_start()
+                        self._count_model(counters)
+                        
+                        # Try optimization with relaxed constraints (output is captured like the main solve)
+                        self.model.setParam('LogToConsole', 0)
+                        self.model.setParam('OutputFlag', 1)
+                        # Shorter time limit for fallback attempts; with a deadline the remaining
+                        # time is split evenly over the attempts still to come
+                        self.solve_budget.apply(
+                            self.model,
+                            default_seconds=15,
+                            share=1.0 / (len(relaxation_attempts) - attempt_number),
+                            phase=f"Relaxation attempt (experience {attempt_experience})"
+                        )
+                        self._apply_solver_params()
+                        self._optimize(f"relaxation_experience_{attempt_experience}")
+                        self._count_solve(counters)
                     
-                    if self.model.status == GRB.OPTIMAL or self.model.status == GRB.SUBOPTIMAL or (self.model.status == GRB.TIME_LIMIT and self.model.SolCount > 0):
+                    if self.model.status == GRB.OPTIMAL or self.model.status == GRB.SUBOPTIMAL or (self.model.status in (GRB.TIME_LIMIT, GRB.NODE_LIMIT, GRB.INTERRUPTED) and self.model.SolCount > 0):
                         logger.warning(f"Found feasible solution with relaxed experience requirement: {attempt_experience}")
                         logger.warning("Note: This schedule may not meet all original experience requirements")
                         result = self._extract_solution()
+                        record_fallback("rebuild")
                         # Add a warning flag to indicate this is a relaxed solution
                         result['relaxed_constraints'] = {
                             'original_min_experience': original_experience_requirement,
                             'actual_min_experience': attempt_experience,
                             'warning': f"Could not meet original experience requirement of {original_experience_requirement}. Using {attempt_experience} instead."
                         }
+                        if self.infeasibility_diagnosis is not None:
+                            result['infeasibility_diagnosis'] = self.infeasibility_diagnosis
                         return result
                 
                 # If all relaxation attempts failed, provide detailed error
@@ -302,13 +508,14 @@ class GurobiScheduleOptimizer:
                     GRB.SUBOPTIMAL: "SUBOPTIMAL",
                     GRB.OPTIMAL: "OPTIMAL"
                 }
-                status_name = status_names.get(self.model.status, f"UNKNOWN({self.model.status})")
+                final_status = self.model.status if self.model is not None else status
+                status_name = status_names.get(final_status, f"UNKNOWN({final_status})")
                 raise HTTPException(
                     status_code=400,
-                    detail=f"No feasible schedule found even with relaxed constraints. Final Gurobi status: {status_name}. This may indicate insufficient staff or overly restrictive employee preferences."
+                    detail=self._error_detail(f"No feasible schedule found even with relaxed constraints. Final Gurobi status: {status_name}. This may indicate insufficient staff or overly restrictive employee preferences.")
                 )
             else:
-                logger.error(f"Optimization failed with status: {self.model.status}")
+                logger.error(f"Optimization failed with status: {status}")
                 # Let's provide more detailed error information
                 status_names = {
                     GRB.INFEASIBLE: "INFEASIBLE",
@@ -324,146 +531,581 @@ class GurobiScheduleOptimizer:
                     GRB.SUBOPTIMAL: "SUBOPTIMAL",
                     GRB.OPTIMAL: "OPTIMAL"
                 }
-                status_name = status_names.get(self.model.status, f"UNKNOWN({self.model.status})")
+                status_name = status_names.get(status, f"UNKNOWN({status})")
                 raise HTTPException(
                     status_code=400,
                     detail=f"No feasible schedule found. Gurobi status: {status_name}"
                 )
                 
+        except gp.GurobiError as e:
+            if not self._can_fall_back(e):
+                logger.error(f"Gurobi optimization error: {str(e)}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Optimization error: {str(e)}"
+                )
+            # No license, no free seat or model too large for the license: schedule without Gurobi
+            logger.warning(f"⚠️ Gurobi unavailable ({str(e)}) - falling back to the heuristic engine")
+            record_fallback("heuristic_engine")
+            self._dispose_model()
+            result = self._solve_heuristic(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage, random_seed)
+            result['message'] = f"Gurobi unavailable ({str(e)}); schedule built by the heuristic engine"
+            return result
+        except HTTPException:
+            # Planner input errors (screen bottlenecks, infeasible requirements) keep their 400
+            raise
         except Exception as e:
             logger.error(f"Gurobi optimization error: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"Optimization error: {str(e)}"
             )
+        finally:
+            self.solve_log.flush()
+            observe_solve_phases(self.solve_log.phases)
+            record_phases(self.solve_log.phases)
+            write_rolling_log(self.solve_log.telemetry, {
+                "employees": len(self.employees),
+                "days": len(self.dates),
+                "optimizer": self.optimizer,
+                "relaxation_mode": self.relaxation_mode,
+                "matrix_api": self.use_matrix_api,
+                "size_class": self.size_class,
+                "solver_params": self.solver_params,
+            })
+            # Free solver memory and hand the environment back as soon as the result is built
+            self._dispose_model()
+            if self.env is not None:
+                get_env_pool().release(self.env)
+                self.env = None
+    
+    def _new_model(self, name: str) -> gp.Model:
+        """Create a model on this solve's pooled environment, disposing the previous model."""
+        self._dispose_model()
+        if self.env is None:
+            acquire_started = time.perf_counter()
+            self.env = get_env_pool().acquire()
+            logger.info(f"Acquired Gurobi environment in {(time.perf_counter() - acquire_started) * 1000:.1f} ms")
+        return gp.Model(name, env=self.env) if self.env is not None else gp.Model(name)
+    
+    def _dispose_model(self):
+        """Dispose the current model (if any) so its memory is released deterministically."""
+        if self.model is not None:
+            self.model.dispose()
+            self.model = None
+    
+    def _count_model(self, counters: Dict[str, Any]):
+        """Add model size counters to a SolveLog phase."""
+        self.model.update()
+        counters["vars"] = self.model.NumVars
+        counters["constrs"] = self.model.NumConstrs
+        counters["nonzeros"] = self.model.NumNZs
+    
+    def _apply_solver_params(self):
+        """Set the request's tuned (or explicitly given) Gurobi parameters on the current model."""
+        for name, value in self.solver_params.items():
+            try:
+                self.model.setParam(name, value)
+            except gp.GurobiError as e:
+                logger.warning(f"⚠️ Solver parameter {name}={value} not applied: {str(e)}")
+    
+    def _count_solve(self, counters: Dict[str, Any]):
+        """Add solver outcome counters to a SolveLog phase."""
+        counters["status"] = self.model.status
+        counters["solutions"] = self.model.SolCount
+        counters["nodes"] = int(self.model.NodeCount)
+        counters["runtime_s"] = round(self.model.Runtime, 3)
+        if self.model.SolCount > 0:
+            counters["objective"] = round(self.model.ObjVal, 2)
+            counters["gap"] = round(self.model.MIPGap, 6)
+    
+    def _build_and_solve(self, random_seed: Optional[int], min_staff_per_shift: int, min_experience_per_shift: int,
+                         include_weekends: bool, allow_partial_coverage: bool) -> Tuple[int, int]:
+        """Build the full model on a pooled environment and run the main solve; returns (status, SolCount)."""
+        # Create Gurobi model on a pooled (already started) environment
+        self.model = self._new_model("HealthcareScheduler")
+        
+        # Set random seed if provided
+        if random_seed is not None:
+            self.model.setParam('Seed', random_seed)
+            logger.info(f"Set Gurobi random seed: {random_seed}")
+        
+        # Gurobi output goes to the request's captured log (see SolveLog), not stdout
+        self.model.setParam('LogToConsole', 0)
+        self.model.setParam('OutputFlag', 1)
+        
+        # 30 seconds should be enough for small problems; with a request deadline the first
+        # solve keeps part of the remaining time for relaxation attempts
+        main_share = 1.0 if self.relaxation_mode == "elastic" else MAIN_SOLVE_BUDGET_SHARE
+        self.solve_budget.apply(self.model, default_seconds=30, share=main_share, phase="Main solve")
+        self._apply_solver_params()
+        
+        with self.solve_log.phase("build_model") as counters:
+            # Create decision variables (feasible cells only)
+            with self.solve_log.step(counters, "variables"):
+                self._create_variables()
+            
+            with self.solve_log.step(counters, "constraints"):
+                # Add constraints
+                self._add_constraints(min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage)
+                
+                # Add employee preference constraints
+                lap = self.solve_log.lap_timer()
+                self._add_employee_preference_constraints()
+                lap("preferences")
+                
+                # Add AI constraints (from natural language parsing)
+                self._add_ai_constraints()
+                lap("ai")
+            
+            # Set objective function
+            with self.solve_log.step(counters, "objective"):
+                self._set_objective()
+            
+            # Load previous schedule as MIP start (if provided)
+            self._apply_warm_start()
+            self._count_model(counters)
+        
+        # Complete the MIP start with the heuristic schedule (if requested)
+        if self.heuristic_start:
+            self._apply_heuristic_start(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage, random_seed)
+        
+        # Optimize
+        logger.info("Starting Gurobi optimization...")
+        with self.solve_log.phase("solve") as counters:
+            self._optimize()
+            self._count_solve(counters)
+        
+        return self.model.status, self.model.SolCount
+    
+    def _diagnose_infeasibility(self, min_staff_per_shift: int, min_experience_per_shift: int,
+                                include_weekends: bool, allow_partial_coverage: bool) -> Dict[str, Any]:
+        """
+        Compute an IIS of the original requirements and map it to readable causes.
+        
+        The diagnosis model is built per variable (constraint names identify day, shift and
+        employee) and, unlike the solve model, keeps a variable with upper bound 0 for every
+        hard-blocked cell so preference blocks can show up in the IIS. computeIIS runs under
+        IIS_TIME_LIMIT (and the request deadline); when the limit is hit the IIS found so far
+        is reported as "partial".
+        """
+        compiled = self.compiled_preferences
+        saved = (self.cell_mask, self.cell_employee, self.cell_day, self.cell_shift, self.cell_position,
+                 self.use_matrix_api, self.shifts, self.elastic_slacks)
+        diagnosis = {"method": "iis", "status": "failed", "causes": [], "summary": ""}
+        started = time.perf_counter()
+        try:
+            with self.solve_log.phase("diagnose_infeasibility") as counters:
+                self.cell_mask = self.cell_mask | compiled.blocked
+                self._index_cells()
+                self.use_matrix_api = False
+                self.shifts = {}
+                self.elastic_slacks = []
+                
+                self.model = self._new_model("ScheduleDiagnosis")
+                self.model.setParam('LogToConsole', 0)
+                self.model.setParam('OutputFlag', 1)
+                self._create_variables()
+                self._add_constraints(min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage)
+                self._add_employee_preference_constraints()
+                self._add_ai_constraints()
+                self._count_model(counters)
+                
+                time_limit = self.solve_budget.time_limit(IIS_TIME_LIMIT)
+                self.model.setParam('TimeLimit', min(time_limit, IIS_TIME_LIMIT))
+                try:
+                    self.model.computeIIS()
+                except gp.GurobiError as e:
+                    if e.errno == GRB.Error.IIS_NOT_INFEASIBLE:
+                        diagnosis["status"] = "feasible"
+                        diagnosis["summary"] = "The requirements are feasible without relaxation; the solve ran out of time or nodes."
+                    else:
+                        diagnosis["error"] = str(e)
+                        logger.warning(f"IIS computation failed: {str(e)}")
+                    counters["status"] = diagnosis["status"]
+                    return diagnosis
+                
+                constrs = self.model.getConstrs()
+                in_iis = self.model.getAttr("IISConstr", constrs)
+                names = self.model.getAttr("ConstrName", constrs)
+                rhs = self.model.getAttr("RHS", constrs)
+                constraints = [(name, value) for name, value, flagged in zip(names, rhs, in_iis) if flagged]
+                
+                keys = list(self.shifts.keys())
+                cell_vars = list(self.shifts.values())
+                upper_in_iis = self.model.getAttr("IISUB", cell_vars)
+                lower_in_iis = self.model.getAttr("IISLB", cell_vars)
+                upper = self.model.getAttr("UB", cell_vars)
+                lower = self.model.getAttr("LB", cell_vars)
+                blocked_cells, required_cells = [], []
+                for (emp_id, d, shift), ub_flag, lb_flag, ub, lb in zip(keys, upper_in_iis, lower_in_iis, upper, lower):
+                    if ub_flag and ub == 0:
+                        e = self.index.employee_index[emp_id]
+                        blocked_cells.append((emp_id, d, shift, int(compiled.block_reason[e, d, self.shift_types.index(shift)])))
+                    if lb_flag and lb == 1:
+                        required_cells.append((emp_id, d, shift))
+                
+                causes = explain_iis(constraints, blocked_cells, required_cells, self.index)
+                diagnosis.update({
+                    "status": "complete" if self.model.IISMinimal else "partial",
+                    "causes": causes,
+                    "summary": summarize_causes(causes),
+                    "constraints": len(constraints),
+                    "bounds": len(blocked_cells) + len(required_cells),
+                })
+                counters["status"] = diagnosis["status"]
+                counters["causes"] = len(causes)
+                logger.warning(f"🧩 Infeasibility diagnosis ({diagnosis['status']}): {summarize_causes(causes, 5)}")
+                return diagnosis
+        finally:
+            diagnosis["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            (self.cell_mask, self.cell_employee, self.cell_day, self.cell_shift, self.cell_position,
+             self.use_matrix_api, self.shifts, self.elastic_slacks) = saved
+            self._expr_cache = {}
+            self._var_groups = {}
+    
+    def _error_detail(self, message: str, report: Optional[FeasibilityReport] = None) -> Dict[str, Any]:
+        """
+        HTTPException detail for an infeasible request, as structured data.
+        
+        Args:
+            message: Error message
+            report: Failed feasibility screen whose first bottlenecks (by day and shift) are included
+        
+        Returns:
+            {"message", "bottlenecks"/"total_bottlenecks" with a report, "infeasibility_diagnosis"
+            (status, causes, summary) when a diagnosis ran}
+        """
+        detail: Dict[str, Any] = {"message": message}
+        if report is not None:
+            detail["bottlenecks"] = report.bottlenecks[:MAX_REPORTED_BOTTLENECKS]
+            detail["total_bottlenecks"] = len(report.bottlenecks)
+        if self.infeasibility_diagnosis is not None:
+            detail["infeasibility_diagnosis"] = self.infeasibility_diagnosis
+        return detail
+    
+    def _staffing_limits(self, min_staff_per_shift: int, allow_partial_coverage: bool) -> Tuple:
+        """
+        Slot demand and capacity plus total and weekly shift limits, as enforced by _add_constraints.
+        
+        Returns:
+            (slot_demand, slot_capacity, total_limits, weekly_limits); weekly_limits is None for
+            periods shorter than 5 days, where no weekly constraint applies
+        """
+        compiled = self.compiled_preferences
+        n_days, n_shifts = len(self.dates), len(self.shift_types)
+        
+        # Minimum staff is only enforced on scheduled days without partial coverage
+        slot_demand = np.zeros((n_days, n_shifts), dtype=np.int64)
+        if not allow_partial_coverage:
+            slot_demand[self.scheduled_days, :] = min_staff_per_shift
+        
+        # Maximum staff per shift, as in constraint 3 of _add_constraints
+        if not self.optimize_for_cost and self.max_staff_per_shift is not None and self.max_staff_per_shift > 0:
+            max_staff = self.max_staff_per_shift
+        else:
+            max_staff = min_staff_per_shift
+        slot_capacity = np.full((n_days, n_shifts), max_staff, dtype=np.int64)
+        
+        work_percentages = [emp.get('work_percentage', 100) for emp in self.employees]
+        total_limits = np.array([self._total_shift_limit(wp) for wp in work_percentages], dtype=np.int64)
+        
+        # Default and custom weekly limits (both only apply for periods of 5+ days)
+        weekly_limits = None
+        if n_days / 7.0 >= 0.7:
+            week_starts = list(range(0, n_days, 7))
+            weekly_limits = np.array([
+                [self._weekly_shift_limit(wp, min(week_start + 7, n_days) - week_start) for week_start in week_starts]
+                for wp in work_percentages
+            ], dtype=np.int64)
+            for emp_id, max_shifts_per_week in compiled.weekly_limits.items():
+                e = self.index.employee_index.get(emp_id)
+                if e is not None:
+                    for w, week_start in enumerate(week_starts):
+                        days_in_week = min(week_start + 7, n_days) - week_start
+                        weekly_limits[e, w] = min(weekly_limits[e, w], max_shifts_per_week, days_in_week)
+        
+        return slot_demand, slot_capacity, total_limits, weekly_limits
+    
+    def _screen_feasibility(self, min_staff_per_shift: int, min_experience_per_shift: int, allow_partial_coverage: bool,
+                            include_required: bool = True) -> FeasibilityReport:
+        """
+        Run the pre-solve screen with the same staffing, experience and shift limits as _add_constraints.
+        
+        include_required=False screens the rebuild relaxation models, which do not apply
+        AI hard_required cells.
+        """
+        compiled = self.compiled_preferences
+        slot_demand, slot_capacity, total_limits, weekly_limits = self._staffing_limits(min_staff_per_shift, allow_partial_coverage)
+        
+        report = screen_feasibility(
+            open_cells=self.cell_mask & ~compiled.blocked,
+            required=compiled.required if include_required else np.zeros_like(compiled.required),
+            blocked=compiled.blocked,
+            slot_demand=slot_demand,
+            slot_capacity=slot_capacity,
+            experience=np.array([emp.get('experience_level', 1) for emp in self.employees], dtype=float),
+            min_experience_per_shift=min_experience_per_shift,
+            total_limits=total_limits,
+            weekly_limits=weekly_limits,
+            date_strings=self.index.date_strings,
+            shift_types=self.shift_types,
+            employee_ids=[emp['id'] for emp in self.employees],
+        )
+        for bottleneck in report.bottlenecks[:MAX_REPORTED_BOTTLENECKS]:
+            self.solve_log.detail("  Bottleneck (%s): %s", bottleneck["check"], bottleneck["message"])
+        return report
+    
+    def _skip_main_solve(self, min_experience_per_shift: int) -> bool:
+        """
+        Act on the feasibility screen before building the model.
+        
+        In elastic mode only required-cell conflicts are fatal (400 with the bottlenecks),
+        since slack absorbs staffing and experience shortfalls. In rebuild mode a failed
+        screen proves the main model infeasible, so it is skipped and the relaxation loop
+        starts right away.
+        """
+        report = self.feasibility
+        if report.feasible:
+            return False
+        
+        logger.warning(f"🔎 Feasibility screen found {len(report.bottlenecks)} bottlenecks in {report.elapsed_ms:.1f} ms: {report.summary(3)}")
+        if self.relaxation_mode == "elastic":
+            if report.required_conflict:
+                raise HTTPException(
+                    status_code=400,
+                    detail=self._error_detail("Required shifts conflict with blocks or shift limits.", report)
+                )
+            return False
+        
+        logger.warning(f"Requirements cannot be met (min experience {min_experience_per_shift}) - skipping the main solve")
+        return True
+    
+    def _relaxation_levels(self, min_staff_per_shift: int, original_experience_requirement: int,
+                           allow_partial_coverage: bool) -> List[int]:
+        """
+        Experience levels the rebuild relaxation tries, highest first.
+        
+        The relaxed models (no AI hard_required cells) are screened first: staffing
+        bottlenecks make every attempt infeasible (400), and levels above the screened
+        maximum experience need no model.
+        """
+        # Create a list of progressively lower experience requirements to try
+        relaxation_attempts = []
+        if original_experience_requirement > 1:
+            for experience_level in range(original_experience_requirement - 1, 0, -1):
+                relaxation_attempts.append(experience_level)
+        
+        # Always try with minimum experience = 1 as final fallback
+        if 1 not in relaxation_attempts:
+            relaxation_attempts.append(1)
+        
+        with self.solve_log.phase("feasibility_screen_relaxed") as counters:
+            relaxed_screen = self._screen_feasibility(
+                min_staff_per_shift, original_experience_requirement, allow_partial_coverage, include_required=False
+            )
+            counters["feasible"] = relaxed_screen.feasible
+            counters["bottlenecks"] = len(relaxed_screen.bottlenecks)
+        if not relaxed_screen.staffing_feasible:
+            logger.error(f"Not enough available staff even with relaxed constraints: {relaxed_screen.summary(3)}")
+            raise HTTPException(
+                status_code=400,
+                detail=self._error_detail("No feasible schedule found even with relaxed constraints. Not enough available staff.", relaxed_screen)
+            )
+        max_screened = relaxed_screen.max_experience_per_shift
+        if max_screened is not None:
+            relaxation_attempts = [level for level in relaxation_attempts if level <= max(max_screened, 1)]
+        return relaxation_attempts
+    
+    def _select_variable_cells(self, include_weekends: bool):
+        """
+        Decide which (employee, day, shift) cells get a decision variable.
+        
+        Cells that are hard-blocked, belong to an employee without shift capacity
+        (0% work_percentage) or fall on an unscheduled weekend are structurally zero
+        and get no variable at all. Required cells always keep their variable so a
+        conflicting block still surfaces as infeasibility.
+        """
+        compiled = self.compiled_preferences
+        self.scheduled_days = [d for d, date in enumerate(self.dates) if include_weekends or date.weekday() < 5]
+        
+        scheduled = np.zeros(len(self.dates), dtype=bool)
+        scheduled[self.scheduled_days] = True
+        active_employees = np.array(
+            [self._total_shift_limit(emp.get('work_percentage', 100)) > 0 for emp in self.employees], dtype=bool
+        )
+        
+        self.cell_mask = (
+            ~compiled.blocked & active_employees[:, None, None] & scheduled[None, :, None]
+        ) | compiled.required
+        self._index_cells()
+        
+        skipped = self.cell_mask.size - self.cell_employee.size
+        logger.info(
+            f"Variable cells: {self.cell_employee.size} of {self.cell_mask.size} "
+            f"({skipped} structurally impossible cells skipped)"
+        )
+    
+    def _index_cells(self):
+        """Cell order of the variable cells: (employee, day, shift) index arrays and the inverse position tensor."""
+        self.cell_employee, self.cell_day, self.cell_shift = np.nonzero(self.cell_mask)
+        self.cell_position = np.full(self.cell_mask.shape, -1, dtype=np.int64)
+        self.cell_position[self.cell_mask] = np.arange(self.cell_employee.size)
     
     def _create_variables(self):
         """Create binary decision variables for each employee-date-shift combination."""
-        logger.info("Creating decision variables...")
+        if self.use_matrix_api:
+            # Aggregates come from sparse matrices (_matrix_aggregate), no per-variable grouping
+            self._create_matrix_variables()
+            self._var_groups = {}
+            self._expr_cache = {}
+            return
+        
+        self.solve_log.detail("Creating decision variables...")
         
         # Binary variable: 1 if employee e works shift s on day d, 0 otherwise
-        for emp in self.employees:
-            for d, date in enumerate(self.dates):
-                for shift in self.shift_types:
-                    var_name = f"x_{emp['id']}_{d}_{shift}"
-                    self.shifts[(emp['id'], d, shift)] = self.model.addVar(
-                        vtype=GRB.BINARY,
-                        name=var_name
-                    )
+        # Only feasible cells get a variable (see _select_variable_cells)
+        for e, d, s in zip(self.cell_employee.tolist(), self.cell_day.tolist(), self.cell_shift.tolist()):
+            emp_id, shift = self.employees[e]['id'], self.shift_types[s]
+            self.shifts[(emp_id, d, shift)] = self.model.addVar(
+                vtype=GRB.BINARY,
+                name=f"x_{emp_id}_{d}_{shift}"
+            )
+        
+        self.solve_log.detail("Created %d decision variables", len(self.shifts))
+        self._build_expression_cache()
+    
+    def _build_expression_cache(self):
+        """
+        Group the decision variables into the aggregates shared by constraints and objective.
+        
+        One pass over the cells assigns every variable to its per-employee total,
+        employee×day, employee×week, employee×shift-type and employee weekend groups and
+        to its day×shift staffing (and experience) group. The linear expression for a
+        group is built on first use by _aggregate and reused afterwards; the cache is
+        reset whenever a new model's variables are created.
+        """
+        groups = defaultdict(lambda: ([], []))
+        experience = [emp.get('experience_level', 1) for emp in self.employees]
+        weekend_days = [self._is_weekend(date) for date in self.dates]
+        
+        # self.shifts is filled in cell order
+        for var, e, d, s in zip(self.shifts.values(), self.cell_employee.tolist(),
+                                self.cell_day.tolist(), self.cell_shift.tolist()):
+            emp_id, shift = self.employees[e]['id'], self.shift_types[s]
+            keys = [
+                ('employee', emp_id),
+                ('employee_day', emp_id, d),
+                ('employee_week', emp_id, d // 7),
+                ('employee_shift', emp_id, shift),
+                ('slot', d, shift),
+                ('shift', shift),
+            ]
+            if weekend_days[d]:
+                keys.append(('employee_weekend', emp_id))
+            for key in keys:
+                coefficients, variables = groups[key]
+                coefficients.append(1.0)
+                variables.append(var)
+            coefficients, variables = groups[('slot_experience', d, shift)]
+            coefficients.append(float(experience[e]))
+            variables.append(var)
+        
+        self._var_groups = dict(groups)
+        self._expr_cache = {}
+        logger.debug(f"Grouped {len(self.shifts)} decision variables into {len(self._var_groups)} aggregates")
+    
+    def _aggregate(self, *key) -> gp.LinExpr:
+        """
+        Cached linear expression for one aggregate, e.g. _aggregate('employee', emp_id).
         
-        logger.info(f"Created {len(self.shifts)} decision variables")
+        Groups without any decision variable (every cell blocked) sum to an empty expression.
+        """
+        expr = self._expr_cache.get(key)
+        if expr is None:
+            coefficients, variables = self._var_groups.get(key, ([], []))
+            expr = gp.LinExpr(coefficients, variables)
+            self._expr_cache[key] = expr
+        return expr
+    
+    def _group_keys(self, family: str) -> List[Tuple]:
+        """Keys (without the family) of the aggregates of a family that have variables, in cell order."""
+        return [key[1:] for key in self._var_groups if key[0] == family]
     
     def _add_constraints(self, min_staff_per_shift: int, min_experience_per_shift: int, include_weekends: bool, allow_partial_coverage: bool = False):
         """Add all constraints to the model."""
-        logger.info(f"Adding constraints... (allow_partial_coverage={allow_partial_coverage})")
+        if self.use_matrix_api:
+            self._add_matrix_constraints(min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage)
+            return
         
+        self.solve_log.detail("Adding constraints... (allow_partial_coverage=%s)", allow_partial_coverage)
+        lap = self.solve_log.lap_timer()  # Build time per constraint family
+        
+        # Upper limits are only added for aggregates with variables; an empty one is 0 <= limit
         # 1. Each employee works at most 1 shift per day
-        for emp in self.employees:
-            for d in range(len(self.dates)):
-                self.model.addConstr(
-                    gp.quicksum(self.shifts[(emp['id'], d, shift)] for shift in self.shift_types) <= 1,
-                    name=f"max_one_shift_per_day_{emp['id']}_{d}"
-                )
+        for emp_id, d in self._group_keys('employee_day'):
+            self.model.addConstr(
+                self._aggregate('employee_day', emp_id, d) <= 1,
+                name=f"max_one_shift_per_day_{emp_id}_{d}"
+            )
         
         # 2. Each employee works at most 5 days per week (legal constraint)
         # Only apply this constraint for periods longer than a few days
         # Note: Individual employee preferences can override this in _add_employee_preference_constraints
         total_weeks = len(self.dates) / 7.0
         
-        # Initialize tracking for employee preferences
-        self.employees_with_custom_weekly_limits = set()
-        self.employee_shift_preferences = {}  # Track preferred vs non-preferred shifts
-        
         if total_weeks >= 0.7:  # Only apply weekly constraint for periods 5+ days
-            for emp in self.employees:
+            for emp_id, week in self._group_keys('employee_week'):
+                emp = self.employees[self.index.employee_index[emp_id]]
                 # Calculate max shifts per week based on work_percentage
                 work_percentage = emp.get('work_percentage', 100)  # Default to 100% if not specified
                 
-                # Split dates into weeks
-                for week_start in range(0, len(self.dates), 7):
-                    week_end = min(week_start + 7, len(self.dates))
-                    week_days = list(range(week_start, week_end))
-                    
-                    # For partial weeks, adjust the limit proportionally
-                    days_in_week = len(week_days)
-                    
-                    # Calculate max shifts based on work_percentage
-                    # Full-time (100%) = max 5 days per week
-                    # Part-time should be proportional: 20% = 1 day per week, 40% = 2 days, etc.
-                    base_max_shifts = min(5, days_in_week)  # Legal limit is still 5 days max
-                    
-                    # Calculate exact shifts allowed based on percentage
-                    # Don't use max(1, ...) to allow for very low percentages
-                    exact_shifts_allowed = (work_percentage / 100.0) * base_max_shifts
-                    
-                    # Use floor for individual weeks, but allow the global constraint to handle
-                    # the exact percentage distribution over the entire period
-                    max_shifts_this_week = int(exact_shifts_allowed)
-                    
-                    # For very low percentages, we need to allow some weeks to have 1 shift
-                    # even if the weekly calculation gives 0, so the global constraint can work
-                    # Allow up to 1 shift per week for any non-zero percentage
-                    if work_percentage > 0 and max_shifts_this_week == 0:
-                        max_shifts_this_week = 1  # Allow 1 shift per week, global constraint will limit total
-                    
-                    logger.debug(f"Employee {emp.get('first_name', 'Unknown')} ({work_percentage}%): max {max_shifts_this_week} shifts this week (exact: {exact_shifts_allowed:.2f}, base: {base_max_shifts})")
-                    
-                    # Sum all shifts for this employee in this week
-                    weekly_shifts = gp.quicksum(
-                        self.shifts[(emp['id'], d, shift)]
-                        for d in week_days
-                        for shift in self.shift_types
-                    )
-                    
-                    # Add constraint with a name that can be referenced later
-                    constraint_name = f"default_max_{max_shifts_this_week}_days_per_week_{emp['id']}_week_{week_start}"
-                    self.model.addConstr(
-                        weekly_shifts <= max_shifts_this_week,
-                        name=constraint_name
-                    )
+                # For partial weeks, adjust the limit proportionally
+                week_start = week * 7
+                days_in_week = min(week_start + 7, len(self.dates)) - week_start
+                
+                # Full-time (100%) = max 5 days per week, part-time proportionally fewer
+                max_shifts_this_week = self._weekly_shift_limit(work_percentage, days_in_week)
+                
+                self.solve_log.detail("Employee %s (%s%%): max %d shifts this week (%d days)", emp.get('first_name', 'Unknown'), work_percentage, max_shifts_this_week, days_in_week)
+                
+                # Sum all shifts for this employee in this week
+                weekly_shifts = self._aggregate('employee_week', emp_id, week)
+                
+                # Add constraint with a name that can be referenced later
+                constraint_name = f"default_max_{max_shifts_this_week}_days_per_week_{emp_id}_week_{week_start}"
+                self.model.addConstr(
+                    weekly_shifts <= max_shifts_this_week,
+                    name=constraint_name
+                )
         else:
             logger.info(f"Skipping weekly constraint for short period ({len(self.dates)} days)")
         
         # 2b. Add GLOBAL work_percentage constraint for the entire period
         # This ensures total shifts over the whole period respect work_percentage exactly
-        logger.info("Adding global work_percentage constraints for entire period...")
-        for emp in self.employees:
+        self.solve_log.detail("Adding global work_percentage constraints for entire period...")
+        for emp_id, in self._group_keys('employee'):
+            emp = self.employees[self.index.employee_index[emp_id]]
             work_percentage = emp.get('work_percentage', 100)
             
             # Calculate total max shifts for this employee over entire period
-            total_weeks = len(self.dates) / 7.0
-            total_max_shifts_exact = (work_percentage / 100.0) * total_weeks * 5  # 5 = max shifts per week
-            total_max_shifts = int(total_max_shifts_exact)
-            
-            # Don't force a minimum - let the percentage be exactly respected
-            # Even 0% should be allowed to get 0 shifts
-            if work_percentage > 0 and total_max_shifts_exact >= 0.5:
-                # If the exact calculation is at least 0.5, round up to give at least 1 shift
-                total_max_shifts = max(1, total_max_shifts)
-            else:
-                # Otherwise, use the floor (which could be 0 for very low percentages)
-                total_max_shifts = total_max_shifts
+            total_max_shifts = self._total_shift_limit(work_percentage)
             
             # Sum all shifts for this employee across the entire period
-            employee_total_shifts = gp.quicksum(
-                self.shifts[(emp['id'], d, shift)]
-                for d in range(len(self.dates))
-                for shift in self.shift_types
-            )
+            employee_total_shifts = self._aggregate('employee', emp_id)
             
             # Add global constraint
             self.model.addConstr(
                 employee_total_shifts <= total_max_shifts,
-                name=f"global_work_percentage_{emp['id']}_max_{total_max_shifts}"
+                name=f"global_work_percentage_{emp_id}_max_{total_max_shifts}"
             )
             
-            logger.debug(f"Employee {emp.get('first_name', 'Unknown')} ({work_percentage}%): global max {total_max_shifts} shifts over {total_weeks:.1f} weeks (exact: {total_max_shifts_exact:.2f})")
-        
-        logger.info("Global work_percentage constraints added successfully")
+            self.solve_log.detail("Employee %s (%s%%): global max %d shifts over %.1f weeks", emp.get('first_name', 'Unknown'), work_percentage, total_max_shifts, total_weeks)
         
-        # 3. Minimum staff coverage per shift - ensure all days are scheduled
-        self.scheduled_days = list(range(len(self.dates)))  # Schedule all days
+        self.solve_log.detail("Global work_percentage constraints added successfully")
+        lap("work_limits")
         
+        # 3. Minimum staff coverage per shift
         for d in range(len(self.dates)):
             date = self.dates[d]
             
@@ -477,23 +1119,24 @@ class GurobiScheduleOptimizer:
             
             for shift in self.shift_types:
                 # Ensure minimum staff per shift
-                total_staff = gp.quicksum(
-                    self.shifts[(emp['id'], d, shift)] for emp in self.employees
-                )
+                total_staff = self._aggregate('slot', d, shift)
                 
                 # Only enforce minimum staff constraint if NOT allowing partial coverage
                 if required_staff > 0 and not allow_partial_coverage:
                     self.model.addConstr(
-                        total_staff >= required_staff,
+                        total_staff + self._elastic_slack("min_staff", d, shift, required_staff) >= required_staff,
                         name=f"min_staff_{d}_{shift}"
                     )
                 elif allow_partial_coverage:
                     # When allowing partial coverage, minimum staff becomes a soft constraint
                     # The optimizer will try to maximize coverage without failing if impossible
-                    logger.info(f"Allowing partial coverage for {date} {shift} shift")
+                    self.solve_log.detail("Allowing partial coverage for %s %s shift", date, shift)
                 
                 # Maximum staff constraint (overstaffing control)
-                if self.optimize_for_cost:
+                if ('slot', d, shift) not in self._var_groups:
+                    # Nobody can work this shift: the cap would be an empty 0 <= max row
+                    self.solve_log.detail("No employee can work %s %s shift, skipping max staff", date, shift)
+                elif self.optimize_for_cost:
                     # COST MODE: Prevent overstaffing - use exact staffing (min = max)
                     self.model.addConstr(
                         total_staff <= min_staff_per_shift,
@@ -505,7 +1148,7 @@ class GurobiScheduleOptimizer:
                         total_staff <= self.max_staff_per_shift,
                         name=f"max_staff_{d}_{shift}"
                     )
-                    logger.debug(f"Allowing up to {self.max_staff_per_shift} staff per shift for work% filling")
+                    self.solve_log.detail("Allowing up to %d staff per shift for work%% filling", self.max_staff_per_shift)
                 else:
                     # WORK% MODE without explicit max: Use min_staff as the limit
                     # This prevents overstaffing and forces fair distribution across different shifts
@@ -513,30 +1156,28 @@ class GurobiScheduleOptimizer:
                         total_staff <= min_staff_per_shift,
                         name=f"max_staff_{d}_{shift}"
                     )
-                    logger.debug(f"Using min_staff_per_shift ({min_staff_per_shift}) as max to ensure fair distribution across shifts")
+                    self.solve_log.detail("Using min_staff_per_shift (%d) as max to ensure fair distribution across shifts", min_staff_per_shift)
                 
                 
                 # 4. Minimum experience level per shift
                 # Calculate total experience points for this shift
                 if min_experience_per_shift > 0:
-                    total_experience = gp.quicksum(
-                        self.shifts[(emp['id'], d, shift)] * emp.get('experience_level', 1)
-                        for emp in self.employees
-                    )
+                    total_experience = self._aggregate('slot_experience', d, shift)
                     
                     # Only enforce minimum experience constraint if we require staff for this shift
                     if required_staff > 0 and not allow_partial_coverage:
                         self.model.addConstr(
-                            total_experience >= min_experience_per_shift,
+                            total_experience + self._elastic_slack("min_experience", d, shift, min_experience_per_shift) >= min_experience_per_shift,
                             name=f"min_experience_{d}_{shift}"
                         )
-                        logger.debug(f"Added experience constraint: {date} {shift} requires {min_experience_per_shift} experience points")
+                        self.solve_log.detail("Added experience constraint: %s %s requires %d experience points", date, shift, min_experience_per_shift)
+        lap("staffing")
         
         # NEW: Add constraint to ensure MINIMUM coverage per shift type
         # This prevents all shifts being assigned to just one type (e.g., all morning shifts)
         # BUT we make it flexible enough to respect employee preferences
         if not allow_partial_coverage:
-            logger.info("Adding minimum shift type coverage constraints...")
+            self.solve_log.detail("Adding minimum shift type coverage constraints...")
             
             # Calculate minimum required coverage per shift type
             # We require at least min_staff for each shift type on each day
@@ -544,411 +1185,294 @@ class GurobiScheduleOptimizer:
             for shift_type in self.shift_types:
                 # Each shift type needs at least min_staff * days coverage
                 # This ensures we don't skip entire shift types
-                total_days_to_cover = len(self.dates)
+                total_days_to_cover = len(self.scheduled_days)
                 min_coverage_for_shift_type = total_days_to_cover * min_staff_per_shift
                 
                 # Count total filled shifts for this shift type across all days
-                shift_type_coverage = gp.quicksum(
-                    self.shifts[(emp['id'], d, shift_type)]
-                    for emp in self.employees
-                    for d in range(len(self.dates))
-                )
+                shift_type_coverage = self._aggregate('shift', shift_type)
                 
                 # Require minimum coverage (all days must be covered for each shift type)
                 self.model.addConstr(
-                    shift_type_coverage >= min_coverage_for_shift_type,
+                    shift_type_coverage + self._elastic_slack("min_coverage", None, shift_type, min_coverage_for_shift_type) >= min_coverage_for_shift_type,
                     name=f"min_coverage_{shift_type}"
                 )
-                logger.info(f"  {shift_type} shifts: minimum {min_coverage_for_shift_type} person-shifts required ({total_days_to_cover} days × {min_staff_per_shift} staff)")
+                self.solve_log.detail("  %s shifts: minimum %d person-shifts required (%d days × %d staff)", shift_type, min_coverage_for_shift_type, total_days_to_cover, min_staff_per_shift)
+        
+        lap("coverage")
         
         logger.info(f"Scheduling {len(self.scheduled_days)} days out of {len(self.dates)} total days")
-        logger.info("All constraints added successfully")
+        self.solve_log.detail("All constraints added successfully")
     
-    def _add_employee_preference_constraints(self):
-        """Add constraints based on individual employee preferences."""
-        if not self.employee_preferences:
-            logger.info("No employee preferences provided, skipping preference constraints")
-            return
+    def _weekly_shift_limit(self, work_percentage: float, days_in_week: int) -> int:
+        """Max shifts in one (possibly partial) week for an employee with the given work_percentage."""
+        # Legal limit is still 5 days max; use floor for individual weeks and let the
+        # global constraint handle the exact percentage distribution over the period
+        base_max_shifts = min(5, days_in_week)
+        max_shifts_this_week = int((work_percentage / 100.0) * base_max_shifts)
+        
+        # For very low percentages, allow 1 shift per week so the global constraint can work
+        if work_percentage > 0 and max_shifts_this_week == 0:
+            max_shifts_this_week = 1
+        return max_shifts_this_week
+    
+    def _total_shift_limit(self, work_percentage: float) -> int:
+        """Max shifts over the entire period for an employee with the given work_percentage."""
+        total_weeks = len(self.dates) / 7.0
+        total_max_shifts_exact = (work_percentage / 100.0) * total_weeks * 5  # 5 = max shifts per week
+        total_max_shifts = int(total_max_shifts_exact)
+        
+        # Don't force a minimum - even 0% should be allowed to get 0 shifts,
+        # but an exact value of at least 0.5 rounds up to 1 shift
+        if work_percentage > 0 and total_max_shifts_exact >= 0.5:
+            total_max_shifts = max(1, total_max_shifts)
+        return total_max_shifts
+    
+    def _create_matrix_variables(self):
+        """
+        Create all employee-date-shift binaries with a single addMVar call.
         
-        logger.info(f"Adding employee preference constraints for {len(self.employee_preferences)} employees")
+        Feasible cells live in one flat MVar; cell_employee / cell_day / cell_shift map
+        each position back to its (employee, day, shift) indices so constraint families
+        can be expressed as sparse aggregation matrices, and cell_position maps cells to
+        positions for bounds and start values. No per-variable Python object is created.
+        """
+        self.solve_log.detail("Creating decision variables (matrix API)...")
         
-        # Validate employee preferences data
-        valid_preferences = []
-        for pref in self.employee_preferences:
-            try:
-                # Basic validation
-                if not hasattr(pref, 'employee_id') or not pref.employee_id:
-                    logger.warning(f"Invalid preference: missing employee_id")
-                    continue
-                    
-                # Validate max_shifts_per_week
-                if hasattr(pref, 'max_shifts_per_week') and pref.max_shifts_per_week is not None:
-                    if not isinstance(pref.max_shifts_per_week, int) or pref.max_shifts_per_week < 0 or pref.max_shifts_per_week > 7:
-                        logger.warning(f"Invalid max_shifts_per_week for employee {pref.employee_id}: {pref.max_shifts_per_week}, using default 5")
-                        # We could set it to default here, but let the or 5 handle it
-                
-                # Validate available_days
-                if hasattr(pref, 'available_days') and pref.available_days:
-                    valid_days = {'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'}
-                    invalid_days = [day for day in pref.available_days if day.lower() not in valid_days]
-                    if invalid_days:
-                        logger.warning(f"Invalid available_days for employee {pref.employee_id}: {invalid_days}")
-                
-                valid_preferences.append(pref)
-                
-            except Exception as e:
-                logger.error(f"Error validating preferences for employee {getattr(pref, 'employee_id', 'unknown')}: {e}")
-                continue
+        self.shift_mvar = self.model.addMVar(self.cell_employee.size, vtype=GRB.BINARY, name="x")
         
-        if len(valid_preferences) != len(self.employee_preferences):
-            logger.warning(f"Filtered {len(self.employee_preferences)} preferences down to {len(valid_preferences)} valid ones")
+        self.solve_log.detail("Created %d decision variables", self.cell_employee.size)
+    
+    def _aggregation_matrix(self, rows: np.ndarray, n_rows: int, weights: Optional[np.ndarray] = None) -> sp.csr_matrix:
+        """
+        Sparse matrix that sums (optionally weighted) cells into rows.
         
-        # Initialize counters for summary
-        hard_blocked_count = 0
+        rows[i] is the row that cell i contributes to; cells with a negative row are left out.
+        """
+        n_cells = rows.size
+        keep = rows >= 0
+        data = np.ones(n_cells) if weights is None else np.asarray(weights, dtype=float)
+        return sp.csr_matrix(
+            (data[keep], (rows[keep], np.arange(n_cells)[keep])),
+            shape=(n_rows, n_cells)
+        )
+    
+    def _matrix_aggregate(self, family: str, rows: Optional[np.ndarray] = None):
+        """
+        Cached matrix expression (aggregation matrix @ x) with one row per aggregate of a family.
+        
+        With rows, only those aggregates are built; the rows are taken from the sparse
+        matrix before multiplying, which is much cheaper than indexing the expression.
+        
+        Families and row order:
+            employee          - employee
+            employee_day      - employee × day
+            employee_week     - employee × week
+            employee_shift    - shift type × employee
+            employee_weekend  - employee (weekend cells only)
+            slot              - day × shift type
+            slot_experience   - day × shift type, weighted by experience_level
+            shift             - shift type
+        """
+        key = ('matrix', family)
+        if rows is not None:
+            return self._family_matrix(family)[rows] @ self.shift_mvar
+        expr = self._expr_cache.get(key)
+        if expr is None:
+            expr = self._family_matrix(family) @ self.shift_mvar
+            self._expr_cache[key] = expr
+        return expr
+    
+    def _family_matrix(self, family: str) -> sp.csr_matrix:
+        """Cached aggregation matrix of a family (rows as in _matrix_aggregate, one column per cell)."""
+        key = ('matrix_rows', family)
+        matrix = self._expr_cache.get(key)
+        if matrix is not None:
+            return matrix
+        
+        n_employees, n_days, n_shifts = len(self.employees), len(self.dates), len(self.shift_types)
+        n_weeks = (n_days + 6) // 7
+        weights = None
+        if family == 'employee':
+            rows, n_rows = self.cell_employee, n_employees
+        elif family == 'employee_day':
+            rows, n_rows = self.cell_employee * n_days + self.cell_day, n_employees * n_days
+        elif family == 'employee_week':
+            rows, n_rows = self.cell_employee * n_weeks + self.cell_day // 7, n_employees * n_weeks
+        elif family == 'employee_shift':
+            rows, n_rows = self.cell_shift * n_employees + self.cell_employee, n_shifts * n_employees
+        elif family == 'employee_weekend':
+            weekend_days = np.array([self._is_weekend(date) for date in self.dates], dtype=bool)
+            rows, n_rows = np.where(weekend_days[self.cell_day], self.cell_employee, -1), n_employees
+        elif family in ('slot', 'slot_experience'):
+            rows, n_rows = self.cell_day * n_shifts + self.cell_shift, n_days * n_shifts
+            if family == 'slot_experience':
+                experience = np.array([emp.get('experience_level', 1) for emp in self.employees], dtype=float)
+                weights = experience[self.cell_employee]
+        elif family == 'shift':
+            rows, n_rows = self.cell_shift, n_shifts
+        else:
+            raise ValueError(f"Unknown aggregate family: {family}")
         
-        # Create a mapping from employee_id to preferences for quick lookup
-        pref_map = {pref.employee_id: pref for pref in valid_preferences}
+        matrix = self._aggregation_matrix(rows, n_rows, weights)
+        self._expr_cache[key] = matrix
+        return matrix
+    
+    def _add_matrix_constraints(self, min_staff_per_shift: int, min_experience_per_shift: int, include_weekends: bool, allow_partial_coverage: bool = False):
+        """Add the structural constraint families with one matrix constraint per family."""
+        self.solve_log.detail("Adding matrix constraints... (allow_partial_coverage=%s)", allow_partial_coverage)
+        lap = self.solve_log.lap_timer()  # Build time per constraint family
         
-        for emp in self.employees:
-            emp_id = emp['id']
-            pref = pref_map.get(emp_id)
-            
-            if not pref:
-                logger.debug(f"No preferences found for employee {emp_id}, using defaults")
-                continue
-            
-            logger.info(f"Applying preferences for employee {emp_id}")
-            
-            # 1. Available days constraint (can be hard or soft)
-            available_days = pref.available_days or []
-            available_days_strict = getattr(pref, 'available_days_strict', False)
-            logger.info(f"Employee {emp_id} available_days from preference: {available_days}")
-            logger.info(f"Employee {emp_id} available_days_strict: {available_days_strict}")
-            
-            if available_days:
-                # Convert day names to weekday numbers
-                day_name_to_weekday = {
-                    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-                    'friday': 4, 'saturday': 5, 'sunday': 6
-                }
-                
-                available_weekdays = [day_name_to_weekday.get(day.lower()) for day in available_days if day.lower() in day_name_to_weekday]
-                logger.info(f"Employee {emp_id} converted to weekday numbers: {available_weekdays}")
-                
-                if not available_weekdays:
-                    logger.warning(f"Employee {emp_id} has no valid available days, they will be blocked from all shifts")
-                    # Block all shifts for this employee (always hard constraint if no valid days)
-                    for d in range(len(self.dates)):
-                        for shift in self.shift_types:
-                            self.model.addConstr(
-                                self.shifts[(emp_id, d, shift)] == 0,
-                                name=f"no_valid_days_{emp_id}_{d}_{shift}"
-                            )
-                else:
-                    # Process each date based on availability
-                    blocked_days = 0
-                    logger.info(f"Employee {emp_id} processing dates for availability constraints (strict={available_days_strict})...")
-                    
-                    for d, date in enumerate(self.dates):
-                        weekday = date.weekday()  # 0=Monday, 6=Sunday
-                        day_name = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][weekday]
-                        
-                        if weekday not in available_weekdays:
-                            if available_days_strict:
-                                # HARD CONSTRAINT: Employee absolutely cannot work this day
-                                logger.info(f"Employee {emp_id} HARD BLOCKED from {day_name} {date.strftime('%Y-%m-%d')} (weekday={weekday})")
-                                for shift in self.shift_types:
-                                    self.model.addConstr(
-                                        self.shifts[(emp_id, d, shift)] == 0,
-                                        name=f"hard_unavailable_day_{emp_id}_{d}_{shift}"
-                                    )
-                                blocked_days += 1
-                            else:
-                                # SOFT CONSTRAINT: Track for penalty in objective function
-                                logger.info(f"Employee {emp_id} SOFT PENALTY for {day_name} {date.strftime('%Y-%m-%d')} (weekday={weekday})")
-                                # Store non-preferred days for objective function penalty
-                                if emp_id not in self.employee_day_penalties:
-                                    self.employee_day_penalties[emp_id] = []
-                                self.employee_day_penalties[emp_id].append(d)
-                        else:
-                            logger.info(f"Employee {emp_id} AVAILABLE on {day_name} {date.strftime('%Y-%m-%d')} (weekday={weekday})")
-                    
-                    if available_days_strict and blocked_days > 0:
-                        logger.info(f"Employee {emp_id} HARD blocked from {blocked_days} days, available on: {available_days}")
-                    elif not available_days_strict and emp_id in self.employee_day_penalties:
-                        logger.info(f"Employee {emp_id} has SOFT penalties for {len(self.employee_day_penalties[emp_id])} non-preferred days")
-            else:
-                logger.debug(f"Employee {emp_id} has no day restrictions (available all days)")
-            
-            # 2. EXCLUDED SHIFTS (HARD CONSTRAINT) - Process this FIRST
-            excluded_shifts = getattr(pref, 'excluded_shifts', [])
-            if excluded_shifts:
-                logger.info(f"Employee {emp_id} HARD EXCLUDED from shifts: {excluded_shifts}")
-                for d in range(len(self.dates)):
-                    for shift in excluded_shifts:
-                        if shift in self.shift_types:  # Validate shift type exists
-                            self.model.addConstr(
-                                self.shifts[(emp_id, d, shift)] == 0,
-                                name=f"excluded_shift_{emp_id}_{d}_{shift}"
-                            )
-            
-            # 3. EXCLUDED DAYS (HARD CONSTRAINT)
-            excluded_days = getattr(pref, 'excluded_days', [])
-            if excluded_days:
-                logger.info(f"Employee {emp_id} HARD EXCLUDED from days: {excluded_days}")
-                for d, date in enumerate(self.dates):
-                    day_name = date.strftime('%A').lower()
-                    if day_name in excluded_days:
-                        for shift in self.shift_types:
-                            self.model.addConstr(
-                                self.shifts[(emp_id, d, shift)] == 0,
-                                name=f"excluded_day_{emp_id}_{d}_{day_name}_{shift}"
-                            )
-            
-            # 4. Preferred shifts constraint (can be hard or soft) - Process AFTER exclusions
-            preferred_shifts = pref.preferred_shifts or self.shift_types
-            preferred_shifts_strict = getattr(pref, 'preferred_shifts_strict', False)
-            
-            # Calculate non-preferred shifts, but exclude the already excluded ones
-            all_non_excluded_shifts = [s for s in self.shift_types if s not in excluded_shifts]
-            non_preferred_shifts = [s for s in all_non_excluded_shifts if s not in preferred_shifts]
-            
-            logger.info(f"Employee {emp_id} preferred_shifts: {preferred_shifts}, excluded_shifts: {excluded_shifts}, strict: {preferred_shifts_strict}")
-            
-            if non_preferred_shifts:
-                if preferred_shifts_strict:
-                    # HARD CONSTRAINT: Employee absolutely cannot work non-preferred shifts (that aren't already excluded)
-                    logger.info(f"Employee {emp_id} HARD blocked from NON-PREFERRED shifts: {non_preferred_shifts}")
-                    for d in range(len(self.dates)):
-                        for shift in non_preferred_shifts:
-                            self.model.addConstr(
-                                self.shifts[(emp_id, d, shift)] == 0,
-                                name=f"hard_non_preferred_shift_{emp_id}_{d}_{shift}"
-                            )
-                else:
-                    # SOFT CONSTRAINT: Store preference information for objective function penalty
-                    logger.info(f"Employee {emp_id} SOFT penalty for shifts: {non_preferred_shifts} (prefers: {preferred_shifts})")
-                    
-                # Store preference information for objective function
-                self.employee_shift_preferences[emp_id] = {
-                    'preferred': preferred_shifts,
-                    'non_preferred': non_preferred_shifts,
-                    'excluded': excluded_shifts,  # Store excluded shifts for reference
-                    'strict': preferred_shifts_strict
-                }
-            else:
-                logger.debug(f"Employee {emp_id} has no shift preferences (all shifts acceptable)")
-            
-            # 3. Maximum shifts per week constraint (override default if specified)
-            max_shifts_per_week = pref.max_shifts_per_week or 5
-            if max_shifts_per_week != 5:  # Only add if different from default
-                total_weeks = len(self.dates) / 7.0
-                
-                # Mark this employee as having custom weekly limits
-                self.employees_with_custom_weekly_limits.add(emp_id)
-                
-                if total_weeks >= 0.7:  # Only apply weekly constraint for periods 5+ days
-                    for week_start in range(0, len(self.dates), 7):
-                        week_end = min(week_start + 7, len(self.dates))
-                        week_days = list(range(week_start, week_end))
-                        
-                        # For partial weeks, adjust the limit proportionally
-                        days_in_week = len(week_days)
-                        max_shifts_this_week = min(max_shifts_per_week, days_in_week)
-                        
-                        # Remove the default constraint for this employee and week if it exists
-                        default_constraint_name = f"default_max_{min(5, days_in_week)}_days_per_week_{emp_id}_week_{week_start}"
-                        try:
-                            # Gurobi doesn't have direct constraint removal, so we'll add our custom constraint
-                            # The solver will handle the constraint optimization
-                            pass
-                        except:
-                            pass
-                        
-                        # Sum all shifts for this employee in this week
-                        weekly_shifts = gp.quicksum(
-                            self.shifts[(emp_id, d, shift)]
-                            for d in week_days
-                            for shift in self.shift_types
-                        )
-                        
-                        self.model.addConstr(
-                            weekly_shifts <= max_shifts_this_week,
-                            name=f"custom_max_{max_shifts_this_week}_shifts_per_week_{emp_id}_week_{week_start}"
-                        )
-                        logger.info(f"Set custom max {max_shifts_this_week} shifts per week for employee {emp_id} (overrides default 5)")
-            else:
-                logger.debug(f"Employee {emp_id} uses default max 5 shifts per week")
-        
-        # 6. HARD BLOCKED TIME SLOTS (NEW!)
-        # These are specific date+shift combinations that employee absolutely cannot work
-        # Max 3 slots per employee, enforced as HARD constraints
-        hard_blocked_count = 0
-        for pref in valid_preferences:
-            emp_id = pref.employee_id
-            
-            # Check if employee has hard blocked slots
-            if hasattr(pref, 'hard_blocked_slots') and pref.hard_blocked_slots:
-                logger.info(f"Employee {emp_id} has {len(pref.hard_blocked_slots)} hard blocked time slots")
-                
-                for slot in pref.hard_blocked_slots:
-                    try:
-                        # Parse the date string (format: "YYYY-MM-DD")
-                        from datetime import datetime
-                        slot_date = datetime.strptime(slot.date, '%Y-%m-%d').date()
-                        
-                        # Find the index of this date in our scheduling period
-                        # dates is a list of date objects
-                        day_index = None
-                        for d, date in enumerate(self.dates):
-                            if date.date() == slot_date:
-                                day_index = d
-                                break
-                        
-                        if day_index is None:
-                            logger.warning(f"Hard blocked date {slot.date} for employee {emp_id} is outside scheduling period - skipping")
-                            continue
-                        
-                        # Block the specified shift types for this date
-                        for shift_type in slot.shift_types:
-                            if shift_type == 'all_day':
-                                # Block ALL shifts for this day (day, evening, night)
-                                logger.info(f"HARD BLOCK: Employee {emp_id} blocked for ALL shifts on {slot.date}")
-                                for shift in self.shift_types:
-                                    self.model.addConstr(
-                                        self.shifts[(emp_id, day_index, shift)] == 0,
-                                        name=f"hard_blocked_all_{emp_id}_{day_index}_{shift}"
-                                    )
-                                    hard_blocked_count += 1
-                            elif shift_type in self.shift_types:
-                                # Block specific shift type
-                                logger.info(f"HARD BLOCK: Employee {emp_id} blocked for {shift_type} shift on {slot.date}")
-                                self.model.addConstr(
-                                    self.shifts[(emp_id, day_index, shift_type)] == 0,
-                                    name=f"hard_blocked_{emp_id}_{day_index}_{shift_type}"
-                                )
-                                hard_blocked_count += 1
-                            else:
-                                logger.warning(f"Unknown shift type '{shift_type}' in hard blocked slot for employee {emp_id} - skipping")
-                    
-                    except ValueError as e:
-                        logger.error(f"Invalid date format in hard blocked slot for employee {emp_id}: {slot.date} - {e}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Error processing hard blocked slot for employee {emp_id}: {e}")
-                        continue
+        n_employees, n_days, n_shifts = len(self.employees), len(self.dates), len(self.shift_types)
+        work_percentages = [emp.get('work_percentage', 100) for emp in self.employees]
         
-        if hard_blocked_count > 0:
-            logger.info(f"✓ Added {hard_blocked_count} hard blocked time slot constraints")
+        # 1. Each employee works at most 1 shift per day
+        self.model.addConstr(self._matrix_aggregate('employee_day') <= 1, name="max_one_shift_per_day")
+        
+        # 2. Weekly limits based on work_percentage (only for periods 5+ days)
+        if n_days / 7.0 >= 0.7:
+            n_weeks = (n_days + 6) // 7
+            week_limits = np.array([
+                [self._weekly_shift_limit(wp, min(7, n_days - week * 7)) for week in range(n_weeks)]
+                for wp in work_percentages
+            ])
+            self.model.addConstr(self._matrix_aggregate('employee_week') <= week_limits.ravel(), name="default_max_days_per_week")
+        else:
+            logger.info(f"Skipping weekly constraint for short period ({n_days} days)")
+        
+        # 2b. Global work_percentage limit for the entire period
+        total_limits = np.array([self._total_shift_limit(wp) for wp in work_percentages])
+        self.model.addConstr(self._matrix_aggregate('employee') <= total_limits, name="global_work_percentage")
+        lap("work_limits")
+        
+        # 3. Staffing per (day, shift) slot
+        required_days = np.zeros(n_days, dtype=bool)
+        required_days[self.scheduled_days] = True
+        required_slots = np.repeat(required_days, n_shifts)
+        required_rows = np.flatnonzero(required_slots)
+        enforce_minimums = min_staff_per_shift > 0 and not allow_partial_coverage and required_slots.any()
+        
+        staffing = self._matrix_aggregate('slot')
+        required_slot_keys = [
+            (d, shift) for d in range(n_days) for shift in self.shift_types if required_days[d]
+        ]
+        if enforce_minimums:
+            staff_slack = self._elastic_slack_vector("min_staff", required_slot_keys, min_staff_per_shift)
+            self.model.addConstr(self._matrix_aggregate('slot', required_rows) + staff_slack >= min_staff_per_shift, name="min_staff")
+        
+        # Cost mode and work% mode without explicit max both use exact staffing
+        if not self.optimize_for_cost and self.max_staff_per_shift is not None and self.max_staff_per_shift > 0:
+            staff_cap = self.max_staff_per_shift
+        else:
+            staff_cap = min_staff_per_shift
+        self.model.addConstr(staffing <= staff_cap, name="max_staff")
         
-        # 7. MEDIUM BLOCKED TIME SLOTS (PENALTY-BASED)
-        # These are strong preferences - employee prefers not to work but CAN if needed
-        # Implemented as penalty terms in objective function rather than hard constraints
-        # Max 3 slots per employee (enforced on frontend)
-        medium_blocked_count = 0
-        self.medium_penalty_vars = {}  # Store penalty variables for objective function
+        # 4. Minimum experience level per shift
+        if min_experience_per_shift > 0 and enforce_minimums:
+            slot_experience = self._matrix_aggregate('slot_experience', required_rows)
+            experience_slack = self._elastic_slack_vector("min_experience", required_slot_keys, min_experience_per_shift)
+            self.model.addConstr(slot_experience + experience_slack >= min_experience_per_shift, name="min_experience")
+        lap("staffing")
         
-        for pref in valid_preferences:
-            emp_id = pref.employee_id
-            
-            # Check if employee has medium blocked slots
-            if hasattr(pref, 'medium_blocked_slots') and pref.medium_blocked_slots:
-                logger.info(f"Employee {emp_id} has {len(pref.medium_blocked_slots)} medium blocked time slots")
-                
-                for slot in pref.medium_blocked_slots:
-                    try:
-                        # Parse the date string (format: "YYYY-MM-DD")
-                        from datetime import datetime
-                        slot_date = datetime.strptime(slot.date, '%Y-%m-%d').date()
-                        
-                        # Find the index of this date in our scheduling period
-                        day_index = None
-                        for d, date in enumerate(self.dates):
-                            if date.date() == slot_date:
-                                day_index = d
-                                break
-                        
-                        if day_index is None:
-                            logger.warning(f"Medium blocked date {slot.date} for employee {emp_id} is outside scheduling period - skipping")
-                            continue
-                        
-                        # Create penalty variables for specified shift types
-                        for shift_type in slot.shift_types:
-                            if shift_type == 'all_day':
-                                # Create penalty for ALL shifts on this day
-                                logger.info(f"MEDIUM BLOCK: Employee {emp_id} prefers to avoid ALL shifts on {slot.date}")
-                                for shift in self.shift_types:
-                                    # Create penalty variable (1 if shift is assigned, 0 otherwise)
-                                    penalty_var = self.model.addVar(
-                                        vtype=GRB.BINARY,
-                                        name=f"medium_penalty_{emp_id}_{day_index}_{shift}"
-                                    )
-                                    # Link penalty to shift assignment: penalty >= shift
-                                    # If shift is assigned (1), penalty must be 1
-                                    # If shift is not assigned (0), penalty can be 0 (optimizer will choose 0 to minimize cost)
-                                    self.model.addConstr(
-                                        penalty_var >= self.shifts[(emp_id, day_index, shift)],
-                                        name=f"medium_penalty_link_{emp_id}_{day_index}_{shift}"
-                                    )
-                                    # Store penalty variable for objective function
-                                    self.medium_penalty_vars[(emp_id, day_index, shift)] = penalty_var
-                                    medium_blocked_count += 1
-                            elif shift_type in self.shift_types:
-                                # Create penalty for specific shift type
-                                logger.info(f"MEDIUM BLOCK: Employee {emp_id} prefers to avoid {shift_type} shift on {slot.date}")
-                                penalty_var = self.model.addVar(
-                                    vtype=GRB.BINARY,
-                                    name=f"medium_penalty_{emp_id}_{day_index}_{shift_type}"
-                                )
-                                self.model.addConstr(
-                                    penalty_var >= self.shifts[(emp_id, day_index, shift_type)],
-                                    name=f"medium_penalty_link_{emp_id}_{day_index}_{shift_type}"
-                                )
-                                self.medium_penalty_vars[(emp_id, day_index, shift_type)] = penalty_var
-                                medium_blocked_count += 1
-                            else:
-                                logger.warning(f"Unknown shift type '{shift_type}' in medium blocked slot for employee {emp_id} - skipping")
-                    
-                    except ValueError as e:
-                        logger.error(f"Invalid date format in medium blocked slot for employee {emp_id}: {slot.date} - {e}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Error processing medium blocked slot for employee {emp_id}: {e}")
+        # Minimum coverage per shift type (prevents skipping entire shift types)
+        if not allow_partial_coverage:
+            min_coverage = len(self.scheduled_days) * min_staff_per_shift
+            coverage_slack = self._elastic_slack_vector("min_coverage", [(None, shift) for shift in self.shift_types], min_coverage)
+            self.model.addConstr(self._matrix_aggregate('shift') + coverage_slack >= min_coverage, name="min_coverage")
+        lap("coverage")
+        
+        logger.info(f"Scheduling {len(self.scheduled_days)} days out of {n_days} total days")
+        self.solve_log.detail("All matrix constraints added successfully")
+    
+    def _elastic_slack(self, family: str, day: Optional[int], shift: str, required: float):
+        """
+        Slack variable for one minimum requirement in elastic relaxation mode (0 otherwise).
+        
+        The slack lets the requirement be undershot at ELASTIC_PENALTY_WEIGHTS[family] per
+        unit in the objective, so an infeasible request still solves once and reports
+        how much each requirement had to give.
+        """
+        if self.relaxation_mode != "elastic":
+            return 0
+        
+        suffix = f"{day}_{shift}" if day is not None else shift
+        slack = self.model.addVar(lb=0.0, ub=required, vtype=GRB.CONTINUOUS, name=f"slack_{family}_{suffix}")
+        self.elastic_slacks.append((family, day, shift, required, slack))
+        return slack
+    
+    def _elastic_slack_vector(self, family: str, keys: List[Tuple[Optional[int], str]], required: float):
+        """Slack MVar with one entry per (day, shift) key in elastic relaxation mode (0 otherwise)."""
+        if self.relaxation_mode != "elastic" or not keys:
+            return 0
+        
+        slack = self.model.addMVar(len(keys), lb=0.0, ub=required, vtype=GRB.CONTINUOUS, name=f"slack_{family}")
+        for (day, shift), var in zip(keys, slack.tolist()):
+            self.elastic_slacks.append((family, day, shift, required, var))
+        return slack
+    
+    def _add_employee_preference_constraints(self):
+        """
+        Apply compiled preference hard blocks and custom weekly limits.
+        
+        Every hard block (strict days, excluded shifts/days, strict preferred shifts,
+        hard blocked slots, AI hard_unavailable) is a cell in the compiled blocked
+        tensor and becomes a zero upper bound, set in one bulk call.
+        """
+        compiled = self.compiled_preferences
+        blocked_count = self._set_cell_attr("UB", compiled.blocked, 0.0)
+        
+        # Maximum shifts per week (override default if specified)
+        self.employees_with_custom_weekly_limits = set(compiled.weekly_limits)
+        if compiled.weekly_limits and len(self.dates) / 7.0 >= 0.7 and self.use_matrix_api:
+            self._add_matrix_weekly_limits(compiled.weekly_limits)
+        elif compiled.weekly_limits and len(self.dates) / 7.0 >= 0.7:  # Only apply weekly constraint for periods 5+ days
+            for emp_id, max_shifts_per_week in compiled.weekly_limits.items():
+                for week_start in range(0, len(self.dates), 7):
+                    week_end = min(week_start + 7, len(self.dates))
+                    if ('employee_week', emp_id, week_start // 7) not in self._var_groups:
                         continue
+                    
+                    # For partial weeks, adjust the limit proportionally
+                    max_shifts_this_week = min(max_shifts_per_week, week_end - week_start)
+                    
+                    weekly_shifts = self._aggregate('employee_week', emp_id, week_start // 7)
+                    self.model.addConstr(
+                        weekly_shifts <= max_shifts_this_week,
+                        name=f"custom_max_{max_shifts_this_week}_shifts_per_week_{emp_id}_week_{week_start}"
+                    )
+                self.solve_log.detail("Set custom max %d shifts per week for employee %s (overrides default 5)", max_shifts_per_week, emp_id)
         
-        if medium_blocked_count > 0:
-            logger.info(f"✓ Created {medium_blocked_count} medium blocked penalty variables (will be added to objective)")
-        
-        logger.info("Employee preference constraints added successfully")
-        
-        # Summary logging
-        total_employees = len(self.employees)
-        employees_with_preferences = len(self.employee_preferences)
-        employees_with_custom_weekly = len(self.employees_with_custom_weekly_limits)
-        employees_with_shift_prefs = len(self.employee_shift_preferences)
-        employees_with_hard_blocks = sum(1 for pref in valid_preferences 
-                                         if hasattr(pref, 'hard_blocked_slots') and pref.hard_blocked_slots)
-        
-        logger.info(f"Employee preference summary:")
-        logger.info(f"  Total employees: {total_employees}")
-        logger.info(f"  Employees with preferences: {employees_with_preferences}")
-        logger.info(f"  Employees with custom weekly limits: {employees_with_custom_weekly}")
-        logger.info(f"  Employees with shift preferences: {employees_with_shift_prefs}")
-        logger.info(f"  Employees with hard blocked slots: {employees_with_hard_blocks}")
-        logger.info(f"  Total hard blocked constraints: {hard_blocked_count}")
-        
-        # Log any employees without preferences
-        employees_without_prefs = [emp['id'] for emp in self.employees 
-                                 if emp['id'] not in [pref.employee_id for pref in self.employee_preferences]]
-        if employees_without_prefs:
-            logger.info(f"  Employees using default constraints: {len(employees_without_prefs)}")
+        stats = compiled.stats
+        logger.info(
+            f"Employee preferences: {stats['employees_with_preferences']} of {len(self.employees)} employees, "
+            f"{stats['employees_with_custom_weekly_limits']} custom weekly limits, {blocked_count} blocked cells, "
+            f"{stats['penalized_cells']} penalized cells"
+        )
+        self.solve_log.detail("  Hard blocked slots: %d, medium blocked slots: %d", stats['hard_blocked_slots'], stats['medium_blocked_slots'])
+    
+    def _add_matrix_weekly_limits(self, weekly_limits: Dict[str, int]):
+        """Custom max shifts per week as one matrix constraint over the employee × week aggregate rows."""
+        n_days = len(self.dates)
+        n_weeks = (n_days + 6) // 7
+        rows, limits = [], []
+        for emp_id, max_shifts_per_week in weekly_limits.items():
+            e = self.index.employee_index.get(emp_id)
+            if e is None:
+                continue
+            for week in range(n_weeks):
+                rows.append(e * n_weeks + week)
+                limits.append(min(max_shifts_per_week, min(7, n_days - week * 7)))
+        if rows:
+            self.model.addConstr(
+                self._matrix_aggregate('employee_week', np.array(rows)) <= np.array(limits),
+                name="custom_max_shifts_per_week"
+            )
     
     def _add_ai_constraints(self):
         """
-        Add AI-parsed constraints from natural language input (Gurobi-ready format).
+        Apply AI-parsed constraints from natural language input (Gurobi-ready format).
         
-        These constraints come from Supabase ai_constraints table and are already
-        in the perfect format for Gurobi - no conversion needed!
+        hard_unavailable and soft_preference constraints are already part of the
+        compiled blocked / penalty tensors; hard_required cells become a lower bound of 1.
         
         Format:
         {
@@ -965,139 +1489,322 @@ class GurobiScheduleOptimizer:
             logger.info("No AI constraints provided, skipping AI constraint processing")
             return
         
-        logger.info(f"🤖 Adding {len(self.ai_constraints)} AI-parsed constraints (Gurobi-ready format)")
-        
-        # Map shift names (Swedish → English for Gurobi)
-        shift_name_map = {
-            'dag': 'day',
-            'day': 'day',
-            'kväll': 'evening',
-            'evening': 'evening',
-            'kvall': 'evening',  # Without umlaut
-            'natt': 'night',
-            'night': 'night'
-        }
+        required_count = self._set_cell_attr("LB", self.compiled_preferences.required, 1.0)
         
-        hard_constraints_added = 0
-        soft_constraints_added = 0
-        required_constraints_added = 0
+        stats = self.compiled_preferences.stats
+        logger.info(
+            f"✓ AI constraints applied: 🚫 {stats['ai_hard_unavailable']} hard unavailable, "
+            f"✅ {stats['ai_hard_required']} hard required ({required_count} cells), "
+            f"💡 {stats['ai_soft_preferences']} soft preferences, {stats['ai_skipped']} of {len(self.ai_constraints)} skipped"
+        )
+    
+    def _apply_warm_start(self):
+        """
+        Load a previous or user-edited schedule as Gurobi MIP start.
+        
+        Listed assignments start at 1 and every other variable on a date covered by the
+        warm start at 0, so a schedule for part of the period is a complete start for
+        those dates. Variables on uncovered dates keep an undefined start and Gurobi
+        completes the partial solution itself. Assignments on cells without a variable
+        (blocked or inactive) are skipped.
+        """
+        if not self.warm_start:
+            return
         
-        for constraint in self.ai_constraints:
+        start = np.full(self.cell_mask.shape, -1, dtype=np.int8)  # -1 = undefined
+        loaded = skipped = 0
+        for shift in self.warm_start:
+            e = self.index.employee_index.get(shift.get('employee_id'))
+            shift_type = AI_SHIFT_NAME_MAP.get(str(shift.get('shift_type', '')).lower())
+            date_str = shift.get('date') or (shift.get('start_time') or '')[:10]
             try:
-                emp_id = constraint.get('employee_id')
-                constraint_type = constraint.get('constraint_type')
-                dates = constraint.get('dates', [])
-                shifts = constraint.get('shifts', [])
-                priority = constraint.get('priority', 1000)
-                original_text = constraint.get('original_text', 'N/A')
-                
-                # Get employee name for logging
-                emp_name = next((e.get('name', 'Unknown') for e in self.employees if e.get('id') == emp_id), 'Unknown')
-                
-                # Validate employee exists
-                if not any(e.get('id') == emp_id for e in self.employees):
-                    logger.warning(f"AI constraint for unknown employee {emp_id} - skipping")
-                    continue
-                
-                # Convert date strings to indices
-                date_indices = []
-                for date_str in dates:
-                    # Parse date string (format: "YYYY-MM-DD")
-                    from datetime import datetime
-                    try:
-                        constraint_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                        
-                        # Find index in our scheduling period
-                        for d, schedule_date in enumerate(self.dates):
-                            if schedule_date.date() == constraint_date:
-                                date_indices.append(d)
-                                break
-                    except ValueError:
-                        logger.warning(f"Invalid date format '{date_str}' in AI constraint - skipping this date")
-                        continue
-                
-                if not date_indices:
-                    logger.warning(f"AI constraint dates outside scheduling period - skipping: {dates}")
-                    continue
-                
-                # Normalize shift names and handle empty shifts (means all shifts)
-                target_shifts = []
-                if not shifts or len(shifts) == 0:
-                    # Empty array = all shifts affected
-                    target_shifts = self.shift_types
-                else:
-                    for shift in shifts:
-                        normalized = shift_name_map.get(shift.lower(), shift.lower())
-                        if normalized in self.shift_types:
-                            target_shifts.append(normalized)
-                        else:
-                            logger.warning(f"Unknown shift type '{shift}' in AI constraint - skipping this shift")
-                
-                if not target_shifts:
-                    logger.warning(f"No valid shifts in AI constraint - skipping")
-                    continue
-                
-                # Apply constraint based on type
-                if constraint_type == 'hard_unavailable':
-                    # HARD CONSTRAINT: Employee absolutely cannot work these dates/shifts
-                    logger.info(f"🚫 HARD UNAVAILABLE: {emp_name} blocked from {len(date_indices)} dates, shifts: {target_shifts} (priority: {priority})")
-                    logger.info(f"   Original: \"{original_text}\"")
-                    
-                    for day_index in date_indices:
-                        for shift in target_shifts:
-                            self.model.addConstr(
-                                self.shifts[(emp_id, day_index, shift)] == 0,
-                                name=f"ai_hard_unavailable_{emp_id}_{day_index}_{shift}"
-                            )
-                            hard_constraints_added += 1
-                
-                elif constraint_type == 'hard_required':
-                    # HARD CONSTRAINT: Employee MUST work these dates/shifts (if possible)
-                    logger.info(f"✅ HARD REQUIRED: {emp_name} must work {len(date_indices)} dates, shifts: {target_shifts} (priority: {priority})")
-                    logger.info(f"   Original: \"{original_text}\"")
-                    
-                    for day_index in date_indices:
-                        for shift in target_shifts:
-                            # Set variable to 1 (must work this shift)
-                            self.model.addConstr(
-                                self.shifts[(emp_id, day_index, shift)] == 1,
-                                name=f"ai_hard_required_{emp_id}_{day_index}_{shift}"
-                            )
-                            required_constraints_added += 1
-                
-                elif constraint_type == 'soft_preference':
-                    # SOFT CONSTRAINT: Employee prefers not to work these dates/shifts
-                    # Add penalty to objective function (handled in _set_objective)
-                    logger.info(f"💡 SOFT PREFERENCE: {emp_name} prefers to avoid {len(date_indices)} dates, shifts: {target_shifts} (priority: {priority})")
-                    logger.info(f"   Original: \"{original_text}\"")
-                    
-                    # Store in employee_day_penalties for objective function
-                    # Weight penalty based on priority (higher priority = stronger penalty)
-                    penalty_weight = priority / 100  # Priority 1000 → weight 10, priority 100 → weight 1
-                    
-                    if emp_id not in self.employee_day_penalties:
-                        self.employee_day_penalties[emp_id] = []
-                    
-                    for day_index in date_indices:
-                        # Store as tuple: (day_index, shifts, penalty_weight)
-                        self.employee_day_penalties[emp_id].append((day_index, target_shifts, penalty_weight))
-                    
-                    soft_constraints_added += 1
-                
-                else:
-                    logger.warning(f"Unknown AI constraint type '{constraint_type}' - skipping")
-                    continue
-            
-            except Exception as e:
-                logger.error(f"Error processing AI constraint: {e}")
-                logger.error(f"Constraint data: {constraint}")
+                d = self.index.day_of(date_str) if date_str else None
+            except ValueError:
+                d = None
+            if e is None or d is None or shift_type is None:
+                skipped += 1
                 continue
+            
+            # Cover the whole day so unlisted cells on it start at 0
+            start[:, d, :] = np.maximum(start[:, d, :], 0)
+            start[e, d, self.shift_types.index(shift_type)] = 1
+            loaded += 1
+        
+        covered = (start >= 0) & self.cell_mask
+        start_count = self._set_cell_attr("Start", covered, start[covered].astype(float))
+        
+        unavailable = int(((start == 1) & ~self.cell_mask).sum())
+        covered_days = int((start >= 0).any(axis=(0, 2)).sum())
+        logger.info(f"♻️ Warm start: {loaded - unavailable} assignments loaded on {covered_days} days ({start_count} start values)")
+        if skipped or unavailable:
+            logger.info(f"  Skipped {skipped} shifts outside the period or with unknown employee/shift type, {unavailable} on blocked cells")
+    
+    def _schedule_problem(self, min_staff_per_shift: int, min_experience_per_shift: int, allow_partial_coverage: bool,
+                          include_required: bool = True) -> ScheduleProblem:
+        """
+        The main model's cells, limits, minimum requirements and objective weights as solver-neutral arrays.
         
-        logger.info(f"✓ AI constraints applied:")
-        logger.info(f"  🚫 Hard unavailable: {hard_constraints_added} constraints")
-        logger.info(f"  ✅ Hard required: {required_constraints_added} constraints")
-        logger.info(f"  💡 Soft preferences: {soft_constraints_added} constraints")
-        logger.info(f"  Total: {hard_constraints_added + required_constraints_added + soft_constraints_added} constraints from {len(self.ai_constraints)} AI inputs")
+        include_required=False describes the rebuild relaxation models, which do not apply
+        AI hard_required cells.
+        """
+        compiled = self.compiled_preferences
+        slot_demand, slot_capacity, total_limits, weekly_limits = self._staffing_limits(min_staff_per_shift, allow_partial_coverage)
+        coverage_demand = 0 if allow_partial_coverage else len(self.scheduled_days) * min_staff_per_shift
+        return ScheduleProblem(
+            open_cells=self.cell_mask & ~compiled.blocked,
+            required=compiled.required & self.cell_mask if include_required else np.zeros_like(compiled.required),
+            penalty=compiled.penalty,
+            experience=np.array([emp.get('experience_level', 1) for emp in self.employees], dtype=float),
+            targets=self._work_percentage_targets(),
+            total_limits=total_limits,
+            weekly_limits=weekly_limits,
+            slot_demand=slot_demand,
+            slot_capacity=slot_capacity,
+            experience_demand=np.where(slot_demand > 0, max(min_experience_per_shift, 0), 0),
+            coverage_demand=np.full(len(self.shift_types), coverage_demand),
+            weekend_days=np.array([self._is_weekend(date) for date in self.dates], dtype=bool),
+            objective_weights=OBJECTIVE_WEIGHTS["cost" if self.optimize_for_cost else "work_percentage"],
+            shortfall_weights=ELASTIC_PENALTY_WEIGHTS,
+        )
+    
+    def _run_heuristic(self, phase: str, min_staff_per_shift: int, min_experience_per_shift: int,
+                       allow_partial_coverage: bool, random_seed: Optional[int], time_limit: float) -> HeuristicResult:
+        """Run the heuristic engine on the main model's requirements as one SolveLog phase."""
+        with self.solve_log.phase(phase) as counters:
+            problem = self._schedule_problem(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage)
+            heuristic = solve_heuristic(problem, time_limit=time_limit, seed=random_seed, stop_event=self.stop_event)
+            counters.update(heuristic.stats())
+        return heuristic
+    
+    def _solve_heuristic(self, min_staff_per_shift: int, min_experience_per_shift: int,
+                         allow_partial_coverage: bool, random_seed: Optional[int]) -> Dict[str, Any]:
+        """
+        Build the schedule with the heuristic engine instead of Gurobi.
+        
+        Used for optimizer="heuristic" and when Gurobi has no usable license. The result has
+        the same shape as a Gurobi result; requirements the heuristic could not meet are
+        reported in relaxed_constraints like elastic shortfalls, so infeasible requests still
+        get a best-effort schedule.
+        """
+        if self.feasibility is not None and not self.feasibility.feasible:
+            logger.warning(f"🔎 Feasibility screen found {len(self.feasibility.bottlenecks)} bottlenecks: {self.feasibility.summary(3)} - the heuristic schedule will fall short")
+        
+        time_limit = min(HEURISTIC_TIME_LIMIT, self.solve_budget.time_limit(HEURISTIC_TIME_LIMIT))
+        heuristic = self._run_heuristic("heuristic", min_staff_per_shift, min_experience_per_shift,
+                                        allow_partial_coverage, random_seed, time_limit)
+        logger.info(f"🧮 Heuristic schedule: objective {heuristic.objective:.1f} after {heuristic.rounds} rounds ({heuristic.elapsed_ms:.0f} ms)")
+        
+        with self.solve_log.phase("extract_solution") as counters:
+            result = self._build_solution(heuristic.assigned, heuristic.objective, optimizer="heuristic")
+            counters["shifts"] = len(result["schedule"])
+        result['optimization_status'] = "heuristic"
+        
+        relaxed = self._shortfall_report("heuristic", [
+            (family, day, self.shift_types[s], required, value)
+            for family, day, s, required, value in heuristic.shortfalls
+        ])
+        if heuristic.unmet_required:
+            unmet = self._cells_to_shifts(heuristic.unmet_required)
+            logger.warning(f"Heuristic schedule: {len(unmet)} required shifts not assigned (blocked or over the shift limits)")
+            relaxed = relaxed or {'mode': 'heuristic', 'warning': ""}
+            relaxed['unmet_required'] = unmet
+            relaxed['warning'] = f"{relaxed['warning']} {len(unmet)} required shifts could not be assigned.".strip()
+        if relaxed is not None:
+            result['relaxed_constraints'] = relaxed
+        return result
+    
+    def _apply_heuristic_start(self, min_staff_per_shift: int, min_experience_per_shift: int,
+                               allow_partial_coverage: bool, random_seed: Optional[int]):
+        """
+        Complete the MIP start with the heuristic schedule.
+        
+        Every variable without a start value (all of them unless warm_start covers their
+        date) starts at the heuristic assignment, so Gurobi has an incumbent before its own
+        heuristics run. The search is capped at HEURISTIC_START_TIME_LIMIT.
+        """
+        time_limit = min(HEURISTIC_START_TIME_LIMIT, self.solve_budget.time_limit(HEURISTIC_START_TIME_LIMIT))
+        heuristic = self._run_heuristic("heuristic_start", min_staff_per_shift, min_experience_per_shift,
+                                        allow_partial_coverage, random_seed, time_limit)
+        
+        starts = self._decision_values("Start")
+        undefined = starts >= GRB.UNDEFINED
+        values = heuristic.assigned[self.cell_employee, self.cell_day, self.cell_shift].astype(float)
+        starts[undefined] = values[undefined]
+        self._set_cell_attr("Start", self.cell_mask, starts)
+        logger.info(
+            f"🧭 Heuristic start: {int(values[undefined].sum())} assignments on {int(undefined.sum())} variables "
+            f"(objective {heuristic.objective:.1f}, {len(heuristic.shortfalls)} shortfalls)"
+        )
+    
+    def _run_backend(self, backend: SolverBackend, phase: str, min_staff_per_shift: int, min_experience_per_shift: int,
+                     allow_partial_coverage: bool, random_seed: Optional[int], time_limit: float,
+                     include_required: bool = True, elastic: bool = False) -> Tuple[LinearModel, BackendResult]:
+        """Build the solver-neutral model and solve it on a backend as one SolveLog phase."""
+        with self.solve_log.phase(phase) as counters:
+            with self.solve_log.step(counters, "model"):
+                problem = self._schedule_problem(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage, include_required)
+                model = build_linear_model(problem, elastic=elastic)
+            counters.update(model.size())
+            outcome = backend.solve(
+                model,
+                time_limit=time_limit,
+                mip_gap=self.solve_budget.mip_gap,
+                threads=self.solve_budget.threads,
+                seed=random_seed,
+                stop_event=self.stop_event
+            )
+            counters.update(outcome.stats())
+        logger.info(
+            f"🧰 {backend.name} solve: {outcome.status}"
+            + (f", objective {outcome.objective:.1f}" if outcome.objective is not None else "")
+            + f" ({outcome.runtime_s:.2f}s, {model.size()['vars']} vars, {model.size()['constrs']} constrs)"
+        )
+        return model, outcome
+    
+    def _solve_with_backend(self, min_staff_per_shift: int, min_experience_per_shift: int, include_weekends: bool,
+                            allow_partial_coverage: bool, random_seed: Optional[int]) -> Dict[str, Any]:
+        """
+        Solve the solver-neutral model (services.schedule_model) on an open-source backend.
+        
+        Used for optimizer="highs" / "cpsat". Follows the Gurobi flow: the screened main
+        model first; when it is infeasible, rebuild mode retries per lower experience level
+        without AI hard_required cells, and elastic mode reports its slack in
+        relaxed_constraints. Warm start, heuristic start and solver events need Gurobi and
+        are ignored here.
+        """
+        try:
+            backend = get_backend(self.optimizer)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        elastic = self.relaxation_mode == "elastic"
+        
+        status = "infeasible"
+        if not self._skip_main_solve(min_experience_per_shift):
+            main_share = 1.0 if elastic else MAIN_SOLVE_BUDGET_SHARE
+            model, outcome = self._run_backend(
+                backend, "solve", min_staff_per_shift, min_experience_per_shift, allow_partial_coverage, random_seed,
+                time_limit=self.solve_budget.time_limit(30, main_share), elastic=elastic
+            )
+            if outcome.has_solution:
+                result = self._backend_solution(model, outcome)
+                relaxed = self._shortfall_report("elastic", [
+                    (family, day, self.shift_types[s], required, value)
+                    for family, day, s, required, value in model.shortfalls(outcome.values)
+                ])
+                if relaxed is not None:
+                    result['relaxed_constraints'] = relaxed
+                return result
+            status = outcome.status
+        
+        if status != "infeasible":
+            raise HTTPException(
+                status_code=400,
+                detail=f"No feasible schedule found. {backend.name} status: {status}"
+            )
+        
+        # IIS diagnosis needs Gurobi; without a usable license the request goes on undiagnosed
+        if self.diagnose:
+            try:
+                self.infeasibility_diagnosis = self._diagnose_infeasibility(
+                    min_staff_per_shift, min_experience_per_shift, include_weekends, allow_partial_coverage
+                )
+            except gp.GurobiError as e:
+                logger.warning(f"Infeasibility diagnosis skipped, Gurobi unavailable: {str(e)}")
+        if elastic:
+            raise HTTPException(
+                status_code=400,
+                detail=self._error_detail("No feasible schedule found even with elastic staffing, experience and coverage requirements. Hard employee preferences or AI constraints conflict with each other.")
+            )
+        
+        relaxation_attempts = self._relaxation_levels(min_staff_per_shift, min_experience_per_shift, allow_partial_coverage)
+        for attempt_number, attempt_experience in enumerate(relaxation_attempts):
+            if self.solve_budget.exhausted():
+                logger.warning(f"Solve deadline reached after {self.solve_budget.elapsed():.1f}s - skipping remaining relaxation attempts")
+                break
+            
+            logger.warning(f"Trying with relaxed experience requirement: {attempt_experience} (was {min_experience_per_shift})")
+            model, outcome = self._run_backend(
+                backend, f"relaxation_experience_{attempt_experience}", min_staff_per_shift, attempt_experience,
+                allow_partial_coverage, random_seed,
+                time_limit=self.solve_budget.time_limit(15, 1.0 / (len(relaxation_attempts) - attempt_number)),
+                include_required=False
+            )
+            if outcome.has_solution:
+                result = self._backend_solution(model, outcome)
+                record_fallback("rebuild")
+                result['relaxed_constraints'] = {
+                    'original_min_experience': min_experience_per_shift,
+                    'actual_min_experience': attempt_experience,
+                    'warning': f"Could not meet original experience requirement of {min_experience_per_shift}. Using {attempt_experience} instead."
+                }
+                if self.infeasibility_diagnosis is not None:
+                    result['infeasibility_diagnosis'] = self.infeasibility_diagnosis
+                return result
+            status = outcome.status
+        
+        logger.error("All optimization attempts failed, including with minimum constraints")
+        raise HTTPException(
+            status_code=400,
+            detail=self._error_detail(f"No feasible schedule found even with relaxed constraints. Final {backend.name} status: {status}. This may indicate insufficient staff or overly restrictive employee preferences.")
+        )
+    
+    def _backend_solution(self, model: LinearModel, outcome: BackendResult) -> Dict[str, Any]:
+        """Result dict of a backend solution; optimization_status is the backend status."""
+        with self.solve_log.phase("extract_solution") as counters:
+            result = self._build_solution(model.assignment(outcome.values), outcome.objective, optimizer=self.optimizer)
+            counters["shifts"] = len(result["schedule"])
+        stopped = self.stop_event is not None and self.stop_event.is_set() and outcome.status != "optimal"
+        result['optimization_status'] = "stopped" if stopped else outcome.status
+        return result
+    
+    def _can_fall_back(self, error: gp.GurobiError) -> bool:
+        """Whether a Gurobi error means the solver is unavailable and the heuristic can take over."""
+        return (
+            HEURISTIC_FALLBACK
+            and error.errno in GUROBI_UNAVAILABLE_ERRORS
+            and self.compiled_preferences is not None
+            and self.cell_mask is not None
+        )
+    
+    def _cell_vars(self, mask: np.ndarray) -> List:
+        """Decision variables for every (employee, day, shift) cell set in the mask that has a variable (per-variable build)."""
+        return [
+            self.shifts[(self.employees[e]['id'], d, self.shift_types[s])]
+            for e, d, s in np.argwhere(mask & self.cell_mask).tolist()
+        ]
+    
+    def _decision_vars(self):
+        """All decision variables in cell order: the MVar (matrix API) or a list of Vars."""
+        return self.shift_mvar if self.use_matrix_api else list(self.shifts.values())
+    
+    def _decision_values(self, attr: str) -> np.ndarray:
+        """A variable attribute (X, Start, ...) of every decision variable in cell order, read in one call."""
+        if self.use_matrix_api:
+            return np.array(self.shift_mvar.getAttr(attr), dtype=float)
+        return np.asarray(self.model.getAttr(attr, list(self.shifts.values())), dtype=float)
+    
+    def _set_cell_attr(self, attr: str, mask: np.ndarray, values) -> int:
+        """
+        Set a variable attribute on every cell of the mask that has a variable, in one call.
+        
+        Args:
+            attr: Gurobi variable attribute (UB, LB, Start)
+            mask: bool [employee, day, shift] cells to set
+            values: One value for all cells, or one per masked variable cell in C order
+        
+        Returns:
+            Number of variables set
+        """
+        positions = self.cell_position[mask & self.cell_mask]
+        if positions.size == 0:
+            return 0
+        values = np.broadcast_to(np.asarray(values, dtype=float), positions.shape)
+        if self.use_matrix_api:
+            self.shift_mvar[positions].setAttr(attr, values)
+        else:
+            cell_vars = list(self.shifts.values())
+            self.model.setAttr(attr, [cell_vars[p] for p in positions.tolist()], values.tolist())
+        return int(positions.size)
     
     def _set_objective(self):
         """
@@ -1121,46 +1828,104 @@ class GurobiScheduleOptimizer:
         """
         
         if self.optimize_for_cost:
-            logger.info("Setting COST MINIMIZATION objective function...")
+            self.solve_log.detail("Setting COST MINIMIZATION objective function...")
             mode_description = "Cost minimization mode: Minimize shifts while meeting minimum requirements"
         else:
-            logger.info("Setting WORK_PERCENTAGE FILLING objective function...")
+            self.solve_log.detail("Setting WORK_PERCENTAGE FILLING objective function...")
             mode_description = "Work% filling mode: Maximize shifts to match work_percentage targets"
         
         logger.info(mode_description)
         
-        # Primary objective: Total assigned shifts
-        total_coverage = gp.quicksum(
-            self.shifts[(emp['id'], d, shift)]
-            for emp in self.employees
-            for d in range(len(self.dates))
-            for shift in self.shift_types
-        )
+        # Structural objective terms (coverage, work% deviation, fairness)
+        if self.use_matrix_api:
+            terms = self._matrix_objective_terms()
+        else:
+            terms = self._objective_terms()
+        total_coverage, work_percentage_deviation, total_unfairness, shift_type_unfairness, weekend_unfairness = terms
+        
+        # Preference penalties: non-preferred shifts and days, medium blocked slots and
+        # AI soft preferences, compiled into one per-cell coefficient tensor (weights are
+        # PREFERENCE_PENALTY_WEIGHTS, so they are not repeated in the objectives below)
+        preference_penalty = self._preference_penalty_expr()
+        
+        # Elastic relaxation: undershooting a minimum requirement costs more than any coverage gain
+        if self.elastic_slacks:
+            preference_penalty = preference_penalty + gp.LinExpr(
+                [float(ELASTIC_PENALTY_WEIGHTS[family]) for family, *_ in self.elastic_slacks],
+                [slack for *_, slack in self.elastic_slacks]
+            )
         
-        # Calculate target shifts for each employee based on work_percentage
+        # Set objective based on optimization mode (weights in OBJECTIVE_WEIGHTS)
+        if self.optimize_for_cost:
+            # COST MINIMIZATION MODE:
+            # - Maximize coverage (ensure all shifts filled)
+            # - Minimize total shifts (reduce cost)
+            # - Fair distribution
+            weights = OBJECTIVE_WEIGHTS["cost"]
+            self.model.setObjective(
+                weights["coverage"] * total_coverage                   # Fill shifts (100) minus the cost of each shift (10)
+                - weights["total_unfairness"] * total_unfairness       # Fair distribution (50)
+                - preference_penalty                                   # Shift (45), medium block (30) and day (12) preferences
+                - weights["weekend_unfairness"] * weekend_unfairness   # 20
+                - weights["shift_type_unfairness"] * shift_type_unfairness,  # 8
+                GRB.MAXIMIZE
+            )
+            self.solve_log.detail("COST MODE objective: Minimize shifts while maintaining coverage and fairness")
+        else:
+            # WORK_PERCENTAGE FILLING MODE (when "Ta hänsyn till kostnad" is OFF):
+            # - Fill required shifts (coverage)
+            # - MAXIMIZE fairness in distribution (spread work evenly)
+            # - Respect work_percentage targets but prioritize fair distribution
+            # - Respect employee shift preferences (soft constraints)
+            weights = OBJECTIVE_WEIGHTS["work_percentage"]
+            self.model.setObjective(
+                weights["coverage"] * total_coverage                                # Ensure required shifts are filled (100)
+                - weights["work_percentage_deviation"] * work_percentage_deviation  # Minimize deviation from work% targets (80)
+                - weights["total_unfairness"] * total_unfairness                    # Strong fairness - spread shifts evenly! (70)
+                - preference_penalty                                                # Shift (50), medium block (30) and day (12) preferences
+                - weights["shift_type_unfairness"] * shift_type_unfairness          # Fair distribution of shift types (40)
+                - weights["weekend_unfairness"] * weekend_unfairness,               # Fair distribution of weekends (35)
+                GRB.MAXIMIZE
+            )
+            self.solve_log.detail("WORK%% FILLING MODE objective: Fill shifts fairly while respecting work_percentage targets")
+            self.solve_log.detail("Fairness is heavily weighted - shifts will be distributed evenly among employees")
+            self.solve_log.detail("Employee shift preferences (dag/kväll/natt) are strongly respected with weight 50")
+            self.solve_log.detail("Target deviations will be minimized - employees will get shifts matching their work%%")
+    
+    def _preference_penalty_expr(self):
+        """Objective penalty for all soft preferences, built from the compiled penalty tensor in one call."""
+        penalty = self.compiled_preferences.penalty
+        if self.use_matrix_api:
+            return penalty[self.cell_employee, self.cell_day, self.cell_shift] @ self.shift_mvar
+        
+        penalized = (penalty > 0) & self.cell_mask
+        return gp.LinExpr(penalty[penalized].tolist(), self._cell_vars(penalized))
+    
+    def _work_percentage_targets(self) -> np.ndarray:
+        """Target shifts per employee: work_percentage (preferences first, then employee object) of 5 shifts per week."""
         total_weeks = len(self.dates) / 7.0
-        work_percentage_deviation = 0
+        work_percentage_map = {
+            pref.employee_id: pref.work_percentage
+            for pref in self.employee_preferences
+            if getattr(pref, 'work_percentage', None) is not None
+        }
+        return np.array([
+            (work_percentage_map.get(emp.get('id'), emp.get('work_percentage', 100)) / 100.0) * total_weeks * 5
+            for emp in self.employees
+        ])
+    
+    def _objective_terms(self) -> Tuple:
+        """Build the coverage, work% deviation and fairness objective terms variable by variable."""
+        # Primary objective: Total assigned shifts
+        total_coverage = gp.quicksum(self._aggregate('shift', shift) for shift in self.shift_types)
         
-        # Create a mapping from employee_id to work_percentage from preferences
-        work_percentage_map = {}
-        for pref in self.employee_preferences:
-            if hasattr(pref, 'work_percentage') and pref.work_percentage is not None:
-                work_percentage_map[pref.employee_id] = pref.work_percentage
+        # Target shifts for each employee based on work_percentage
+        work_percentage_deviation = 0
+        targets = self._work_percentage_targets()
         
-        for emp in self.employees:
-            # Get work_percentage from preferences first, fallback to employee object
-            work_percentage = work_percentage_map.get(emp.get('id'), emp.get('work_percentage', 100))
-            
-            # Calculate target shifts based on work_percentage
-            # Assume 5 shifts per week as full-time baseline
-            target_shifts = (work_percentage / 100.0) * total_weeks * 5
-            
+        for emp, target_shifts in zip(self.employees, targets.tolist()):
             # Get actual shifts for this employee
-            emp_actual_shifts = gp.quicksum(
-                self.shifts[(emp['id'], d, shift)]
-                for d in range(len(self.dates))
-                for shift in self.shift_types
-            )
+            emp_actual_shifts = self._aggregate('employee', emp['id'])
             
             # Add deviation from target (absolute value approximation using helper variables)
             deviation_pos = self.model.addVar(vtype=GRB.CONTINUOUS, name=f"dev_pos_{emp['id']}")
@@ -1174,14 +1939,7 @@ class GurobiScheduleOptimizer:
             work_percentage_deviation += (deviation_pos + deviation_neg)
         
         # Secondary objective: Minimize unfairness in total shift distribution
-        emp_total_shifts = []
-        for emp in self.employees:
-            emp_total = gp.quicksum(
-                self.shifts[(emp['id'], d, shift)]
-                for d in range(len(self.dates))
-                for shift in self.shift_types
-            )
-            emp_total_shifts.append(emp_total)
+        emp_total_shifts = [self._aggregate('employee', emp['id']) for emp in self.employees]
         
         # Total shift fairness variables
         max_total_shifts = self.model.addVar(vtype=GRB.CONTINUOUS, name="max_total_shifts")
@@ -1196,13 +1954,7 @@ class GurobiScheduleOptimizer:
         # Tertiary objective: Minimize unfairness in shift type distribution
         shift_type_unfairness = 0
         for shift_type in self.shift_types:
-            emp_shift_type_counts = []
-            for emp in self.employees:
-                emp_shift_type_total = gp.quicksum(
-                    self.shifts[(emp['id'], d, shift_type)]
-                    for d in range(len(self.dates))
-                )
-                emp_shift_type_counts.append(emp_shift_type_total)
+            emp_shift_type_counts = [self._aggregate('employee_shift', emp['id'], shift_type) for emp in self.employees]
             
             # Shift type fairness variables
             max_shift_type = self.model.addVar(vtype=GRB.CONTINUOUS, name=f"max_{shift_type}_shifts")
@@ -1216,15 +1968,7 @@ class GurobiScheduleOptimizer:
         
         # Quaternary objective: Minimize unfairness in weekend shift distribution
         # This ensures weekend work is distributed fairly among employees
-        emp_weekend_counts = []
-        for emp in self.employees:
-            emp_weekend_total = gp.quicksum(
-                self.shifts[(emp['id'], d, shift)]
-                for d in range(len(self.dates))
-                for shift in self.shift_types
-                if self._is_weekend(self.dates[d])
-            )
-            emp_weekend_counts.append(emp_weekend_total)
+        emp_weekend_counts = [self._aggregate('employee_weekend', emp['id']) for emp in self.employees]
         
         # Weekend fairness variables
         max_weekend_shifts = self.model.addVar(vtype=GRB.CONTINUOUS, name="max_weekend_shifts")
@@ -1236,210 +1980,285 @@ class GurobiScheduleOptimizer:
         
         weekend_unfairness = max_weekend_shifts - min_weekend_shifts
         
-        # Fifth objective: Minimize assignment of non-preferred shifts
-        # This encourages giving employees their preferred shift types when possible
-        non_preferred_shift_penalty = 0
-        for emp in self.employees:
-            emp_id = emp['id']
-            if emp_id in self.employee_shift_preferences:
-                shift_prefs = self.employee_shift_preferences[emp_id]
-                # Only apply soft penalty if not strict (strict constraints are already hard blocked)
-                if not shift_prefs.get('strict', False):
-                    non_preferred_shifts = shift_prefs['non_preferred']
-                    for d in range(len(self.dates)):
-                        for shift in non_preferred_shifts:
-                            # Add penalty for each non-preferred shift assignment
-                            non_preferred_shift_penalty += self.shifts[(emp_id, d, shift)]
-        
-        # Sixth objective: Minimize assignment on non-preferred days (soft day constraints)
-        # This encourages respecting day preferences as much as possible when not strict
-        non_preferred_day_penalty = 0
-        for emp in self.employees:
-            emp_id = emp['id']
-            if emp_id in self.employee_day_penalties:
-                penalty_days = self.employee_day_penalties[emp_id]
-                for d in penalty_days:
-                    for shift in self.shift_types:
-                        # Add penalty for each shift assignment on non-preferred days
-                        non_preferred_day_penalty += self.shifts[(emp_id, d, shift)]
-        
-        # Seventh objective: Minimize violations of medium blocked slots
-        # These are strong preferences - employee strongly prefers not to work but CAN if needed
-        # Weight (30) is higher than soft preferences (8-12) but lower than hard constraints (impossible)
-        medium_blocked_penalty = 0
-        if hasattr(self, 'medium_penalty_vars') and self.medium_penalty_vars:
-            medium_blocked_penalty = gp.quicksum(self.medium_penalty_vars.values())
-        
-        # Set objective based on optimization mode
-        if self.optimize_for_cost:
-            # COST MINIMIZATION MODE:
-            # - Maximize coverage (ensure all shifts filled)
-            # - Minimize total shifts (reduce cost)
-            # - Fair distribution
-            self.model.setObjective(
-                100 * total_coverage           # Ensure shifts are filled
-                - 10 * total_coverage           # But minimize total count (NEGATIVE = reduce shifts)
-                - 50 * total_unfairness         # Fair distribution
-                - 45 * non_preferred_shift_penalty  # INCREASED: Strongly respect shift preferences!
-                - 30 * medium_blocked_penalty   # Respect strong preferences
-                - 20 * weekend_unfairness
-                - 12 * non_preferred_day_penalty
-                - 8 * shift_type_unfairness,
-                GRB.MAXIMIZE
-            )
-            logger.info("COST MODE objective: Minimize shifts while maintaining coverage and fairness")
+        return total_coverage, work_percentage_deviation, total_unfairness, shift_type_unfairness, weekend_unfairness
+    
+    def _matrix_objective_terms(self) -> Tuple:
+        """Build the coverage, work% deviation and fairness objective terms as matrix expressions."""
+        x = self.shift_mvar
+        n_employees, n_shifts = len(self.employees), len(self.shift_types)
+        
+        # Primary objective: Total assigned shifts
+        total_coverage = x.sum()
+        
+        # Deviation from work_percentage targets
+        targets = self._work_percentage_targets()
+        employee_totals = self._matrix_aggregate('employee')
+        deviation_pos = self.model.addMVar(n_employees, vtype=GRB.CONTINUOUS, name="dev_pos")
+        deviation_neg = self.model.addMVar(n_employees, vtype=GRB.CONTINUOUS, name="dev_neg")
+        self.model.addConstr(deviation_pos >= employee_totals - targets)
+        self.model.addConstr(deviation_neg >= targets - employee_totals)
+        work_percentage_deviation = deviation_pos.sum() + deviation_neg.sum()
+        
+        # Total shift fairness
+        max_total_shifts = self.model.addVar(vtype=GRB.CONTINUOUS, name="max_total_shifts")
+        min_total_shifts = self.model.addVar(vtype=GRB.CONTINUOUS, name="min_total_shifts")
+        self.model.addConstr(employee_totals <= max_total_shifts)
+        self.model.addConstr(employee_totals >= min_total_shifts)
+        total_unfairness = max_total_shifts - min_total_shifts
+        
+        # Shift type fairness: rows are (shift_type, employee), spread maps each row to its shift type
+        employee_shift_counts = self._matrix_aggregate('employee_shift')
+        spread = self._aggregation_matrix(np.arange(n_shifts * n_employees) // n_employees, n_shifts).T
+        max_shift_type = self.model.addMVar(n_shifts, vtype=GRB.CONTINUOUS, name="max_shift_type_shifts")
+        min_shift_type = self.model.addMVar(n_shifts, vtype=GRB.CONTINUOUS, name="min_shift_type_shifts")
+        self.model.addConstr(employee_shift_counts <= spread @ max_shift_type)
+        self.model.addConstr(employee_shift_counts >= spread @ min_shift_type)
+        shift_type_unfairness = max_shift_type.sum() - min_shift_type.sum()
+        
+        # Weekend fairness
+        employee_weekends = self._matrix_aggregate('employee_weekend')
+        max_weekend_shifts = self.model.addVar(vtype=GRB.CONTINUOUS, name="max_weekend_shifts")
+        min_weekend_shifts = self.model.addVar(vtype=GRB.CONTINUOUS, name="min_weekend_shifts")
+        self.model.addConstr(employee_weekends <= max_weekend_shifts)
+        self.model.addConstr(employee_weekends >= min_weekend_shifts)
+        weekend_unfairness = max_weekend_shifts - min_weekend_shifts
+        
+        return total_coverage, work_percentage_deviation, total_unfairness, shift_type_unfairness, weekend_unfairness
+    
+    def _optimize(self, phase: str = "solve"):
+        """
+        Run the solver, dispatching Gurobi callbacks to every entry in solve_callbacks, record
+        the solve's telemetry (parsed from its slice of the captured log) and hand the model
+        to the slow-request capture.
+        """
+        log_start = self.solve_log.log_position()
+        if not self.solve_callbacks:
+            self.model.optimize()
         else:
-            # WORK_PERCENTAGE FILLING MODE (when "Ta hänsyn till kostnad" is OFF):
-            # - Fill required shifts (coverage)
-            # - MAXIMIZE fairness in distribution (spread work evenly)
-            # - Respect work_percentage targets but prioritize fair distribution
-            # - Respect employee shift preferences (soft constraints)
-            self.model.setObjective(
-                100 * total_coverage            # Ensure required shifts are filled
-                - 80 * work_percentage_deviation # Minimize deviation from work% targets
-                - 70 * total_unfairness         # Strong fairness - spread shifts evenly!
-                - 50 * non_preferred_shift_penalty  # INCREASED: Strongly respect shift preferences (dag/kväll/natt)!
-                - 40 * shift_type_unfairness    # Fair distribution of shift types
-                - 35 * weekend_unfairness       # Fair distribution of weekends
-                - 30 * medium_blocked_penalty   # Respect strong preferences
-                - 12 * non_preferred_day_penalty,
-                GRB.MAXIMIZE
+            self._callback_vars = self._decision_vars()  # Cell order, see _select_variable_cells
+            
+            def dispatch(model, where):
+                for callback in self.solve_callbacks:
+                    callback(model, where)
+            
+            self.model.optimize(dispatch)
+        try:
+            self.solve_log.telemetry.append(collect_telemetry(self.model, self.solve_log.solver_log(log_start), phase))
+        except gp.GurobiError as e:
+            logger.warning(f"⚠️ Solver telemetry unavailable for {phase}: {str(e)}")
+        capture_model(self.model, phase)
+    
+    def _progress_callback(self, model, where):
+        """
+        Gurobi callback that streams solver progress and honours early stop requests.
+        
+        MIPSOL: emits an "incumbent" event with objective, bound, gap and the schedule
+        diff (added / removed assignments) against the previous incumbent.
+        MIP: emits a "progress" event at most every 0.5 s.
+        """
+        if self.stop_event is not None and self.stop_event.is_set():
+            model.terminate()
+            return
+        if self.solver_event_callback is None:
+            return
+        
+        if where == GRB.Callback.MIPSOL:
+            values = model.cbGetSolution(self._callback_vars)
+            cells = {
+                (int(e), int(d), int(s))
+                for e, d, s, value in zip(self.cell_employee, self.cell_day, self.cell_shift, values)
+                if value > 0.5
+            }
+            added, removed = cells - self._incumbent_cells, self._incumbent_cells - cells
+            self._incumbent_cells = cells
+            self._emit_solver_event(
+                "incumbent",
+                objective=model.cbGet(GRB.Callback.MIPSOL_OBJ),
+                bound=model.cbGet(GRB.Callback.MIPSOL_OBJBND),
+                elapsed=model.cbGet(GRB.Callback.RUNTIME),
+                solution_count=int(model.cbGet(GRB.Callback.MIPSOL_SOLCNT)),
+                assignments=len(cells),
+                added=self._cells_to_shifts(added),
+                removed=self._cells_to_shifts(removed)
+            )
+        elif where == GRB.Callback.MIP:
+            elapsed = model.cbGet(GRB.Callback.RUNTIME)
+            if elapsed - self._last_progress_time < 0.5:
+                return
+            self._last_progress_time = elapsed
+            self._emit_solver_event(
+                "progress",
+                objective=model.cbGet(GRB.Callback.MIP_OBJBST),
+                bound=model.cbGet(GRB.Callback.MIP_OBJBND),
+                elapsed=elapsed,
+                solution_count=int(model.cbGet(GRB.Callback.MIP_SOLCNT)),
+                nodes=int(model.cbGet(GRB.Callback.MIP_NODCNT))
+            )
+    
+    def _emit_solver_event(self, event_type: str, objective: float, bound: float, **fields):
+        """Send one solver event; objective, bound and gap are None until they are finite."""
+        has_objective = abs(objective) < GRB.INFINITY
+        has_bound = abs(bound) < GRB.INFINITY
+        gap = None
+        if has_objective and has_bound:
+            gap = abs(bound - objective) / max(abs(objective), 1e-10)
+        event = {
+            "type": event_type,
+            "objective": objective if has_objective else None,
+            "bound": bound if has_bound else None,
+            "gap": round(gap, 6) if gap is not None else None,
+            **fields
+        }
+        event["elapsed"] = round(event["elapsed"], 3)
+        try:
+            self.solver_event_callback(event)
+        except Exception as e:
+            # A failing listener must never abort the solve
+            logger.warning(f"Solver event callback failed: {str(e)}")
+    
+    def _cells_to_shifts(self, cells) -> List[Dict[str, Any]]:
+        """Compact (employee_id, date, shift_type) records for a set of (e, d, s) cells."""
+        return [
+            {
+                "employee_id": self.employees[e]['id'],
+                "date": self.index.date_strings[d],
+                "shift_type": self.shift_types[s]
+            }
+            for e, d, s in sorted(cells, key=lambda cell: (cell[1], cell[2], cell[0]))
+        ]
+    
+    def _extract_elastic_solution(self) -> Dict[str, Any]:
+        """Extract the solution and, in elastic mode, report how much each requirement was relaxed."""
+        result = self._extract_solution()
+        if not self.elastic_slacks:
+            return result
+        
+        values = self.model.getAttr("X", [slack for *_, slack in self.elastic_slacks])
+        relaxed = self._shortfall_report("elastic", [
+            (family, day, shift, required, value)
+            for (family, day, shift, required, _), value in zip(self.elastic_slacks, values)
+        ])
+        if relaxed is not None:
+            result['relaxed_constraints'] = relaxed
+        return result
+    
+    def _shortfall_report(self, mode: str, shortfalls: List[Tuple]) -> Optional[Dict[str, Any]]:
+        """
+        relaxed_constraints entry for unmet minimum requirements (None when all were met).
+        
+        Args:
+            mode: "elastic" (slack values of the elastic model) or "heuristic"
+            shortfalls: (family, day, shift_type, required, shortfall) per requirement; day is
+                None for shift type coverage
+        """
+        label = "Elastic relaxation" if mode == "elastic" else "Heuristic schedule"
+        entries = {family: [] for family in ELASTIC_PENALTY_WEIGHTS}
+        for family, day, shift, required, value in shortfalls:
+            if value > 1e-6:
+                entry = {"shift_type": shift, "required": required, "shortfall": round(value, 2)}
+                if day is not None:
+                    entry["date"] = self.index.date_strings[day]
+                entries[family].append(entry)
+        
+        if not any(entries.values()):
+            logger.info(f"{label}: all minimum requirements met")
+            return None
+        
+        totals = {family: round(sum(entry["shortfall"] for entry in items), 2) for family, items in entries.items()}
+        record_fallback(mode)
+        logger.warning(f"{label}: requirements undershot - staff {totals['min_staff']}, experience {totals['min_experience']}, coverage {totals['min_coverage']}")
+        return {
+            'mode': mode,
+            'total_shortfall': totals,
+            'min_staff': entries['min_staff'],
+            'min_experience': entries['min_experience'],
+            'min_coverage': entries['min_coverage'],
+            'warning': (
+                f"Could not meet all requirements: {len(entries['min_staff'])} shifts understaffed "
+                f"({totals['min_staff']} staff short), {len(entries['min_experience'])} shifts below "
+                f"experience requirement ({totals['min_experience']} points short)."
             )
-            logger.info("WORK% FILLING MODE objective: Fill shifts fairly while respecting work_percentage targets")
-            logger.info("Fairness is heavily weighted - shifts will be distributed evenly among employees")
-            logger.info("Employee shift preferences (dag/kväll/natt) are strongly respected with weight 50")
-            logger.info("Target deviations will be minimized - employees will get shifts matching their work%")
+        }
     
     def _extract_solution(self) -> Dict[str, Any]:
-        """Extract and format the solution from the optimized model."""
-        logger.info("Extracting solution...")
+        """
+        Extract and format the solution from the optimized model.
         
-        schedule = []
-        coverage_stats = {"total_shifts": 0, "filled_shifts": 0, "coverage_percentage": 0}
-        employee_stats = {}
+        All variable values are read with one getAttr call into an employee×day×shift
+        assignment tensor; statistics are vectorized reductions over it and the shift
+        dicts are built last from precomputed date and time strings.
+        """
+        with self.solve_log.phase("extract_solution") as counters:
+            # Assignment tensor - cells without a variable are never assigned
+            values = self._decision_values("X")
+            assigned = np.zeros(self.cell_mask.shape, dtype=bool)
+            assigned[self.cell_employee, self.cell_day, self.cell_shift] = values > 0.5
+            
+            objective_value = self.model.objVal if self.model.status in [GRB.OPTIMAL, GRB.SUBOPTIMAL] else None
+            result = self._build_solution(assigned, objective_value)
+            counters["shifts"] = len(result["schedule"])
+        return result
+    
+    def _build_solution(self, assigned: np.ndarray, objective_value: Optional[float], optimizer: str = "gurobi") -> Dict[str, Any]:
+        """Statistics and shift list of an employee×day×shift assignment tensor (see _extract_solution)."""
+        n_employees, n_shifts = len(self.employees), len(self.shift_types)
         
-        # Store min_staff_per_shift for coverage calculation
-        min_staff = getattr(self, 'min_staff_per_shift', 1)
+        weekend_days = np.array([date.weekday() >= 5 for date in self.dates], dtype=bool)
+        experience = np.array([emp.get('experience_level', 1) for emp in self.employees], dtype=float)
         
-        # Track unique shift slots that have been filled (for accurate coverage)
-        filled_shift_slots = set()  # Will store (date_index, shift_type) tuples
+        # Employee statistics
+        shifts_per_type = assigned.sum(axis=1)  # (employee, shift type)
+        total_shifts = shifts_per_type.sum(axis=1)
+        weekend_shifts = assigned[:, weekend_days, :].sum(axis=(1, 2))
+        names = [f"{emp.get('first_name', '')} {emp.get('last_name', '')}" for emp in self.employees]
         
-        # Initialize employee stats
-        for emp in self.employees:
+        employee_stats = {}
+        for e, emp in enumerate(self.employees):
             employee_stats[emp['id']] = {
-                "name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}",
-                "total_shifts": 0,
-                "day_shifts": 0,
-                "evening_shifts": 0,
-                "night_shifts": 0,
-                "weekend_shifts": 0
+                "name": names[e],
+                "total_shifts": int(total_shifts[e]),
+                **{f"{shift}_shifts": int(shifts_per_type[e, s]) for s, shift in enumerate(self.shift_types)},
+                "weekend_shifts": int(weekend_shifts[e])
             }
         
-        # Extract schedule assignments - ONLY for scheduled days
-        scheduled_days = getattr(self, 'scheduled_days', list(range(len(self.dates))))
-        
-        for emp in self.employees:
-            for d in scheduled_days:  # Only iterate over scheduled days
-                date = self.dates[d]
-                    
-                for shift in self.shift_types:
-                    if self.shifts[(emp['id'], d, shift)].x > 0.5:  # Binary variable is 1
-                        # Create shift assignment
-                        shift_start_time, shift_end_time = self.shift_times[shift]
-                        
-                        # Combine date with time to create full datetime strings
-                        shift_start_datetime = f"{date.strftime('%Y-%m-%d')}T{shift_start_time}:00"
-                        shift_end_datetime = f"{date.strftime('%Y-%m-%d')}T{shift_end_time}:00"
-                        
-                        # Handle night shifts that end the next day
-                        if shift == "night" and shift_end_time == "06:00":
-                            next_date = date + timedelta(days=1)
-                            shift_end_datetime = f"{next_date.strftime('%Y-%m-%d')}T{shift_end_time}:00"
-                        
-                        # Calculate shift duration and cost
-                        shift_hours = 8.0  # All shifts are 8 hours
-                        hourly_rate = emp.get('hourly_rate', 1000.0)  # Default 1000 SEK if not set
-                        shift_cost = shift_hours * hourly_rate
-                        
-                        shift_assignment = {
-                            "employee_id": emp['id'],
-                            "employee_name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}",
-                            "experience_level": emp.get('experience_level', 1),
-                            "date": date.strftime('%Y-%m-%d'),
-                            "shift_type": shift,
-                            "start_time": shift_start_datetime,
-                            "end_time": shift_end_datetime,
-                            "is_weekend": date.weekday() >= 5,
-                            "department": emp.get('department', 'General'),
-                            "hours": shift_hours,
-                            "hourly_rate": hourly_rate,
-                            "cost": shift_cost
-                        }
-                        
-                        logger.info(f"🔍 Created shift with cost: {shift_cost} for {emp.get('first_name', '')} {emp.get('last_name', '')}")
-                        
-                        schedule.append(shift_assignment)
-                        
-                        # Track that this shift slot is filled (for coverage calculation)
-                        filled_shift_slots.add((d, shift))
-                        
-                        # Update statistics
-                        employee_stats[emp['id']]["total_shifts"] += 1
-                        employee_stats[emp['id']][f"{shift}_shifts"] += 1
-                        
-                        if date.weekday() >= 5:  # Weekend
-                            employee_stats[emp['id']]["weekend_shifts"] += 1
-        
         # Calculate coverage statistics
-        # Total possible shift slots = days × shift_types (each slot can have min_staff people)
-        total_shift_slots = len(self.dates) * len(self.shift_types)
-        filled_shift_count = len(filled_shift_slots)  # Number of unique slots with at least 1 person
-        
-        coverage_stats["total_shifts"] = total_shift_slots
-        coverage_stats["filled_shifts"] = filled_shift_count
-        
-        if coverage_stats["total_shifts"] > 0:
-            coverage_stats["coverage_percentage"] = round(
-                (coverage_stats["filled_shifts"] / coverage_stats["total_shifts"]) * 100, 1
-            )
+        # Total possible shift slots = scheduled days × shift_types (each slot can have min_staff people)
+        slot_staff = assigned.sum(axis=0)  # (day, shift type)
+        total_shift_slots = len(self.scheduled_days) * n_shifts
+        # Number of unique scheduled slots with at least 1 person
+        filled_shift_count = int((slot_staff[self.scheduled_days] > 0).sum()) if len(self.scheduled_days) else 0
+        
+        coverage_stats = {
+            "total_shifts": total_shift_slots,
+            "filled_shifts": filled_shift_count,
+            "coverage_percentage": round((filled_shift_count / total_shift_slots) * 100, 1) if total_shift_slots > 0 else 0
+        }
         
         # Log results
         logger.info(f"Schedule generated with {coverage_stats['coverage_percentage']}% coverage")
         logger.info(f"Filled {coverage_stats['filled_shifts']} out of {coverage_stats['total_shifts']} unique shift slots")
-        logger.info(f"(Calculation: {len(self.dates)} days × {len(self.shift_types)} shift types = {total_shift_slots} slots)")
-        logger.info(f"Total person-shifts assigned: {len(schedule)}")
-
+        logger.info(f"(Calculation: {len(self.scheduled_days)} days × {n_shifts} shift types = {total_shift_slots} slots)")
+        logger.info(f"Total person-shifts assigned: {int(total_shifts.sum())}")
+        
+        # Fairness statistics: min / max / avg / range over employees
+        def spread(counts: np.ndarray) -> Dict[str, Any]:
+            if counts.size == 0:
+                return {"min": 0, "max": 0, "avg": 0, "range": 0}
+            return {
+                "min": int(counts.min()),
+                "max": int(counts.max()),
+                "avg": round(float(counts.mean()), 1),
+                "range": int(counts.max() - counts.min())
+            }
         
-        # Calculate shift type fairness statistics
         shift_type_stats = {}
-        for shift_type in self.shift_types:
-            shift_counts = [emp_data[f"{shift_type}_shifts"] for emp_data in employee_stats.values()]
-            if shift_counts:
-                shift_type_stats[shift_type] = {
-                    "min": min(shift_counts),
-                    "max": max(shift_counts),
-                    "avg": round(sum(shift_counts) / len(shift_counts), 1),
-                    "range": max(shift_counts) - min(shift_counts)
-                }
-        
-        # Overall fairness calculations
-        total_shifts_per_employee = [emp_data["total_shifts"] for emp_data in employee_stats.values()]
-        weekend_shifts_per_employee = [emp_data["weekend_shifts"] for emp_data in employee_stats.values()]
+        if n_employees:
+            shift_type_stats = {shift: spread(shifts_per_type[:, s]) for s, shift in enumerate(self.shift_types)}
         
         fairness_stats = {
-            "total_shifts": {
-                "min": min(total_shifts_per_employee) if total_shifts_per_employee else 0,
-                "max": max(total_shifts_per_employee) if total_shifts_per_employee else 0,
-                "avg": round(sum(total_shifts_per_employee) / len(total_shifts_per_employee), 1) if total_shifts_per_employee else 0,
-                "range": max(total_shifts_per_employee) - min(total_shifts_per_employee) if total_shifts_per_employee else 0
-            },
+            "total_shifts": spread(total_shifts),
             "shift_types": shift_type_stats,
-            "weekend_shifts": {
-                "min": min(weekend_shifts_per_employee) if weekend_shifts_per_employee else 0,
-                "max": max(weekend_shifts_per_employee) if weekend_shifts_per_employee else 0,
-                "avg": round(sum(weekend_shifts_per_employee) / len(weekend_shifts_per_employee), 1) if weekend_shifts_per_employee else 0,
-                "range": max(weekend_shifts_per_employee) - min(weekend_shifts_per_employee) if weekend_shifts_per_employee else 0
-            }
+            "weekend_shifts": spread(weekend_shifts)
         }
         
         logger.info(f"Fairness - Total shifts range: {fairness_stats['total_shifts']['range']}")
@@ -1447,30 +2266,48 @@ class GurobiScheduleOptimizer:
             logger.info(f"Fairness - {shift_type} shifts range: {stats['range']}")
         logger.info(f"Fairness - Weekend shifts range: {fairness_stats['weekend_shifts']['range']}")
         
-        # Validate experience requirements for each shift
-        experience_violations = 0
-        for d in range(len(self.dates)):
-            date = self.dates[d]
-            for shift in self.shift_types:
-                # Calculate total experience for this shift
-                shift_experience = 0
-                shift_staff = 0
-                for emp in self.employees:
-                    if (emp['id'], d, shift) in self.shifts and self.shifts[(emp['id'], d, shift)].x > 0.5:
-                        shift_experience += emp.get('experience_level', 1)
-                        shift_staff += 1
-                
-                if shift_staff > 0:  # Only check shifts that are actually scheduled
-                    logger.debug(f"Shift {date.strftime('%Y-%m-%d')} {shift}: {shift_staff} staff, {shift_experience} experience points")
-                    if shift_experience < 1:  # Basic validation - should have at least some experience
-                        experience_violations += 1
-                        logger.warning(f"Experience concern: {date.strftime('%Y-%m-%d')} {shift} has {shift_experience} experience points with {shift_staff} staff")
-        
-        if experience_violations > 0:
-            logger.warning(f"Found {experience_violations} shifts with potential experience issues")
+        # Validate experience requirements for each scheduled shift
+        slot_experience = np.tensordot(experience, assigned, axes=(0, 0))  # (day, shift type)
+        violations = np.argwhere((slot_staff > 0) & (slot_experience < 1))  # Basic validation
+        for d, s in violations.tolist():
+            logger.warning(f"Experience concern: {self.index.date_strings[d]} {self.shift_types[s]} has {slot_experience[d, s]:g} experience points with {slot_staff[d, s]} staff")
+        
+        if len(violations) > 0:
+            logger.warning(f"Found {len(violations)} shifts with potential experience issues")
         else:
             logger.info("All scheduled shifts meet basic experience requirements")
         
+        # Build shift assignments from precomputed strings
+        date_strings = self.index.date_strings
+        next_date_strings = [(date + timedelta(days=1)).strftime('%Y-%m-%d') for date in self.dates]
+        shift_hours = 8.0  # All shifts are 8 hours
+        hourly_rates = [emp.get('hourly_rate', 1000.0) for emp in self.employees]  # Default 1000 SEK if not set
+        
+        schedule = []
+        for e, d, s in np.argwhere(assigned).tolist():
+            emp, shift = self.employees[e], self.shift_types[s]
+            shift_start_time, shift_end_time = self.shift_times[shift]
+            
+            # Night shifts end the next day
+            end_date = next_date_strings[d] if shift == "night" and shift_end_time == "06:00" else date_strings[d]
+            
+            schedule.append({
+                "employee_id": emp['id'],
+                "employee_name": names[e],
+                "experience_level": emp.get('experience_level', 1),
+                "date": date_strings[d],
+                "shift_type": shift,
+                "start_time": f"{date_strings[d]}T{shift_start_time}:00",
+                "end_time": f"{end_date}T{shift_end_time}:00",
+                "is_weekend": bool(weekend_days[d]),
+                "department": emp.get('department', 'General'),
+                "hours": shift_hours,
+                "hourly_rate": hourly_rates[e],
+                "cost": shift_hours * hourly_rates[e]
+            })
+        
+        logger.info(f"Created {len(schedule)} shifts, total cost {sum(shift['cost'] for shift in schedule):.0f}")
+        
         return {
             "schedule": schedule,
             "statistics": {
@@ -1478,8 +2315,9 @@ class GurobiScheduleOptimizer:
                 "fairness": fairness_stats
             },
             "employee_stats": employee_stats,
-            "optimizer": "gurobi",
-            "objective_value": self.model.objVal if self.model.status in [GRB.OPTIMAL, GRB.SUBOPTIMAL] else None
+            "optimizer": optimizer,
+            "objective_value": objective_value,
+            "solver_telemetry": self.solve_log.telemetry  # Every Gurobi solve of this request
         }
     
     def _is_weekend(self, date):
@@ -1501,7 +2339,18 @@ def optimize_schedule_with_gurobi(
     optimize_for_cost: bool = False,
     random_seed: Optional[int] = None,
     employee_preferences: Optional[List] = None,
-    ai_constraints: Optional[List[Dict]] = None
+    ai_constraints: Optional[List[Dict]] = None,
+    use_matrix_api: bool = False,
+    warm_start: Optional[List[Dict]] = None,
+    relaxation_mode: str = "rebuild",
+    solver_event_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stop_event: Optional[Any] = None,
+    solve_budget: Optional[SolveBudget] = None,
+    debug_logging: bool = False,
+    diagnose_infeasibility: bool = False,
+    optimizer: str = "gurobi",
+    heuristic_start: bool = False,
+    solver_params: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Main function to optimize schedule using Gurobi.
@@ -1509,8 +2358,8 @@ def optimize_schedule_with_gurobi(
     This is the entry point for Gurobi-based optimization that can be used
     as a drop-in replacement for the OR-Tools optimizer.
     """
-    optimizer = GurobiScheduleOptimizer()
-    return optimizer.optimize_schedule(
+    schedule_optimizer = GurobiScheduleOptimizer()
+    return schedule_optimizer.optimize_schedule(
         employees=employees,
         start_date=start_date,
         end_date=end_date,
@@ -1522,5 +2371,16 @@ def optimize_schedule_with_gurobi(
         optimize_for_cost=optimize_for_cost,
         random_seed=random_seed,
         employee_preferences=employee_preferences,
-        ai_constraints=ai_constraints
+        ai_constraints=ai_constraints,
+        use_matrix_api=use_matrix_api,
+        warm_start=warm_start,
+        relaxation_mode=relaxation_mode,
+        solver_event_callback=solver_event_callback,
+        stop_event=stop_event,
+        solve_budget=solve_budget,
+        debug_logging=debug_logging,
+        diagnose_infeasibility=diagnose_infeasibility,
+        optimizer=optimizer,
+        heuristic_start=heuristic_start,
+        solver_params=solver_params
     )
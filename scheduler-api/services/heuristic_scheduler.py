@@ -0,0 +1,429 @@
+"""
+Greedy + local-search scheduling heuristic on NumPy arrays (no solver required).
+
+Runs when a request asks for optimizer="heuristic", when Gurobi cannot solve the instance
+(no license, no free seat, model too large for the size-limited license) and, with
+heuristic_start, to give Gurobi a MIP start. It works on the same cells, hard limits and
+weighted objective as the Gurobi model:
+
+1. Construction: AI hard_required cells first, then the minimum staff of every slot,
+   scarcest slots (fewest open cells) first, each time adding the employee with the best
+   objective gain
+2. Local search: improving add, remove, reassign (same slot, other employee) and
+   shift-type swap (two employees on the same day) moves; every move is evaluated for
+   all candidate employees at once
+3. Perturbation: drop a random share of the assignments and search again, keeping the
+   best schedule, until the time limit or STALL_ROUNDS rounds without improvement
+
+One shift per day, weekly and total limits and the staff cap are never violated. Minimum
+staff, experience and shift type coverage are soft, penalized like elastic slack, so the
+heuristic always returns a schedule and reports what it could not meet.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from services.schedule_model import ScheduleProblem
+
+# Perturbation rounds without a better schedule before the search stops
+STALL_ROUNDS = 20
+
+# Share of the (non-required) assignments dropped by one perturbation
+PERTURB_SHARE = 0.15
+
+# Smallest objective gain that counts as an improvement
+EPSILON = 1e-6
+
+
+@dataclass
+class HeuristicResult:
+    """Best schedule found and how it was found."""
+    assigned: np.ndarray                # (E, D, S) assignment tensor
+    objective: float                    # Objective value in the Gurobi objective's terms
+    shortfalls: List[Tuple[str, Optional[int], int, float, float]] = field(default_factory=list)  # (family, day, shift, required, shortfall)
+    unmet_required: List[Tuple[int, int, int]] = field(default_factory=list)  # Required cells the hard limits did not allow
+    rounds: int = 0                     # Perturbation rounds
+    moves: int = 0                      # Applied cell changes
+    elapsed_ms: float = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for logs and the response."""
+        return {
+            "objective": round(self.objective, 2),
+            "rounds": self.rounds,
+            "moves": self.moves,
+            "shortfalls": len(self.shortfalls),
+            "unmet_required": len(self.unmet_required),
+        }
+
+
+def _spread(values: np.ndarray) -> float:
+    """max - min of a vector (0 when empty)."""
+    return float(values.max() - values.min()) if values.size else 0.0
+
+
+def _extreme_excluding(values: np.ndarray, ranked: List[int], js: np.ndarray, fill: float) -> np.ndarray:
+    """For each j in js, the value of the first index in ranked (extremes first) that is not j."""
+    if not ranked:
+        return np.full(js.shape, fill)
+    if len(ranked) == 1:
+        return np.where(js == ranked[0], fill, values[ranked[0]])
+    return np.where(js == ranked[0], values[ranked[1]], values[ranked[0]])
+
+
+def _spread_after(values: np.ndarray, js: np.ndarray, dj: float, i: Optional[int] = None, di: float = 0.0) -> np.ndarray:
+    """
+    max - min of values after values[j] += dj (for every candidate j in js) and values[i] += di.
+
+    Only the three largest and smallest entries can be the new extremes, so all candidates
+    together cost O(E) instead of O(E) each.
+    """
+    order = np.argsort(values, kind="stable")
+    lowest = [k for k in order[:3].tolist() if k != i]
+    highest = [k for k in order[::-1][:3].tolist() if k != i]
+    moved = values[js] + dj
+    high = np.maximum(_extreme_excluding(values, highest, js, -np.inf), moved)
+    low = np.minimum(_extreme_excluding(values, lowest, js, np.inf), moved)
+    if i is not None:
+        high = np.maximum(high, values[i] + di)
+        low = np.minimum(low, values[i] + di)
+    return high - low
+
+
+class HeuristicScheduler:
+    """Greedy constructor and local-search improver over a ScheduleProblem."""
+
+    def __init__(self, problem: ScheduleProblem, seed: Optional[int] = None):
+        self.problem = problem
+        self.rng = np.random.default_rng(seed)
+        n_employees, n_days, n_shifts = problem.open_cells.shape
+        n_weeks = (n_days + 6) // 7
+        self.week_of_day = np.arange(n_days) // 7
+        self.weekly_limits = (
+            problem.weekly_limits.astype(float) if problem.weekly_limits is not None
+            else np.full((n_employees, n_weeks), np.inf)
+        )
+        self.total_limits = problem.total_limits.astype(float)
+        self.open_slots = np.argwhere(problem.open_cells.any(axis=0))
+
+        weights = problem.objective_weights
+        self.w_coverage = weights.get("coverage", 0)
+        self.w_deviation = weights.get("work_percentage_deviation", 0)
+        self.w_total = weights.get("total_unfairness", 0)
+        self.w_shift_type = weights.get("shift_type_unfairness", 0)
+        self.w_weekend = weights.get("weekend_unfairness", 0)
+        self.k_staff = problem.shortfall_weights["min_staff"]
+        self.k_experience = problem.shortfall_weights["min_experience"]
+        self.k_coverage = problem.shortfall_weights["min_coverage"]
+
+        # Assignment and the aggregates every move updates incrementally
+        self.x = np.zeros((n_employees, n_days, n_shifts), dtype=bool)
+        self.fixed = np.zeros_like(self.x)  # Required cells, never moved
+        self.totals = np.zeros(n_employees)
+        self.weekly = np.zeros((n_employees, n_weeks))
+        self.daily = np.zeros((n_employees, n_days))
+        self.by_shift = np.zeros((n_employees, n_shifts))
+        self.weekends = np.zeros(n_employees)
+        self.staff = np.zeros((n_days, n_shifts))
+        self.slot_experience = np.zeros((n_days, n_shifts))
+        self.shift_staff = np.zeros(n_shifts)
+        self.unmet_required: List[Tuple[int, int, int]] = []
+        self.moves = 0
+
+    def solve(self, time_limit: float, stop_event: Optional[Any] = None) -> HeuristicResult:
+        """Construct, improve and perturb until the time limit or STALL_ROUNDS rounds without gain."""
+        started = time.perf_counter()
+        deadline = started + max(time_limit, 0.0)
+
+        def out_of_time() -> bool:
+            return time.perf_counter() >= deadline or (stop_event is not None and stop_event.is_set())
+
+        self._construct()
+        self._local_search(out_of_time)
+        best_objective, best = self.objective(), self._snapshot()
+
+        rounds = stall = 0
+        while stall < STALL_ROUNDS and not out_of_time():
+            self._perturb()
+            self._local_search(out_of_time)
+            rounds += 1
+            objective = self.objective()
+            if objective > best_objective + EPSILON:
+                best_objective, best = objective, self._snapshot()
+                stall = 0
+            else:
+                self._restore(best)
+                stall += 1
+        self._restore(best)
+
+        return HeuristicResult(
+            assigned=self.x.copy(),
+            objective=round(best_objective, 6),
+            shortfalls=self.shortfalls(),
+            unmet_required=list(self.unmet_required),
+            rounds=rounds,
+            moves=self.moves,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    def objective(self) -> float:
+        """Full objective of the current assignment (maximized, like the Gurobi model)."""
+        p = self.problem
+        value = (
+            self.w_coverage * self.x.sum()
+            - self.w_deviation * np.abs(self.totals - p.targets).sum()
+            - self.w_total * _spread(self.totals)
+            - float(p.penalty[self.x].sum())
+            - self.w_shift_type * sum(_spread(self.by_shift[:, s]) for s in range(self.by_shift.shape[1]))
+            - self.w_weekend * _spread(self.weekends)
+        )
+        for family, _, _, _, shortfall in self.shortfalls():
+            value -= p.shortfall_weights[family] * shortfall
+        return float(value)
+
+    def shortfalls(self) -> List[Tuple[str, Optional[int], int, float, float]]:
+        """Unmet minimum requirements as (family, day, shift, required, shortfall)."""
+        p = self.problem
+        result = []
+        for family, demand, value in (("min_staff", p.slot_demand, self.staff),
+                                      ("min_experience", p.experience_demand, self.slot_experience)):
+            short = np.maximum(demand - value, 0)
+            for d, s in np.argwhere(short > EPSILON).tolist():
+                result.append((family, d, s, float(demand[d, s]), float(short[d, s])))
+        short = np.maximum(p.coverage_demand - self.shift_staff, 0)
+        for s in np.flatnonzero(short > EPSILON).tolist():
+            result.append(("min_coverage", None, s, float(p.coverage_demand[s]), float(short[s])))
+        return result
+
+    # Moves
+
+    def _apply(self, e: int, d: int, s: int, sign: int):
+        """Add (sign=1) or remove (sign=-1) one assignment and update the aggregates."""
+        self.x[e, d, s] = sign > 0
+        self.totals[e] += sign
+        self.weekly[e, self.week_of_day[d]] += sign
+        self.daily[e, d] += sign
+        self.by_shift[e, s] += sign
+        if self.problem.weekend_days[d]:
+            self.weekends[e] += sign
+        self.staff[d, s] += sign
+        self.slot_experience[d, s] += sign * self.problem.experience[e]
+        self.shift_staff[s] += sign
+        self.moves += 1
+
+    def _eligible(self, d: int, s: int) -> np.ndarray:
+        """Employees who can take slot (d, s) without breaking a hard limit."""
+        w = self.week_of_day[d]
+        ok = (
+            self.problem.open_cells[:, d, s]
+            & (self.daily[:, d] == 0)
+            & (self.totals < self.total_limits)
+            & (self.weekly[:, w] < self.weekly_limits[:, w])
+        )
+        return np.flatnonzero(ok)
+
+    def _slot_penalty_change(self, d: int, s: int, staff_change: int, experience_change) -> np.ndarray:
+        """Change of the shortfall penalties when slot (d, s) gains staff and experience."""
+        p = self.problem
+        staff, experience, coverage = self.staff[d, s], self.slot_experience[d, s], self.shift_staff[s]
+        change = self.k_staff * (max(p.slot_demand[d, s] - staff - staff_change, 0) - max(p.slot_demand[d, s] - staff, 0))
+        change += self.k_coverage * (max(p.coverage_demand[s] - coverage - staff_change, 0) - max(p.coverage_demand[s] - coverage, 0))
+        demand = p.experience_demand[d, s]
+        change += self.k_experience * (np.maximum(demand - experience - experience_change, 0) - max(demand - experience, 0))
+        return change
+
+    def _toggle_gain(self, d: int, s: int, employees: np.ndarray, sign: int) -> np.ndarray:
+        """Objective gain of adding (sign=1) or removing (sign=-1) slot (d, s) for each employee."""
+        p = self.problem
+        totals, targets = self.totals[employees], p.targets[employees]
+        gain = sign * self.w_coverage - self.w_deviation * (np.abs(totals + sign - targets) - np.abs(totals - targets))
+        gain = gain - self.w_total * (_spread_after(self.totals, employees, sign) - _spread(self.totals))
+        column = self.by_shift[:, s]
+        gain -= self.w_shift_type * (_spread_after(column, employees, sign) - _spread(column))
+        if p.weekend_days[d]:
+            gain -= self.w_weekend * (_spread_after(self.weekends, employees, sign) - _spread(self.weekends))
+        gain -= sign * p.penalty[employees, d, s]
+        gain -= self._slot_penalty_change(d, s, sign, sign * p.experience[employees])
+        return gain
+
+    def _reassign_gain(self, e: int, d: int, s: int, candidates: np.ndarray) -> np.ndarray:
+        """Objective gain of handing e's slot (d, s) to each candidate."""
+        p = self.problem
+        t = p.targets
+        deviation = (
+            abs(self.totals[e] - 1 - t[e]) - abs(self.totals[e] - t[e])
+            + np.abs(self.totals[candidates] + 1 - t[candidates]) - np.abs(self.totals[candidates] - t[candidates])
+        )
+        gain = -self.w_deviation * deviation
+        gain -= self.w_total * (_spread_after(self.totals, candidates, 1, e, -1) - _spread(self.totals))
+        column = self.by_shift[:, s]
+        gain -= self.w_shift_type * (_spread_after(column, candidates, 1, e, -1) - _spread(column))
+        if p.weekend_days[d]:
+            gain -= self.w_weekend * (_spread_after(self.weekends, candidates, 1, e, -1) - _spread(self.weekends))
+        gain -= p.penalty[candidates, d, s] - p.penalty[e, d, s]
+        gain -= self._slot_penalty_change(d, s, 0, p.experience[candidates] - p.experience[e])
+        return gain
+
+    def _swap_gain(self, e: int, d: int, s: int, partners: np.ndarray, partner_shifts: np.ndarray) -> np.ndarray:
+        """Objective gain of e (on shift s) and each partner (on its shift) exchanging shift types on day d."""
+        p = self.problem
+        gain = np.zeros(partners.size)
+        for s2 in np.unique(partner_shifts).tolist():
+            in_shift = partner_shifts == s2
+            js = partners[in_shift]
+            column, other = self.by_shift[:, s], self.by_shift[:, s2]
+            g = -self.w_shift_type * (
+                _spread_after(column, js, 1, e, -1) - _spread(column)
+                + _spread_after(other, js, -1, e, 1) - _spread(other)
+            )
+            g -= p.penalty[e, d, s2] + p.penalty[js, d, s] - p.penalty[e, d, s] - p.penalty[js, d, s2]
+            g -= self._slot_penalty_change(d, s, 0, p.experience[js] - p.experience[e])
+            g -= self._slot_penalty_change(d, s2, 0, p.experience[e] - p.experience[js])
+            gain[in_shift] = g
+        return gain
+
+    # Search phases
+
+    def _construct(self):
+        """Required cells, then the minimum staff of every slot (scarcest slots first)."""
+        p = self.problem
+        for e, d, s in np.argwhere(p.required).tolist():
+            if p.open_cells[e, d, s] and self.staff[d, s] < p.slot_capacity[d, s] and e in self._eligible(d, s):
+                self._apply(e, d, s, 1)
+                self.fixed[e, d, s] = True
+            else:
+                self.unmet_required.append((e, d, s))
+
+        slots = np.argwhere(np.minimum(p.slot_demand, p.slot_capacity) > self.staff)
+        supply = p.open_cells.sum(axis=0)[slots[:, 0], slots[:, 1]]
+        for d, s in slots[np.lexsort((self.rng.random(len(slots)), supply))].tolist():
+            while self.staff[d, s] < min(p.slot_demand[d, s], p.slot_capacity[d, s]):
+                candidates = self._eligible(d, s)
+                if candidates.size == 0:
+                    break
+                gain = self._toggle_gain(d, s, candidates, 1)
+                self._apply(int(candidates[np.argmax(gain)]), d, s, 1)
+
+    def _local_search(self, out_of_time):
+        """Apply improving moves until a full pass finds none (or time runs out)."""
+        improved = True
+        while improved and not out_of_time():
+            improved = False
+            for search_pass in (self._fill_pass, self._reassign_pass, self._swap_pass, self._remove_pass):
+                improved |= search_pass(out_of_time)
+
+    def _movable_cells(self) -> List[List[int]]:
+        """Current non-required assignments in random order."""
+        cells = np.argwhere(self.x & ~self.fixed)
+        return cells[self.rng.permutation(len(cells))].tolist()
+
+    def _fill_pass(self, out_of_time) -> bool:
+        """Add staff to slots below their cap while it improves the objective."""
+        improved = False
+        capacity = self.problem.slot_capacity
+        for d, s in self.open_slots[self.rng.permutation(len(self.open_slots))].tolist():
+            if out_of_time():
+                break
+            while self.staff[d, s] < capacity[d, s]:
+                candidates = self._eligible(d, s)
+                if candidates.size == 0:
+                    break
+                gain = self._toggle_gain(d, s, candidates, 1)
+                best = int(np.argmax(gain))
+                if gain[best] <= EPSILON:
+                    break
+                self._apply(int(candidates[best]), d, s, 1)
+                improved = True
+        return improved
+
+    def _reassign_pass(self, out_of_time) -> bool:
+        """Hand assignments to other employees where that improves the objective."""
+        improved = False
+        for e, d, s in self._movable_cells():
+            if out_of_time():
+                break
+            if not self.x[e, d, s]:
+                continue
+            candidates = self._eligible(d, s)
+            if candidates.size == 0:
+                continue
+            gain = self._reassign_gain(e, d, s, candidates)
+            best = int(np.argmax(gain))
+            if gain[best] > EPSILON:
+                self._apply(e, d, s, -1)
+                self._apply(int(candidates[best]), d, s, 1)
+                improved = True
+        return improved
+
+    def _swap_pass(self, out_of_time) -> bool:
+        """Exchange shift types between two employees working the same day."""
+        improved = False
+        open_cells = self.problem.open_cells
+        for e, d, s in self._movable_cells():
+            if out_of_time():
+                break
+            if not self.x[e, d, s]:
+                continue
+            partners, partner_shifts = np.nonzero(self.x[:, d, :] & ~self.fixed[:, d, :])
+            keep = (partner_shifts != s) & open_cells[e, d, partner_shifts] & open_cells[partners, d, s]
+            partners, partner_shifts = partners[keep], partner_shifts[keep]
+            if partners.size == 0:
+                continue
+            gain = self._swap_gain(e, d, s, partners, partner_shifts)
+            best = int(np.argmax(gain))
+            if gain[best] > EPSILON:
+                e2, s2 = int(partners[best]), int(partner_shifts[best])
+                self._apply(e, d, s, -1)
+                self._apply(e2, d, s2, -1)
+                self._apply(e, d, s2, 1)
+                self._apply(e2, d, s, 1)
+                improved = True
+        return improved
+
+    def _remove_pass(self, out_of_time) -> bool:
+        """Drop assignments that cost more than they add."""
+        improved = False
+        for e, d, s in self._movable_cells():
+            if out_of_time():
+                break
+            if self._toggle_gain(d, s, np.array([e]), -1)[0] > EPSILON:
+                self._apply(e, d, s, -1)
+                improved = True
+        return improved
+
+    def _perturb(self):
+        """Drop a random PERTURB_SHARE of the non-required assignments."""
+        cells = np.argwhere(self.x & ~self.fixed)
+        if len(cells) == 0:
+            return
+        count = max(1, int(len(cells) * PERTURB_SHARE))
+        for e, d, s in cells[self.rng.choice(len(cells), count, replace=False)].tolist():
+            self._apply(e, d, s, -1)
+
+    def _snapshot(self) -> Dict[str, np.ndarray]:
+        names = ("x", "totals", "weekly", "daily", "by_shift", "weekends", "staff", "slot_experience", "shift_staff")
+        return {name: getattr(self, name).copy() for name in names}
+
+    def _restore(self, snapshot: Dict[str, np.ndarray]):
+        for name, value in snapshot.items():
+            setattr(self, name, value.copy())
+
+
+def solve_heuristic(problem: ScheduleProblem, time_limit: float, seed: Optional[int] = None,
+                    stop_event: Optional[Any] = None) -> HeuristicResult:
+    """
+    Build a schedule for the problem with the greedy + local-search heuristic.
+
+    Args:
+        problem: Cells, limits, demands and objective weights of the instance
+        time_limit: Seconds the search may run (construction always completes)
+        seed: Random seed for slot order, move order and perturbations
+        stop_event: threading.Event that ends the search early (best schedule is returned)
+
+    Returns:
+        HeuristicResult with the assignment tensor, its objective and unmet requirements
+    """
+    return HeuristicScheduler(problem, seed).solve(time_limit, stop_event)
@@ -0,0 +1,139 @@
+"""
+Translate a Gurobi IIS (Irreducible Inconsistent Subsystem) into planner-readable causes.
+
+The optimizer names every constraint after what it enforces (min_staff_{day}_{shift},
+global_work_percentage_{employee}_max_{n}, ...), and preference blocks / AI hard_required
+cells are variable bounds (UB=0 / LB=1). An IIS is a minimal set of those constraints and
+bounds that cannot hold together, so each member maps to one concrete cause such as
+"Anna is unavailable on 2025-03-04 night (excluded shift)".
+"""
+
+import re
+from typing import List, Dict, Any, Tuple, Optional, Callable
+
+from services.preference_compiler import BLOCK_REASONS
+from services.schedule_index import ScheduleIndex
+
+# Causes listed in the error message (the diagnosis keeps all of them)
+MAX_REPORTED_CAUSES = 15
+
+# Planner-facing wording per preference block reason (see BLOCK_REASONS)
+BLOCK_REASON_TEXT = {
+    "no_valid_days": "no valid available days",
+    "hard_unavailable_day": "not one of their available days",
+    "excluded_shift": "excluded shift type",
+    "excluded_day": "excluded day",
+    "hard_non_preferred_shift": "only works preferred shift types",
+    "hard_blocked_slot": "hard blocked slot",
+    "ai_hard_unavailable": "AI constraint: unavailable",
+}
+
+_SHIFT = r"(day|evening|night)"
+
+# (pattern, cause type, message builder); builders get the match groups, the RHS and a context
+_CONSTRAINT_PATTERNS: List[Tuple[re.Pattern, str, Callable]] = [
+    (re.compile(rf"^min_staff_(\d+)_{_SHIFT}$"), "min_staff",
+     lambda g, rhs, ctx: (ctx.day(g[0]), g[1], None, f"{ctx.date(g[0])} {g[1]} needs at least {rhs:g} staff")),
+    (re.compile(rf"^max_staff_(\d+)_{_SHIFT}$"), "max_staff",
+     lambda g, rhs, ctx: (ctx.day(g[0]), g[1], None, f"{ctx.date(g[0])} {g[1]} allows at most {rhs:g} staff")),
+    (re.compile(rf"^min_experience_(\d+)_{_SHIFT}$"), "min_experience",
+     lambda g, rhs, ctx: (ctx.day(g[0]), g[1], None, f"{ctx.date(g[0])} {g[1]} needs {rhs:g} experience points")),
+    (re.compile(rf"^min_coverage_{_SHIFT}$"), "min_coverage",
+     lambda g, rhs, ctx: (None, g[0], None, f"All {g[0]} shifts must be covered ({rhs:g} person-shifts)")),
+    (re.compile(r"^max_one_shift_per_day_(.+)_(\d+)$"), "one_shift_per_day",
+     lambda g, rhs, ctx: (ctx.day(g[1]), None, g[0], f"{ctx.name(g[0])} can work at most one shift on {ctx.date(g[1])}")),
+    (re.compile(r"^default_max_(\d+)_days_per_week_(.+)_week_(\d+)$"), "weekly_limit",
+     lambda g, rhs, ctx: (ctx.day(g[2]), None, g[1], f"{ctx.name(g[1])} may work at most {g[0]} days in the week from {ctx.date(g[2])} ({ctx.work_percentage(g[1])}% work percentage)")),
+    (re.compile(r"^custom_max_(\d+)_shifts_per_week_(.+)_week_(\d+)$"), "preferred_weekly_limit",
+     lambda g, rhs, ctx: (ctx.day(g[2]), None, g[1], f"{ctx.name(g[1])} prefers at most {g[0]} shifts in the week from {ctx.date(g[2])}")),
+    (re.compile(r"^global_work_percentage_(.+)_max_(\d+)$"), "work_percentage",
+     lambda g, rhs, ctx: (None, None, g[0], f"{ctx.name(g[0])} may work at most {g[1]} shifts in the period ({ctx.work_percentage(g[0])}% work percentage)")),
+]
+
+
+class _Context:
+    """Lookups used by the message builders."""
+
+    def __init__(self, index: ScheduleIndex):
+        self.index = index
+
+    def day(self, day: str) -> int:
+        return int(day)
+
+    def date(self, day: str) -> str:
+        d = int(day)
+        return self.index.date_strings[d] if 0 <= d < len(self.index.date_strings) else f"day {d}"
+
+    def name(self, employee_id: str) -> str:
+        return self.index.employee_name(employee_id, default=employee_id)
+
+    def work_percentage(self, employee_id: str):
+        return self.index.employees_by_id.get(employee_id, {}).get('work_percentage', 100)
+
+
+def explain_iis(
+    constraints: List[Tuple[str, float]],
+    blocked_cells: List[Tuple[str, int, str, int]],
+    required_cells: List[Tuple[str, int, str]],
+    index: ScheduleIndex,
+) -> List[Dict[str, Any]]:
+    """
+    Map IIS members to readable causes.
+
+    Args:
+        constraints: (name, RHS) of every constraint in the IIS
+        blocked_cells: (employee_id, day, shift, BLOCK_REASONS code) of IIS upper bounds at 0
+        required_cells: (employee_id, day, shift) of IIS lower bounds at 1 (AI hard_required)
+        index: Date and employee lookups of the solve
+
+    Returns:
+        List of causes with type, date / shift_type / employee_id when known, and message
+    """
+    ctx = _Context(index)
+    causes = []
+
+    def add(cause_type: str, day: Optional[int], shift: Optional[str], employee_id: Optional[str], message: str):
+        cause = {"type": cause_type}
+        if day is not None:
+            cause["date"] = ctx.date(str(day))
+        if shift is not None:
+            cause["shift_type"] = shift
+        if employee_id is not None:
+            cause["employee_id"] = employee_id
+        cause["message"] = message
+        causes.append(cause)
+
+    for name, rhs in constraints:
+        for pattern, cause_type, build in _CONSTRAINT_PATTERNS:
+            match = pattern.match(name)
+            if match:
+                add(cause_type, *build(match.groups(), rhs, ctx))
+                break
+        else:
+            add("other", None, None, None, f"Constraint {name}")
+
+    # One cause per employee, shift type and block reason, listing the blocked dates
+    blocked_dates: Dict[Tuple[str, str, int], List[int]] = {}
+    for emp_id, day, shift, reason_code in blocked_cells:
+        blocked_dates.setdefault((emp_id, shift, reason_code), []).append(day)
+    for (emp_id, shift, reason_code), days in blocked_dates.items():
+        reason = BLOCK_REASON_TEXT.get(BLOCK_REASONS.get(reason_code), "blocked")
+        if len(days) == 1:
+            add("hard_blocked", days[0], shift, emp_id, f"{ctx.name(emp_id)} is unavailable on {ctx.date(str(days[0]))} {shift} ({reason})")
+            continue
+        dates = [ctx.date(str(day)) for day in sorted(days)]
+        add("hard_blocked", None, shift, emp_id, f"{ctx.name(emp_id)} is unavailable for {shift} shifts on {len(dates)} dates {dates[0]} to {dates[-1]} ({reason})")
+        causes[-1]["dates"] = dates
+
+    for emp_id, day, shift in required_cells:
+        add("ai_hard_required", day, shift, emp_id, f"{ctx.name(emp_id)} is required on {ctx.date(str(day))} {shift} (AI constraint)")
+
+    return causes
+
+
+def summarize_causes(causes: List[Dict[str, Any]], limit: int = MAX_REPORTED_CAUSES) -> str:
+    """One-line list of the first causes for error messages and logs."""
+    parts = [cause["message"] for cause in causes[:limit]]
+    if len(causes) > limit:
+        parts.append(f"... and {len(causes) - limit} more")
+    return "; ".join(parts)
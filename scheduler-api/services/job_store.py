@@ -0,0 +1,162 @@
+"""
+SQLite-backed store for asynchronous optimization jobs.
+
+Gunicorn runs several worker processes, so job state cannot live in memory: a job
+submitted to one worker is polled through whichever worker receives the next request.
+Every operation opens its own short-lived connection (WAL mode), which keeps the store
+safe across processes and across the solver threads of one process.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Dict, Any, Optional, Tuple
+
+from config import logger
+
+# Job lifecycle
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+PENDING_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    request TEXT,
+    result TEXT,
+    error TEXT,
+    error_status INTEGER,
+    worker_pid INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class JobStore:
+    """Create, update and read optimization jobs in a SQLite file shared by all workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, request: Dict[str, Any], max_pending: Optional[int] = None) -> Tuple[Optional[str], int]:
+        """
+        Register a new queued job unless the queue is full.
+        
+        The pending count and the insert run in one BEGIN IMMEDIATE transaction, which takes
+        SQLite's write lock first, so concurrent workers cannot both pass the limit.
+        
+        Args:
+            request: Request payload stored with the job
+            max_pending: Queued + running jobs allowed across all workers (None = no limit)
+        
+        Returns:
+            (job id, pending jobs before it); the job id is None when the queue is full
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.isolation_level = None  # Explicit transaction below
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", PENDING_STATUSES
+                ).fetchone()[0]
+                if max_pending is not None and pending >= max_pending:
+                    conn.execute("ROLLBACK")
+                    return None, pending
+                conn.execute(
+                    "INSERT INTO jobs (id, status, progress, message, request, worker_pid, created_at, updated_at) "
+                    "VALUES (?, ?, 0, ?, ?, ?, ?, ?)",
+                    (job_id, JOB_QUEUED, "Waiting for a free solver", json.dumps(request), os.getpid(), now, now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return job_id, pending
+
+    def update(self, job_id: str, status: Optional[str] = None, progress: Optional[float] = None,
+               message: Optional[str] = None, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None, error_status: Optional[int] = None):
+        """Update the given fields of a job (None leaves a field unchanged)."""
+        fields = {
+            "status": status,
+            "progress": progress,
+            "message": message,
+            "result": json.dumps(result) if result is not None else None,
+            "error": error,
+            "error_status": error_status,
+        }
+        fields = {name: value for name, value in fields.items() if value is not None}
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+        """Job record as a dict, or None if the job does not exist."""
+        columns = "id, status, progress, message, error, error_status, created_at, updated_at"
+        if include_result:
+            columns += ", result"
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if include_result and job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def fail_orphaned(self):
+        """Fail pending jobs whose worker process no longer exists (e.g. after a worker restart)."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, worker_pid FROM jobs WHERE status IN (?, ?)", PENDING_STATUSES
+            ).fetchall()
+        orphaned = [row["id"] for row in rows if not _process_alive(row["worker_pid"])]
+        for job_id in orphaned:
+            self.update(job_id, status=JOB_FAILED, error="Worker restarted before the job finished", error_status=500)
+        if orphaned:
+            logger.warning(f"Marked {len(orphaned)} orphaned jobs as failed")
+
+    def purge(self, max_age_hours: float):
+        """Delete finished jobs older than max_age_hours."""
+        cutoff = time.time() - max_age_hours * 3600
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND updated_at < ?",
+                (*PENDING_STATUSES, cutoff)
+            )
+        if cursor.rowcount:
+            logger.info(f"🧹 Purged {cursor.rowcount} finished jobs older than {max_age_hours}h")
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this id exists on this host."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
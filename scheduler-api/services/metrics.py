@@ -0,0 +1,126 @@
+"""
+Prometheus metrics for the API and the schedule optimizer.
+
+Request latency is recorded per route by the HTTP middleware (middleware.setup_metrics),
+solver metrics by GurobiScheduleOptimizer from its SolveLog phase records (phase durations,
+model size, solver status, MIP gap at termination) and relaxation fallbacks, and Supabase /
+OpenAI latencies by wrapping each call in external_call().
+
+Only counters and histograms are used, so values aggregate across Gunicorn workers: with
+PROMETHEUS_MULTIPROC_DIR set (gunicorn.conf.py does this) every worker writes its samples
+to files in that directory and /metrics merges them; without it (a single uvicorn process)
+the in-process registry is served.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+from gurobipy import GRB
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+from config import PROMETHEUS_MULTIPROC_DIR
+from services.request_timing import record
+
+# Seconds; solves run up to SOLVE_MAX_DEADLINE_MS (10 minutes)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+SIZE_BUCKETS = (100, 500, 1000, 2000, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000, 2500000)
+GAP_BUCKETS = (0, 0.0001, 0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1)
+
+# Gurobi status codes as names (backend statuses are strings already)
+GUROBI_STATUS_NAMES = {
+    getattr(GRB.Status, name): name.lower() for name in dir(GRB.Status) if name.isupper()
+}
+
+# SolveLog.step counters ("<step>_ms") of the model build phases
+BUILD_STEPS = ("variables", "constraints", "objective", "model")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "scheduler_http_request_duration_seconds", "HTTP request latency per route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+SOLVE_PHASE_SECONDS = Histogram(
+    "scheduler_solve_phase_duration_seconds",
+    "Optimizer phase duration (compile_preferences, feasibility_screen, build_model, solve, extract_solution, relaxation, ...)",
+    ["phase"], buckets=LATENCY_BUCKETS
+)
+MODEL_BUILD_STEP_SECONDS = Histogram(
+    "scheduler_model_build_step_duration_seconds", "Model build steps (variables, constraints, objective, model)",
+    ["step"], buckets=LATENCY_BUCKETS
+)
+MODEL_SIZE = Histogram(
+    "scheduler_model_size", "Size of each built model", ["dimension"], buckets=SIZE_BUCKETS
+)
+SOLVER_STATUS = Counter(
+    "scheduler_solver_status", "Solver runs by termination status", ["phase", "status"]
+)
+SOLVER_MIP_GAP = Histogram(
+    "scheduler_solver_mip_gap", "Relative MIP gap at termination of runs with a solution", ["phase"], buckets=GAP_BUCKETS
+)
+RELAXATION_FALLBACKS = Counter(
+    "scheduler_relaxation_fallbacks",
+    "Requests answered with relaxed requirements (rebuild, elastic, heuristic) or by the heuristic fallback (license)",
+    ["kind"]
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "scheduler_external_call_duration_seconds", "Supabase and OpenAI call latency",
+    ["service", "operation", "outcome"], buckets=LATENCY_BUCKETS
+)
+
+
+def _phase_label(name: str) -> str:
+    """Relaxation phases carry their experience level; aggregate them into one label."""
+    return "relaxation" if name.startswith("relaxation_") else name
+
+
+def observe_solve_phases(phases: List[Dict[str, Any]]):
+    """Record one optimization's SolveLog phase records (durations, model sizes, statuses, gaps)."""
+    for record in phases:
+        phase = _phase_label(record["phase"])
+        SOLVE_PHASE_SECONDS.labels(phase=phase).observe(record["ms"] / 1000)
+        for step in BUILD_STEPS:
+            if f"{step}_ms" in record:
+                MODEL_BUILD_STEP_SECONDS.labels(step=step).observe(record[f"{step}_ms"] / 1000)
+        for dimension in ("vars", "constrs", "nonzeros"):
+            if dimension in record:
+                MODEL_SIZE.labels(dimension=dimension).observe(record[dimension])
+        if "status" in record:
+            status = GUROBI_STATUS_NAMES.get(record["status"], str(record["status"]).lower())
+            SOLVER_STATUS.labels(phase=phase, status=status).inc()
+        if record.get("gap") is not None:
+            SOLVER_MIP_GAP.labels(phase=phase).observe(record["gap"])
+
+
+def record_fallback(kind: str):
+    """Count a request that needed relaxed requirements or the heuristic fallback."""
+    RELAXATION_FALLBACKS.labels(kind=kind).inc()
+
+
+@contextmanager
+def external_call(service: str, operation: str):
+    """
+    Time a Supabase / OpenAI call; exceptions are counted as outcome="error" and re-raised.
+    
+    The call also shows up in the request's Server-Timing header as "<service>.<operation>".
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - started
+        EXTERNAL_CALL_SECONDS.labels(service=service, operation=operation, outcome=outcome).observe(elapsed)
+        record(f"{service}.{operation}", elapsed * 1000)
+
+
+def render_metrics() -> tuple:
+    """Exposition text and content type; merges every worker's samples in multiprocess mode."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
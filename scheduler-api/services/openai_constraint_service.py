@@ -11,6 +11,7 @@ import re
 
 from openai import OpenAI
 from config import logger
+from services.metrics import external_call
 
 # OpenAI client will be initialized lazily
 _client = None
@@ -168,13 +169,14 @@ Tolka användarens begäran och anropa rätt funktion."""
             
             # Call OpenAI with function calling
             client = get_openai_client()
-            response = client.chat.completions.create(
-                model=MODEL,
-                messages=self.conversation_history,
-                functions=functions,
-                function_call="auto",
-                temperature=0.1
-            )
+            with external_call("openai", "chat_completion"):
+                response = client.chat.completions.create(
+                    model=MODEL,
+                    messages=self.conversation_history,
+                    functions=functions,
+                    function_call="auto",
+                    temperature=0.1
+                )
             
             message = response.choices[0].message
             
@@ -2,10 +2,11 @@
 """Core service for schedule optimization - now exclusively using Gurobi mathematical optimization."""
 
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from fastapi import HTTPException
 from config import logger
-from services.gurobi_optimizer_service import optimize_schedule_with_gurobi
+from services.gurobi_optimizer_service import optimize_schedule_with_gurobi, OPTIMIZERS
+from services.solve_budget import SolveBudget
 
 def optimize_schedule(
     employees: List[Dict], 
@@ -13,7 +14,7 @@ def optimize_schedule(
     end_date: datetime, 
     department: Optional[str] = None, 
     random_seed: Optional[int] = None,
-    optimizer: str = "gurobi",  # Keep for API compatibility, but only Gurobi is supported
+    optimizer: str = "gurobi",
     min_staff_per_shift: int = 1,
     max_staff_per_shift: Optional[int] = None,
     min_experience_per_shift: int = 1,
@@ -22,7 +23,16 @@ def optimize_schedule(
     optimize_for_cost: bool = False,
     employee_preferences: Optional[List] = None,
     manual_constraints: Optional[List] = None,
-    ai_constraints: Optional[List[Dict]] = None
+    ai_constraints: Optional[List[Dict]] = None,
+    use_matrix_api: bool = False,
+    warm_start: Optional[List[Dict]] = None,
+    relaxation_mode: str = "rebuild",
+    solver_event_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    stop_event: Optional[Any] = None,
+    solve_budget: Optional[SolveBudget] = None,
+    debug_logging: bool = False,
+    diagnose_infeasibility: bool = False,
+    heuristic_start: bool = False
 ):
     """
     Core function to optimize the employee schedule using Gurobi.
@@ -39,7 +49,8 @@ def optimize_schedule(
         end_date: Schedule end date
         department: Department filter (optional, for API compatibility)
         random_seed: Random seed for reproducible results
-        optimizer: Optimizer type (only "gurobi" supported)
+        optimizer: "gurobi", "heuristic" (NumPy greedy + local search, no solver license needed),
+            "highs" or "cpsat" (open-source backends, see services.solver_backends)
         min_staff_per_shift: Minimum staff required per shift
         max_staff_per_shift: Maximum staff allowed per shift (None = same as min)
         min_experience_per_shift: Minimum experience points required per shift
@@ -49,6 +60,15 @@ def optimize_schedule(
         employee_preferences: Individual employee work preferences
         manual_constraints: AI-parsed or manually added constraints (legacy)
         ai_constraints: AI-parsed constraints from Supabase (Gurobi-ready format)
+        use_matrix_api: Build the Gurobi model with the matrix API (faster for large departments)
+        warm_start: Shifts from a previous or edited schedule, loaded as MIP start
+        relaxation_mode: Infeasibility handling, "rebuild" (per experience level) or "elastic" (single solve)
+        solver_event_callback: Receives incumbent / progress events while the solver runs
+        stop_event: threading.Event that stops the solve early (best incumbent is returned)
+        solve_budget: Overall deadline, MIP gap, threads and node limit for the request
+        debug_logging: Verbose per-item logging and full Gurobi log for this request
+        diagnose_infeasibility: Compute an IIS when the requirements cannot be met
+        heuristic_start: Seed the Gurobi solve with the heuristic schedule as MIP start
     
     Returns:
         Optimized schedule dictionary with coverage stats and employee assignments
@@ -65,8 +85,9 @@ def optimize_schedule(
         employees = [emp for emp in employees if emp.get('department') == department]
         logger.info(f"Filtered to {len(employees)} employees in department: {department}")
     
-    if optimizer != "gurobi":
+    if optimizer not in OPTIMIZERS:
         logger.warning(f"Optimizer '{optimizer}' not supported. Using Gurobi instead.")
+        optimizer = "gurobi"
     
     try:
         # Use the dedicated Gurobi optimizer service
@@ -82,13 +103,23 @@ def optimize_schedule(
             optimize_for_cost=optimize_for_cost,
             random_seed=random_seed,
             employee_preferences=employee_preferences,
-            ai_constraints=ai_constraints
+            ai_constraints=ai_constraints,
+            use_matrix_api=use_matrix_api,
+            warm_start=warm_start,
+            relaxation_mode=relaxation_mode,
+            solver_event_callback=solver_event_callback,
+            stop_event=stop_event,
+            solve_budget=solve_budget,
+            debug_logging=debug_logging,
+            diagnose_infeasibility=diagnose_infeasibility,
+            optimizer=optimizer,
+            heuristic_start=heuristic_start
         )
         
         # Add department info to schedule items
+        employees_by_id = {e["id"]: e for e in employees}
         for shift in result["schedule"]:
-            emp_id = shift["employee_id"]
-            emp = next((e for e in employees if e["id"] == emp_id), {})
+            emp = employees_by_id.get(shift["employee_id"], {})
             shift["department"] = emp.get('department', 'Unknown')
         
         # Add fairness stats if not present (legacy compatibility)
@@ -0,0 +1,312 @@
+"""
+Compile employee preferences and AI constraints into employee×day×shift tensors.
+
+Every preference source (available_days_strict, excluded_shifts, excluded_days,
+preferred_shifts_strict, hard_blocked_slots, AI hard_unavailable) ends up in one
+boolean "blocked" tensor, and every soft preference (non-preferred shifts and days,
+medium_blocked_slots, AI soft_preference) in one float "penalty" tensor. The optimizer
+applies them as variable bounds and objective coefficients in bulk, so duplicate
+blocks collapse for free and no per-cell equality rows are added to the model.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from config import logger
+from services.schedule_index import ScheduleIndex
+
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Map shift names (Swedish → English) used by AI-parsed constraints
+AI_SHIFT_NAME_MAP = {
+    'dag': 'day',
+    'day': 'day',
+    'kväll': 'evening',
+    'evening': 'evening',
+    'kvall': 'evening',  # Without umlaut
+    'natt': 'night',
+    'night': 'night'
+}
+
+# Why a cell is blocked (first source wins); 0 means the cell is open
+BLOCK_REASONS = {
+    1: "no_valid_days",
+    2: "hard_unavailable_day",
+    3: "excluded_shift",
+    4: "excluded_day",
+    5: "hard_non_preferred_shift",
+    6: "hard_blocked_slot",
+    7: "ai_hard_unavailable",
+}
+_REASON_CODES = {name: code for code, name in BLOCK_REASONS.items()}
+
+# Default objective weights per soft preference source
+DEFAULT_PENALTY_WEIGHTS = {
+    "non_preferred_shift": 50,
+    "medium_blocked": 30,
+    "non_preferred_day": 12,
+}
+
+
+@dataclass
+class CompiledPreferences:
+    """Preference tensors indexed [employee, day, shift] in optimizer order."""
+    blocked: np.ndarray                  # bool: employee may never work this cell
+    block_reason: np.ndarray             # int8: BLOCK_REASONS code of the first hard block
+    required: np.ndarray                 # bool: employee must work this cell (AI hard_required)
+    penalty: np.ndarray                  # float: objective penalty for working this cell
+    weekly_limits: Dict[str, int] = field(default_factory=dict)  # custom max_shifts_per_week
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def _validate_preferences(employee_preferences: List) -> List:
+    """Drop preferences without an employee_id and warn about suspicious values."""
+    valid_preferences = []
+    for pref in employee_preferences:
+        try:
+            if not getattr(pref, 'employee_id', None):
+                logger.warning("Invalid preference: missing employee_id")
+                continue
+
+            max_shifts = getattr(pref, 'max_shifts_per_week', None)
+            if max_shifts is not None and (not isinstance(max_shifts, int) or max_shifts < 0 or max_shifts > 7):
+                logger.warning(f"Invalid max_shifts_per_week for employee {pref.employee_id}: {max_shifts}, using default 5")
+
+            invalid_days = [day for day in (getattr(pref, 'available_days', None) or []) if day.lower() not in WEEKDAY_NAMES]
+            if invalid_days:
+                logger.warning(f"Invalid available_days for employee {pref.employee_id}: {invalid_days}")
+
+            valid_preferences.append(pref)
+        except Exception as e:
+            logger.error(f"Error validating preferences for employee {getattr(pref, 'employee_id', 'unknown')}: {e}")
+
+    if len(valid_preferences) != len(employee_preferences):
+        logger.warning(f"Filtered {len(employee_preferences)} preferences down to {len(valid_preferences)} valid ones")
+    return valid_preferences
+
+
+def compile_preferences(
+    employees: List[Dict],
+    dates: List[datetime],
+    shift_types: List[str],
+    employee_preferences: Optional[List] = None,
+    ai_constraints: Optional[List[Dict]] = None,
+    penalty_weights: Optional[Dict[str, float]] = None,
+    index: Optional[ScheduleIndex] = None
+) -> CompiledPreferences:
+    """
+    Turn every preference source into blocked / required / penalty tensors.
+
+    Args:
+        employees: Employee dictionaries (defines the employee axis order)
+        dates: Scheduling dates (defines the day axis order)
+        shift_types: Shift type names (defines the shift axis order)
+        employee_preferences: EmployeePreference objects from the request
+        ai_constraints: AI-parsed constraints (Gurobi-ready dict format)
+        penalty_weights: Objective weight per soft source, see DEFAULT_PENALTY_WEIGHTS
+        index: Lookup maps for this solve (built from employees and dates if omitted)
+
+    Returns:
+        CompiledPreferences with tensors of shape (employees, days, shifts)
+    """
+    weights = {**DEFAULT_PENALTY_WEIGHTS, **(penalty_weights or {})}
+    shape = (len(employees), len(dates), len(shift_types))
+
+    block_reason = np.zeros(shape, dtype=np.int8)
+    required = np.zeros(shape, dtype=bool)
+    non_preferred_shift = np.zeros(shape, dtype=bool)
+    non_preferred_day = np.zeros(shape, dtype=bool)
+    medium_blocked = np.zeros(shape, dtype=bool)
+    ai_soft_penalty = np.zeros(shape, dtype=float)
+    weekly_limits = {}
+    stats = {
+        "hard_blocked_slots": 0,
+        "medium_blocked_slots": 0,
+        "ai_hard_unavailable": 0,
+        "ai_hard_required": 0,
+        "ai_soft_preferences": 0,
+        "ai_skipped": 0,
+    }
+
+    def block(where, reason: str):
+        # Only record the first reason per cell so diagnostics point at the original source
+        cells = block_reason[where]
+        block_reason[where] = np.where(cells == 0, _REASON_CODES[reason], cells)
+
+    index = index or ScheduleIndex.build(employees, dates)
+    employee_index = index.employee_index
+    shift_index = {shift: s for s, shift in enumerate(shift_types)}
+    weekdays = np.array([date.weekday() for date in dates], dtype=int)
+    day_names = np.array([WEEKDAY_NAMES[weekday] for weekday in weekdays])
+
+    def slot_index(slot_date: str, slot_shifts: List[str], emp_id: str, kind: str):
+        """Resolve a blocked slot to (day, [shift indices]) or None if outside the period."""
+        try:
+            d = index.day_of(slot_date)
+        except ValueError as e:
+            logger.error(f"Invalid date format in {kind} blocked slot for employee {emp_id}: {slot_date} - {e}")
+            return None
+        if d is None:
+            logger.warning(f"{kind.capitalize()} blocked date {slot_date} for employee {emp_id} is outside scheduling period - skipping")
+            return None
+
+        shifts = []
+        for shift_type in slot_shifts:
+            if shift_type == 'all_day':
+                shifts.extend(range(len(shift_types)))
+            elif shift_type in shift_index:
+                shifts.append(shift_index[shift_type])
+            else:
+                logger.warning(f"Unknown shift type '{shift_type}' in {kind} blocked slot for employee {emp_id} - skipping")
+        return d, shifts
+
+    # 1. Employee preferences
+    valid_preferences = _validate_preferences(employee_preferences or [])
+    for pref in valid_preferences:
+        e = employee_index.get(pref.employee_id)
+        if e is None:
+            logger.debug(f"Preferences for employee {pref.employee_id} not in this schedule - skipping")
+            continue
+        emp_id = pref.employee_id
+
+        # Available days (hard or soft)
+        available_days = pref.available_days or []
+        if available_days:
+            available_weekdays = [WEEKDAY_NAMES.index(day.lower()) for day in available_days if day.lower() in WEEKDAY_NAMES]
+            if not available_weekdays:
+                logger.warning(f"Employee {emp_id} has no valid available days, they will be blocked from all shifts")
+                block(np.s_[e], "no_valid_days")
+            else:
+                off_days = ~np.isin(weekdays, available_weekdays)
+                if getattr(pref, 'available_days_strict', False):
+                    block(np.s_[e, off_days], "hard_unavailable_day")
+                else:
+                    non_preferred_day[e, off_days] = True
+
+        # Excluded shifts (hard)
+        excluded_shifts = getattr(pref, 'excluded_shifts', None) or []
+        excluded_indices = [shift_index[shift] for shift in excluded_shifts if shift in shift_index]
+        if excluded_indices:
+            block(np.s_[e, :, excluded_indices], "excluded_shift")
+
+        # Excluded days (hard)
+        excluded_days = getattr(pref, 'excluded_days', None) or []
+        if excluded_days:
+            block(np.s_[e, np.isin(day_names, excluded_days)], "excluded_day")
+
+        # Preferred shifts (hard or soft), excluding shifts that are already excluded
+        preferred_shifts = pref.preferred_shifts or shift_types
+        non_preferred = [s for shift, s in shift_index.items() if shift not in excluded_shifts and shift not in preferred_shifts]
+        if non_preferred:
+            if getattr(pref, 'preferred_shifts_strict', False):
+                block(np.s_[e, :, non_preferred], "hard_non_preferred_shift")
+            else:
+                non_preferred_shift[e, :, non_preferred] = True
+
+        # Custom max shifts per week (applied as constraints by the optimizer)
+        max_shifts_per_week = pref.max_shifts_per_week or 5
+        if max_shifts_per_week != 5:
+            weekly_limits[emp_id] = max_shifts_per_week
+
+        # Hard blocked time slots
+        for slot in getattr(pref, 'hard_blocked_slots', None) or []:
+            resolved = slot_index(slot.date, slot.shift_types, emp_id, "hard")
+            if resolved and resolved[1]:
+                block(np.s_[e, resolved[0], resolved[1]], "hard_blocked_slot")
+                stats["hard_blocked_slots"] += 1
+
+        # Medium blocked time slots (strong soft preference)
+        for slot in getattr(pref, 'medium_blocked_slots', None) or []:
+            resolved = slot_index(slot.date, slot.shift_types, emp_id, "medium")
+            if resolved and resolved[1]:
+                medium_blocked[e, resolved[0], resolved[1]] = True
+                stats["medium_blocked_slots"] += 1
+
+    # 2. AI constraints
+    for constraint in ai_constraints or []:
+        emp_id = constraint.get('employee_id')
+        constraint_type = constraint.get('constraint_type')
+        e = employee_index.get(emp_id)
+        if e is None:
+            logger.warning(f"AI constraint for unknown employee {emp_id} - skipping")
+            stats["ai_skipped"] += 1
+            continue
+
+        day_indices = []
+        for date_str in constraint.get('dates', []):
+            try:
+                d = index.day_of(date_str)
+            except ValueError:
+                logger.warning(f"Invalid date format '{date_str}' in AI constraint - skipping this date")
+                continue
+            if d is not None:
+                day_indices.append(d)
+        if not day_indices:
+            logger.warning(f"AI constraint dates outside scheduling period - skipping: {constraint.get('dates', [])}")
+            stats["ai_skipped"] += 1
+            continue
+
+        # Empty shifts = all shifts affected
+        shifts = constraint.get('shifts') or []
+        if not shifts:
+            shift_indices = list(range(len(shift_types)))
+        else:
+            shift_indices = []
+            for shift in shifts:
+                normalized = AI_SHIFT_NAME_MAP.get(shift.lower(), shift.lower())
+                if normalized in shift_index:
+                    shift_indices.append(shift_index[normalized])
+                else:
+                    logger.warning(f"Unknown shift type '{shift}' in AI constraint - skipping this shift")
+        if not shift_indices:
+            logger.warning("No valid shifts in AI constraint - skipping")
+            stats["ai_skipped"] += 1
+            continue
+
+        cells = np.ix_([e], day_indices, shift_indices)
+        if constraint_type == 'hard_unavailable':
+            block(cells, "ai_hard_unavailable")
+            stats["ai_hard_unavailable"] += 1
+        elif constraint_type == 'hard_required':
+            required[cells] = True
+            stats["ai_hard_required"] += 1
+        elif constraint_type == 'soft_preference':
+            # Priority 1000 → 10× the non-preferred day weight, priority 100 → 1×
+            weight = weights["non_preferred_day"] * constraint.get('priority', 1000) / 100
+            ai_soft_penalty[cells] = np.maximum(ai_soft_penalty[cells], weight)
+            stats["ai_soft_preferences"] += 1
+        else:
+            logger.warning(f"Unknown AI constraint type '{constraint_type}' - skipping")
+            stats["ai_skipped"] += 1
+
+    blocked = block_reason > 0
+    penalty = (
+        weights["non_preferred_shift"] * non_preferred_shift
+        + weights["medium_blocked"] * medium_blocked
+        + weights["non_preferred_day"] * non_preferred_day
+        + ai_soft_penalty
+    )
+
+    stats.update({
+        "employees_with_preferences": len(valid_preferences),
+        "blocked_cells": int(blocked.sum()),
+        "required_cells": int(required.sum()),
+        "penalized_cells": int(np.count_nonzero(penalty)),
+        "employees_with_custom_weekly_limits": len(weekly_limits),
+    })
+    logger.info(
+        f"Compiled preferences: {stats['blocked_cells']} blocked, {stats['required_cells']} required, "
+        f"{stats['penalized_cells']} penalized cells out of {blocked.size}"
+    )
+
+    return CompiledPreferences(
+        blocked=blocked,
+        block_reason=block_reason,
+        required=required,
+        penalty=penalty,
+        weekly_limits=weekly_limits,
+        stats=stats,
+    )
@@ -0,0 +1,122 @@
+"""
+Per-request timing breakdown for the Server-Timing header and the optional `timings` field.
+
+The Server-Timing middleware (middleware.setup_server_timing) starts a RequestTimings for
+every request and keeps it in a context variable, which follows the request into the
+thread pool. Code along the way adds to it without passing it around: external_call()
+records Supabase and OpenAI calls, optimizers hand over their SolveLog phase records
+(phase, build step and constraint family durations plus model size) and controllers time
+their own stages with timed(). Outside a request (async jobs, benchmarks) all of this is a
+no-op.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+# SolveLog counters that are sub-timings of their phase
+STEP_COUNTERS = ("variables_ms", "constraints_ms", "objective_ms", "model_ms")
+FAMILY_COUNTER = "families_ms"
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Named durations of one request, in the order they were recorded."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, float]] = []  # (name, ms); sub-timings are named "<phase>.<part>"
+        self.model: Optional[Dict[str, int]] = None  # Size of the first model built
+        self.handler_finished: Optional[float] = None
+
+    def add(self, name: str, ms: float):
+        self.entries.append((name, round(ms, 1)))
+
+    def add_phases(self, phases: List[Dict[str, Any]]):
+        """Add SolveLog phase records with their build steps and constraint families."""
+        for record in phases:
+            phase = record["phase"]
+            self.add(phase, record["ms"])
+            for counter in STEP_COUNTERS:
+                if counter in record:
+                    self.add(f"{phase}.{counter[:-3]}", record[counter])
+            for family, ms in record.get(FAMILY_COUNTER, {}).items():
+                self.add(f"{phase}.constraints.{family}", ms)
+            if self.model is None and "vars" in record:
+                self.model = {key: record[key] for key in ("vars", "constrs", "nonzeros") if key in record}
+
+    def summary(self) -> Dict[str, Any]:
+        """The `timings` response field: elapsed time so far, every entry and the model size."""
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "phases": [{"name": name, "ms": ms} for name, ms in self.entries],
+            "model": self.model,
+        }
+
+    def header(self, total_ms: float) -> str:
+        """Server-Timing header value, e.g. 'supabase.fetch_employees;dur=41.2, solve;dur=812.5, total;dur=910.3'."""
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.entries + [("total", round(total_ms, 1))])
+
+
+def start_request() -> Tuple[RequestTimings, Any]:
+    """Start timing the current request; returns the timings and the token to reset it with."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: Any):
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled (None outside a request)."""
+    return _current.get()
+
+
+def record(name: str, ms: float):
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, ms)
+
+
+def record_phases(phases: List[Dict[str, Any]]):
+    timings = _current.get()
+    if timings is not None:
+        timings.add_phases(phases)
+
+
+def record_model(size: Dict[str, int]):
+    """Model size (vars, constrs, nonzeros) for the `timings` field."""
+    timings = _current.get()
+    if timings is not None and timings.model is None:
+        timings.model = size
+
+
+def lap_timer() -> Callable[[str], None]:
+    """Split straight-line code into stages: lap(name) records the time since the previous lap."""
+    last = [time.perf_counter()]
+
+    def lap(name: str):
+        now = time.perf_counter()
+        record(name, (now - last[0]) * 1000)
+        last[0] = now
+    return lap
+
+
+@contextmanager
+def timed(name: str):
+    """Time a block of the current request under name."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - started) * 1000)
+
+
+def finish_handler():
+    """Mark the end of the endpoint's own work; the middleware reports the rest as serialization."""
+    timings = _current.get()
+    if timings is not None:
+        timings.handler_finished = time.perf_counter()
@@ -9,9 +9,13 @@ import numpy as np
 from gurobipy import Model, GRB, quicksum
 import logging
 from dataclasses import dataclass
+from services.request_timing import lap_timer, record_model
+from services.slow_capture import capture_inputs, capture_model
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_DEPOT = (59.3293, 18.0686)  # Stockholm, when the request has no start location
+
 @dataclass
 class Customer:
     id: str
@@ -105,9 +109,17 @@ class RouteOptimizerService:
         
         if len(customers) < 2:
             raise ValueError("At least 2 customers required for route optimization")
+        capture_inputs({
+            "customers": customers,
+            "optimization_criteria": optimization_criteria,
+            "depot_coordinates": depot_coordinates,
+            "max_route_time": max_route_time,
+            "vehicle_speed_kmh": vehicle_speed_kmh,
+        })
             
         # Process customer addresses and coordinates
         logger.info("🌍 Processing customer addresses and coordinates...")
+        lap = lap_timer()  # Stage durations for the request's Server-Timing header
         
         customer_objects = []
         
@@ -139,9 +151,10 @@ class RouteOptimizerService:
         if depot_coordinates:
             depot_lat, depot_lng = depot_coordinates
         else:
-            depot_lat, depot_lng = 59.3293, 18.0686  # Stockholm default
+            depot_lat, depot_lng = DEFAULT_DEPOT
             
         logger.info(f"🚀 Starting route optimization for {len(customer_objects)} customers")
+        lap("input_processing")
         
         try:
             # Create distance matrix using Haversine formula (as-the-crow-flies distances)
@@ -150,6 +163,7 @@ class RouteOptimizerService:
                 customer_objects, depot_lat, depot_lng
             )
             n = len(customer_objects)
+            lap("distance_matrix")
             
             # Create Gurobi model
             model = Model("VRP_Optimization")
@@ -167,6 +181,7 @@ class RouteOptimizerService:
             u = {}
             for i in range(1, n + 1):  # Exclude depot
                 u[i] = model.addVar(vtype=GRB.CONTINUOUS, lb=1, ub=n, name=f'u_{i}')
+            lap("build_model.variables")
                 
             # Enhanced objective function with weighted components
             base_cost = quicksum(
@@ -215,6 +230,7 @@ class RouteOptimizerService:
                 logger.info("🎯 Multi-objective route optimization (TIME): Base time (1.0x), Priority penalties (0.3x), Time window violations (1.5x)")
             else:
                 logger.info("🎯 Multi-objective route optimization (DISTANCE): Base distance (1.0x), Priority penalties (0.5x), Time window violations (2.0x)")
+            lap("build_model.objective")
             
             # Constraints
             
@@ -265,9 +281,14 @@ class RouteOptimizerService:
                                 name=f'priority_{i}_{j}'
                             )
             
+            lap("build_model.constraints")
+            
             # Optimize
             logger.info("🔄 Running Gurobi optimization...")
             model.optimize()
+            lap("solve")
+            capture_model(model, "solve")
+            record_model({"vars": model.NumVars, "constrs": model.NumConstrs, "nonzeros": model.NumNZs})
             
             if model.status == GRB.OPTIMAL:
                 logger.info("✅ Optimal solution found!")
@@ -349,6 +370,7 @@ class RouteOptimizerService:
                     }
                 }
                 
+                lap("extract_solution")
                 logger.info(f"📊 Route optimized: {total_distance:.1f}km, {total_time:.0f}min, {len(route)} customers")
                 return result
                 
@@ -0,0 +1,140 @@
+"""
+On-demand sampling profiler for single requests (`?profile=1`, see middleware.setup_profiling).
+
+A daemon thread wakes every PROFILE_SAMPLE_INTERVAL_MS and records the Python stack of each
+thread taking part in the request: the event loop thread (request body validation, response
+serialization) and the worker thread that runs the optimization, which registers itself
+through profiled_thread(). Stacks are kept in the collapsed format of flamegraph.pl,
+speedscope and inferno ("event_loop;module:Class.method;... <samples>"), written to
+PROFILE_DIR and served by GET /admin/profiles/{profile_id}.
+
+Native code does not show up as frames: time inside Gurobi's optimize() is attributed to
+the Python method that called it (GurobiScheduleOptimizer._optimize). The event loop
+thread also serves other requests of the worker process, so its samples are only clean
+when the process is otherwise idle.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import logger, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL_MS, PROFILE_MAX_FILES
+
+_current: ContextVar[Optional["SamplingProfiler"]] = ContextVar("sampling_profiler", default=None)
+
+
+def _frame_name(frame) -> str:
+    """module:qualified.function of a frame (line numbers would split flame graph nodes)."""
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads until stopped."""
+
+    def __init__(self, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.threads: Dict[int, str] = {}  # thread id -> label (root frame of its stacks)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = None
+        self.elapsed_s = 0.0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def add_thread(self, label: str, thread_id: Optional[int] = None):
+        self.threads[thread_id or threading.get_ident()] = label
+
+    def remove_thread(self, thread_id: Optional[int] = None):
+        self.threads.pop(thread_id or threading.get_ident(), None)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.elapsed_s = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, label in list(self.threads.items()):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(label)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one "frame;frame;... count" line per distinct stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def start_profiling() -> tuple:
+    """Profile the current request from this (event loop) thread; returns the profiler and a reset token."""
+    profiler = SamplingProfiler()
+    profiler.add_thread("event_loop")
+    profiler.start()
+    return profiler, _current.set(profiler)
+
+
+def stop_profiling(profiler: SamplingProfiler, token) -> str:
+    """Stop sampling, store the profile and return its id."""
+    _current.reset(token)
+    profiler.stop()
+    profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed"), "w") as f:
+        f.write(profiler.collapsed())
+    _prune_profiles()
+    logger.info(f"🔬 Profile {profile_id}: {profiler.samples} samples over {profiler.elapsed_s:.2f}s")
+    return profile_id
+
+
+@contextmanager
+def profiled_thread(label: str = "worker"):
+    """Include the calling thread in the current request's profile (no-op when not profiling)."""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    profiler.add_thread(label)
+    try:
+        yield
+    finally:
+        profiler.remove_thread()
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """File of a stored profile, None for unknown (or malformed) ids."""
+    if not profile_id.replace("-", "").isalnum():
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.collapsed")
+    return path if os.path.isfile(path) else None
+
+
+def _prune_profiles():
+    """Keep the newest PROFILE_MAX_FILES profiles."""
+    files = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".collapsed"))
+    for name in files[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except OSError:
+            pass
@@ -0,0 +1,53 @@
+"""
+Lookup indexes for one optimization run.
+
+Built once per solve so constraint ingestion (preferences, AI constraints, blocked
+slots) and post-processing resolve dates and employees in O(1) per item instead of
+scanning the date or employee lists.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Dict, Optional
+
+
+@dataclass
+class ScheduleIndex:
+    """Date and employee lookup maps for a scheduling period."""
+    date_index: Dict[date, int]          # calendar date → day index
+    date_strings: List[str]              # day index → 'YYYY-MM-DD'
+    date_string_index: Dict[str, int]    # 'YYYY-MM-DD' → day index
+    employee_index: Dict[str, int]       # employee_id → position in the employee list
+    employees_by_id: Dict[str, Dict]     # employee_id → employee record
+
+    @classmethod
+    def build(cls, employees: List[Dict], dates: List[datetime]) -> "ScheduleIndex":
+        """Build all lookup maps for the given employees and scheduling dates."""
+        date_strings = [d.strftime('%Y-%m-%d') for d in dates]
+        return cls(
+            date_index={d.date(): i for i, d in enumerate(dates)},
+            date_strings=date_strings,
+            date_string_index={s: i for i, s in enumerate(date_strings)},
+            employee_index={emp['id']: i for i, emp in enumerate(employees)},
+            employees_by_id={emp['id']: emp for emp in employees},
+        )
+
+    def day_of(self, date_str: str) -> Optional[int]:
+        """
+        Day index of an ISO date string, or None when it falls outside the period.
+
+        Raises:
+            ValueError: If the string is not a valid YYYY-MM-DD date
+        """
+        day = self.date_string_index.get(date_str)
+        if day is None:
+            # Not in canonical form (or outside the period) - parse to validate and normalize
+            day = self.date_index.get(datetime.strptime(date_str, '%Y-%m-%d').date())
+        return day
+
+    def employee_name(self, employee_id: Optional[str], default: str = 'Unknown') -> str:
+        """Display name of an employee for logging."""
+        emp = self.employees_by_id.get(employee_id)
+        if not emp:
+            return default
+        return emp.get('name') or f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip() or default
@@ -0,0 +1,263 @@
+"""
+Solver-neutral schedule model.
+
+ScheduleProblem describes one scheduling instance as arrays (cells, hard limits, minimum
+requirements and objective weights) without referring to any solver; the optimizer builds
+it from the compiled preferences and the heuristic engine works on it directly.
+
+build_linear_model turns a ScheduleProblem into a LinearModel - objective vector, bounds
+and one sparse constraint matrix - with the same variables, constraints and objective as
+the Gurobi matrix-API model, so any backend in services.solver_backends can solve it.
+
+Variables, in column order:
+    x                        - one binary per variable cell (open or AI hard_required)
+    dev_pos, dev_neg         - work% deviation per employee
+    max_total, min_total     - total shift fairness
+    max_shift_type, min_shift_type - shift type fairness, one per shift type
+    max_weekend, min_weekend - weekend fairness
+    slack                    - elastic slack per min_staff, min_experience and min_coverage row
+                               (elastic models only)
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+@dataclass
+class ScheduleProblem:
+    """One scheduling instance as arrays over E employees, D days and S shift types."""
+    open_cells: np.ndarray              # (E, D, S) cells that may be assigned
+    required: np.ndarray                # (E, D, S) cells that must be assigned (AI hard_required)
+    penalty: np.ndarray                 # (E, D, S) soft preference penalty per assignment
+    experience: np.ndarray              # (E,) experience points
+    targets: np.ndarray                 # (E,) work_percentage target shifts over the period
+    total_limits: np.ndarray            # (E,) max shifts over the period
+    weekly_limits: Optional[np.ndarray]  # (E, W) max shifts per 7-day block (None = no weekly limit)
+    slot_demand: np.ndarray             # (D, S) minimum staff (0 = not enforced)
+    slot_capacity: np.ndarray           # (D, S) maximum staff
+    experience_demand: np.ndarray       # (D, S) minimum experience points (0 = not enforced)
+    coverage_demand: np.ndarray         # (S,) minimum person-shifts per shift type
+    weekend_days: np.ndarray            # (D,) weekend flags
+    objective_weights: Dict[str, float]  # Terms and weights of the objective (see OBJECTIVE_WEIGHTS)
+    shortfall_weights: Dict[str, float]  # Penalty per unit of unmet min_staff / min_experience / min_coverage
+
+
+@dataclass
+class LinearModel:
+    """
+    maximize objective @ v  subject to  row_lower <= matrix @ v <= row_upper,  lower <= v <= upper.
+
+    Infinite row or variable bounds mean the side is free; integrality is 1 for integer
+    columns and 0 for continuous ones.
+    """
+    objective: np.ndarray
+    matrix: sp.csr_matrix
+    row_lower: np.ndarray
+    row_upper: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    integrality: np.ndarray
+    shape: Tuple[int, int, int]                       # (E, D, S) of the assignment tensor
+    cells: Tuple[np.ndarray, np.ndarray, np.ndarray]  # (employee, day, shift) of each x column
+    columns: Dict[str, slice] = field(default_factory=dict)  # Variable block → column range
+    rows: Dict[str, slice] = field(default_factory=dict)     # Constraint family → row range
+    slack_keys: List[Tuple[str, Optional[int], int, float]] = field(default_factory=list)  # (family, day, shift, required) per slack column
+
+    def size(self) -> Dict[str, int]:
+        """Variable, integer, constraint and nonzero counts."""
+        return {
+            "vars": int(self.objective.size),
+            "int_vars": int(np.count_nonzero(self.integrality)),
+            "constrs": int(self.matrix.shape[0]),
+            "nonzeros": int(self.matrix.nnz),
+        }
+
+    def objective_value(self, values: np.ndarray) -> float:
+        """Objective of a solution vector, rounded like HeuristicResult.objective."""
+        return round(float(self.objective @ values), 6)
+
+    def assignment(self, values: np.ndarray) -> np.ndarray:
+        """(E, D, S) assignment tensor of a solution vector."""
+        assigned = np.zeros(self.shape, dtype=bool)
+        assigned[self.cells] = values[self.columns["x"]] > 0.5
+        return assigned
+
+    def shortfalls(self, values: np.ndarray) -> List[Tuple[str, Optional[int], int, float, float]]:
+        """(family, day, shift, required, shortfall) for every elastic slack column."""
+        slacks = values[self.columns["slack"]] if "slack" in self.columns else []
+        return [(family, day, s, required, float(value)) for (family, day, s, required), value in zip(self.slack_keys, slacks)]
+
+
+class _ModelBuilder:
+    """Collects variable blocks and constraint families into one LinearModel."""
+
+    def __init__(self):
+        self.columns: Dict[str, slice] = {}
+        self.lower, self.upper, self.integrality, self.objective = [], [], [], []
+        self.rows: Dict[str, slice] = {}
+        self.row_lower, self.row_upper = [], []
+        self.triplets = []  # (rows, cols, data) per constraint term
+        self.n_cols = self.n_rows = 0
+
+    def variables(self, name: str, lower, upper, objective, integer: bool = False, count: Optional[int] = None):
+        """Add a block of variables; scalars are broadcast to count (or to the array arguments)."""
+        if count is None:
+            count = max(np.size(lower), np.size(upper), np.size(objective))
+        self.columns[name] = slice(self.n_cols, self.n_cols + count)
+        self.lower.append(np.broadcast_to(np.asarray(lower, dtype=float), (count,)))
+        self.upper.append(np.broadcast_to(np.asarray(upper, dtype=float), (count,)))
+        self.objective.append(np.broadcast_to(np.asarray(objective, dtype=float), (count,)))
+        self.integrality.append(np.full(count, 1 if integer else 0, dtype=np.int8))
+        self.n_cols += count
+
+    def constraints(self, family: str, terms: List[Tuple[str, sp.spmatrix]], lower=-np.inf, upper=np.inf):
+        """Add rows lower <= sum(matrix @ block for block, matrix in terms) <= upper."""
+        n_rows = terms[0][1].shape[0]
+        if n_rows == 0:
+            return
+        for block, matrix in terms:
+            coo = sp.coo_matrix(matrix)
+            self.triplets.append((coo.row + self.n_rows, coo.col + self.columns[block].start, coo.data))
+        self.rows[family] = slice(self.n_rows, self.n_rows + n_rows)
+        self.row_lower.append(np.broadcast_to(np.asarray(lower, dtype=float), (n_rows,)))
+        self.row_upper.append(np.broadcast_to(np.asarray(upper, dtype=float), (n_rows,)))
+        self.n_rows += n_rows
+
+    def build(self, **fields) -> LinearModel:
+        """Stack the blocks and families into a LinearModel."""
+        if self.triplets:
+            rows, cols, data = (np.concatenate(parts) for parts in zip(*self.triplets))
+        else:
+            rows, cols, data = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return LinearModel(
+            objective=np.concatenate(self.objective),
+            matrix=sp.csr_matrix((data, (rows, cols)), shape=(self.n_rows, self.n_cols)),
+            row_lower=np.concatenate(self.row_lower) if self.row_lower else np.zeros(0),
+            row_upper=np.concatenate(self.row_upper) if self.row_upper else np.zeros(0),
+            lower=np.concatenate(self.lower),
+            upper=np.concatenate(self.upper),
+            integrality=np.concatenate(self.integrality),
+            columns=self.columns,
+            rows=self.rows,
+            **fields
+        )
+
+
+def _aggregation(rows: np.ndarray, n_rows: int, weights: Optional[np.ndarray] = None) -> sp.csr_matrix:
+    """Sparse matrix summing (optionally weighted) columns into rows; columns with a negative row are left out."""
+    keep = rows >= 0
+    data = np.ones(rows.size) if weights is None else np.asarray(weights, dtype=float)
+    return sp.csr_matrix((data[keep], (rows[keep], np.arange(rows.size)[keep])), shape=(n_rows, rows.size))
+
+
+def build_linear_model(problem: ScheduleProblem, elastic: bool = False) -> LinearModel:
+    """
+    Build the MILP of a scheduling instance.
+
+    Args:
+        problem: Cells, limits, minimum requirements and objective weights
+        elastic: Give every minimum requirement a penalized slack instead of a hard row
+
+    Returns:
+        LinearModel with the blocks and families listed in the module docstring
+    """
+    n_employees, n_days, n_shifts = problem.open_cells.shape
+    n_weeks = (n_days + 6) // 7
+    weights = problem.objective_weights
+    e, d, s = np.nonzero(problem.open_cells | problem.required)
+    builder = _ModelBuilder()
+
+    # 1. Assignment binaries: blocked cells have UB 0, AI hard_required cells LB 1
+    builder.variables(
+        "x",
+        lower=problem.required[e, d, s].astype(float),
+        upper=problem.open_cells[e, d, s].astype(float),
+        objective=weights["coverage"] - problem.penalty[e, d, s],
+        integer=True,
+    )
+
+    # 2. Objective helper variables; one shift per day bounds every count by the number of days
+    if weights["work_percentage_deviation"]:
+        builder.variables("dev_pos", 0.0, n_days, -weights["work_percentage_deviation"], count=n_employees)
+        builder.variables("dev_neg", 0.0, n_days + problem.targets, -weights["work_percentage_deviation"])
+    for name, weight, count in (
+        ("total", weights["total_unfairness"], 1),
+        ("shift_type", weights["shift_type_unfairness"], n_shifts),
+        ("weekend", weights["weekend_unfairness"], 1),
+    ):
+        if weight:
+            builder.variables(f"max_{name}", 0.0, n_days, -weight, count=count)
+            builder.variables(f"min_{name}", 0.0, n_days, weight, count=count)
+
+    # 3. Elastic slack per enforced minimum requirement, penalized per unit
+    staff_slots = np.argwhere(problem.slot_demand > 0)
+    experience_slots = np.argwhere(problem.experience_demand > 0)
+    coverage_shifts = np.flatnonzero(problem.coverage_demand > 0)
+    slack_keys = []
+    if elastic:
+        slack_keys = (
+            [("min_staff", day, shift, problem.slot_demand[day, shift].item()) for day, shift in staff_slots.tolist()]
+            + [("min_experience", day, shift, problem.experience_demand[day, shift].item()) for day, shift in experience_slots.tolist()]
+            + [("min_coverage", None, shift, problem.coverage_demand[shift].item()) for shift in coverage_shifts.tolist()]
+        )
+        if slack_keys:
+            builder.variables(
+                "slack",
+                lower=0.0,
+                upper=np.array([required for *_, required in slack_keys]),
+                objective=-np.array([problem.shortfall_weights[family] for family, *_ in slack_keys], dtype=float),
+            )
+
+    def slack_term(family: str, n_rows: int) -> List[Tuple[str, sp.spmatrix]]:
+        """Identity onto the family's slack columns (nothing when the model is not elastic)."""
+        if not elastic or n_rows == 0:
+            return []
+        start = next(i for i, key in enumerate(slack_keys) if key[0] == family)
+        return [("slack", sp.eye(n_rows, len(slack_keys), k=start))]
+
+    employee_totals = _aggregation(e, n_employees)
+
+    # 4. Hard limits: one shift per day, weekly and total shift limits
+    builder.constraints("one_shift_per_day", [("x", _aggregation(e * n_days + d, n_employees * n_days))], upper=1.0)
+    if problem.weekly_limits is not None:
+        builder.constraints("weekly_limit", [("x", _aggregation(e * n_weeks + d // 7, n_employees * n_weeks))],
+                            upper=problem.weekly_limits.ravel())
+    builder.constraints("work_percentage", [("x", employee_totals)], upper=problem.total_limits)
+
+    # 5. Staffing, experience and shift type coverage per slot
+    slot_rows = d * n_shifts + s
+    slot_staff = _aggregation(slot_rows, n_days * n_shifts)
+    builder.constraints("max_staff", [("x", slot_staff)], upper=problem.slot_capacity.ravel())
+    staff_rows = staff_slots[:, 0] * n_shifts + staff_slots[:, 1]
+    builder.constraints("min_staff", [("x", slot_staff[staff_rows])] + slack_term("min_staff", staff_rows.size),
+                        lower=problem.slot_demand.ravel()[staff_rows])
+    experience_rows = experience_slots[:, 0] * n_shifts + experience_slots[:, 1]
+    slot_experience = _aggregation(slot_rows, n_days * n_shifts, problem.experience[e])
+    builder.constraints("min_experience", [("x", slot_experience[experience_rows])] + slack_term("min_experience", experience_rows.size),
+                        lower=problem.experience_demand.ravel()[experience_rows])
+    shift_staff = _aggregation(s, n_shifts)
+    builder.constraints("min_coverage", [("x", shift_staff[coverage_shifts])] + slack_term("min_coverage", coverage_shifts.size),
+                        lower=problem.coverage_demand[coverage_shifts])
+
+    # 6. Objective helper rows: deviation from targets and max / min per fairness aggregate
+    identity = sp.identity(n_employees)
+    if "dev_pos" in builder.columns:
+        builder.constraints("dev_pos", [("x", employee_totals), ("dev_pos", -identity)], upper=problem.targets)
+        builder.constraints("dev_neg", [("x", employee_totals), ("dev_neg", identity)], lower=problem.targets)
+    weekend_totals = _aggregation(np.where(problem.weekend_days[d], e, -1), n_employees)
+    shift_type_totals = _aggregation(s * n_employees + e, n_shifts * n_employees)
+    shift_type_spread = _aggregation(np.arange(n_shifts * n_employees) // n_employees, n_shifts).T
+    ones = sp.csr_matrix(np.ones((n_employees, 1)))
+    for name, totals, spread in (
+        ("total", employee_totals, ones),
+        ("shift_type", shift_type_totals, shift_type_spread),
+        ("weekend", weekend_totals, ones),
+    ):
+        if f"max_{name}" in builder.columns:
+            builder.constraints(f"max_{name}", [("x", totals), (f"max_{name}", -spread)], upper=0.0)
+            builder.constraints(f"min_{name}", [("x", totals), (f"min_{name}", -spread)], lower=0.0)
+
+    return builder.build(shape=(n_employees, n_days, n_shifts), cells=(e, d, s), slack_keys=slack_keys)
+
@@ -0,0 +1,314 @@
+"""
+Slow-request capture: dump the inputs and solver models of slow optimizations for offline replay.
+
+With SLOW_CAPTURE_SECONDS set, /optimize-schedule (including its job and stream variants)
+and /api/route/optimize-route start a capture for the request in a context variable. The
+optimizers hand over their normalized inputs (employees, dates, preferences and options
+after the Supabase fetch, or the route customers and options) through capture_inputs(), and
+every Gurobi model through capture_model() after it is solved. Models are only written
+once the request has already taken longer than the threshold, so fast requests cost one
+dict and no I/O. When the request finishes slower than the threshold the case is written
+to SLOW_CAPTURE_DIR/<case_id>/:
+
+    case.json           kind, elapsed time, time breakdown, outcome and the inputs
+    <label>.mps         each solved model (SLOW_CAPTURE_MODEL_FORMAT), e.g. solve.mps
+    <label>.prm         its non-default Gurobi parameters (TimeLimit, Seed, Threads, ...)
+
+With SLOW_CAPTURE_ANONYMIZE (default) employee ids and names, free-text constraint fields
+and customer names, ids and addresses are replaced, and customer longitudes are rotated by
+a random offset (Haversine distances, and with them the route model, are unchanged). Model
+files are then written with generic variable and constraint names (x0, c0, ...), since the
+optimizers' names embed employee and customer ids; a model file that still contains an
+input id is deleted before the case is written.
+tools/replay_capture.py re-runs a case.
+"""
+
+import bz2
+import gzip
+import json
+import os
+import random
+import shutil
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional
+
+import gurobipy as gp
+from pydantic import BaseModel
+
+from config import (
+    logger, SLOW_CAPTURE_SECONDS, SLOW_CAPTURE_DIR, SLOW_CAPTURE_ANONYMIZE,
+    SLOW_CAPTURE_MODEL_FORMAT, SLOW_CAPTURE_MAX_CASES
+)
+from services.request_timing import current_timings
+from services.solve_budget import SolveBudget
+
+# Employee fields the optimizers read; everything else (names, contact details, ...) is dropped
+EMPLOYEE_FIELDS = ("work_percentage", "experience_level", "hourly_rate", "department", "role")
+# Free-text fields of AI constraints
+CONSTRAINT_TEXT_FIELDS = ("employee_name", "original_text", "reason", "description")
+# Ids shorter than this are not searched for in anonymized model files
+MIN_CHECKED_ID_LENGTH = 6
+
+_current: ContextVar[Optional["SlowCapture"]] = ContextVar("slow_capture", default=None)
+
+
+@dataclass
+class SlowCapture:
+    """Inputs and written models of one request that may turn out slow."""
+    kind: str  # "schedule" or "route"
+    case_id: str
+    started: float
+    inputs: Optional[Dict[str, Any]] = None
+    models: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(SLOW_CAPTURE_DIR, self.case_id)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def is_slow(self) -> bool:
+        return self.elapsed() >= SLOW_CAPTURE_SECONDS
+
+
+def start_capture(kind: str) -> Any:
+    """Start capturing the current request; returns the token for finish_capture (None when disabled)."""
+    if SLOW_CAPTURE_SECONDS <= 0:
+        return None
+    case_id = f"{datetime.now():%Y%m%d-%H%M%S}-{kind}-{uuid.uuid4().hex[:6]}"
+    return _current.set(SlowCapture(kind=kind, case_id=case_id, started=time.perf_counter(), models=[]))
+
+
+def capture_inputs(inputs: Dict[str, Any]):
+    """Optimizer inputs of the request, as keyword arguments of its entry point (the first call wins)."""
+    capture = _current.get()
+    if capture is not None and capture.inputs is None:
+        capture.inputs = inputs
+
+
+def capture_model(model, label: str):
+    """Write a solved Gurobi model and its parameters when the request is already slower than the threshold."""
+    capture = _current.get()
+    if capture is None or not capture.is_slow():
+        return
+    try:
+        os.makedirs(capture.directory, exist_ok=True)
+        model_file = f"{label}.{SLOW_CAPTURE_MODEL_FORMAT}"
+        if SLOW_CAPTURE_ANONYMIZE:
+            _write_anonymized(model, os.path.join(capture.directory, model_file))
+        else:
+            model.write(os.path.join(capture.directory, model_file))
+        model.write(os.path.join(capture.directory, f"{label}.prm"))
+        capture.models.append({
+            "label": label,
+            "model": model_file,
+            "params": f"{label}.prm",
+            "vars": model.NumVars,
+            "constrs": model.NumConstrs,
+            "nonzeros": model.NumNZs,
+        })
+    except (gp.GurobiError, OSError) as e:
+        logger.warning(f"⚠️ Slow capture could not write the {label} model: {str(e)}")
+
+
+def _write_anonymized(model, path: str):
+    """
+    Write a model with generic names: variable and constraint names embed employee and
+    customer ids (x_<employee>_<day>_<shift>, max_one_shift_per_day_<employee>_<day>, ...).
+    
+    Args:
+        model: Solved Gurobi model (left unchanged, a copy is renamed)
+        path: Model file to write
+    """
+    anonymous = model.copy()
+    try:
+        anonymous.ModelName = "model"
+        for attr, items, prefix in (
+            ("VarName", anonymous.getVars(), "x"),
+            ("ConstrName", anonymous.getConstrs(), "c"),
+            ("QCName", anonymous.getQConstrs(), "q"),
+            ("GenConstrName", anonymous.getGenConstrs(), "g"),
+        ):
+            if items:
+                anonymous.setAttr(attr, items, [f"{prefix}{i}" for i in range(len(items))])
+        anonymous.update()
+        anonymous.write(path)
+    finally:
+        anonymous.dispose()
+
+
+def _input_ids(inputs: Dict[str, Any]) -> List[str]:
+    """Employee and customer ids of normalized inputs that are long enough to search for in model files."""
+    records = (inputs.get("employees") or []) + (inputs.get("customers") or [])
+    ids = {str(record.get("id")) for record in records if record.get("id") is not None}
+    # Short ids ("7", "c1") would match generic names and numbers, real database ids are uuids
+    return [value for value in ids if len(value) >= MIN_CHECKED_ID_LENGTH]
+
+
+def _drop_leaking_models(capture: SlowCapture, ids: List[str]):
+    """Delete written model files that still contain an input id, so an anonymized case never leaks one."""
+    if not ids:
+        return
+    kept = []
+    for entry in capture.models:
+        path = os.path.join(capture.directory, entry["model"])
+        opener = {".gz": gzip.open, ".bz2": bz2.open}.get(os.path.splitext(path)[1], open)
+        try:
+            with opener(path, "rt", errors="replace") as f:
+                text = f.read()
+        except OSError:
+            kept.append(entry)  # Formats we cannot read back (7z, zip) rely on the renaming alone
+            continue
+        if any(value in text for value in ids):
+            logger.warning(f"⚠️ Slow capture {capture.case_id}: {entry['model']} contains input ids, deleted")
+            for name in (entry["model"], entry["params"]):
+                os.remove(os.path.join(capture.directory, name))
+            continue
+        kept.append(entry)
+    capture.models = kept
+
+
+def finish_capture(token: Any, outcome: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    End the request's capture and write the case when the request was slow.
+
+    Args:
+        token: Token from start_capture (None = capture disabled)
+        outcome: Short result summary stored with the case (status, objective, error, ...)
+
+    Returns:
+        Case directory when a case was written, else None
+    """
+    if token is None:
+        return None
+    capture = _current.get()
+    _current.reset(token)
+    if capture is None or not capture.is_slow():
+        return None
+    try:
+        inputs = normalize_inputs(capture.inputs) if capture.inputs is not None else None
+        if inputs is not None and SLOW_CAPTURE_ANONYMIZE:
+            _drop_leaking_models(capture, _input_ids(inputs))
+            inputs = anonymize_schedule(inputs) if capture.kind == "schedule" else anonymize_route(inputs)
+        timings = current_timings()
+        case = {
+            "case_id": capture.case_id,
+            "kind": capture.kind,
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_ms": round(capture.elapsed() * 1000, 1),
+            "threshold_s": SLOW_CAPTURE_SECONDS,
+            "anonymized": SLOW_CAPTURE_ANONYMIZE,
+            "outcome": outcome,
+            "timings": timings.summary()["phases"] if timings is not None else None,
+            "models": capture.models,
+            "inputs": inputs,
+        }
+        os.makedirs(capture.directory, exist_ok=True)
+        with open(os.path.join(capture.directory, "case.json"), "w") as f:
+            json.dump(case, f, indent=2, default=str)
+        _prune_cases()
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"⚠️ Slow capture {capture.case_id} not written: {str(e)}")
+        return None
+    logger.warning(
+        f"🐢 Slow {capture.kind} request ({case['elapsed_ms'] / 1000:.2f}s > {SLOW_CAPTURE_SECONDS}s) "
+        f"captured as {capture.case_id} ({len(capture.models)} models)"
+    )
+    return capture.directory
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, SolveBudget):
+        return {"deadline_ms": value.deadline_ms, "mip_gap": value.mip_gap, "threads": value.threads, "node_limit": value.node_limit}
+    raise TypeError(f"{type(value).__name__} is not serializable")
+
+
+def normalize_inputs(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Inputs as plain JSON data: pydantic models dumped, dates as ISO strings, the solve budget's limits."""
+    return json.loads(json.dumps(inputs, default=_encode))
+
+
+def anonymize_schedule(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace employee ids and names consistently across employees, preferences, AI constraints and warm start."""
+    aliases: Dict[Any, str] = {}
+
+    def alias(employee_id):
+        return aliases.setdefault(employee_id, f"e{len(aliases)}") if employee_id is not None else None
+
+    employees = []
+    for employee in inputs.get("employees") or []:
+        employee_id = alias(employee.get("id"))
+        employees.append({
+            "id": employee_id,
+            "first_name": "Employee",
+            "last_name": employee_id,
+            **{key: employee[key] for key in EMPLOYEE_FIELDS if key in employee},
+        })
+    preferences = [
+        {**preference, "employee_id": alias(preference.get("employee_id"))}
+        for preference in inputs.get("employee_preferences") or []
+    ]
+    constraints = [
+        {
+            **{key: value for key, value in constraint.items() if key not in CONSTRAINT_TEXT_FIELDS},
+            "employee_id": alias(constraint.get("employee_id")),
+        }
+        for constraint in inputs.get("ai_constraints") or []
+    ]
+    warm_start = [
+        {**shift, "employee_id": alias(shift.get("employee_id"))}
+        for shift in inputs.get("warm_start") or []
+    ]
+    return {
+        **inputs,
+        "employees": employees,
+        "employee_preferences": preferences,
+        "ai_constraints": constraints,
+        "warm_start": warm_start or None,
+    }
+
+
+def anonymize_route(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace customer ids, names and addresses; rotate longitudes when every customer has coordinates."""
+    from services.route_optimizer_service import DEFAULT_DEPOT  # The route service captures through this module
+    
+    customers = inputs.get("customers") or []
+    depot = inputs.get("depot_coordinates")
+    rotate = all(customer.get("latitude") and customer.get("longitude") for customer in customers)
+    offset = random.uniform(-90, 90) if rotate else 0.0
+
+    def shift(longitude):
+        return (longitude + offset + 180) % 360 - 180
+
+    anonymized = []
+    for i, customer in enumerate(customers):
+        anonymized.append({
+            **customer,
+            "id": f"c{i}",
+            "name": f"Customer {i}",
+            "address": "",
+            "longitude": shift(customer["longitude"]) if rotate else customer.get("longitude"),
+        })
+    if rotate:
+        # The depot defaults to a fixed point, so it has to be rotated along explicitly
+        latitude, longitude = depot or DEFAULT_DEPOT
+        depot = [latitude, shift(longitude)]
+    return {**inputs, "customers": anonymized, "depot_coordinates": depot}
+
+
+def _prune_cases():
+    """Keep the newest SLOW_CAPTURE_MAX_CASES cases (case ids start with their timestamp)."""
+    cases = sorted(
+        name for name in os.listdir(SLOW_CAPTURE_DIR) if os.path.isdir(os.path.join(SLOW_CAPTURE_DIR, name))
+    )
+    for name in cases[:-SLOW_CAPTURE_MAX_CASES]:
+        shutil.rmtree(os.path.join(SLOW_CAPTURE_DIR, name), ignore_errors=True)
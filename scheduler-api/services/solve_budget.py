@@ -0,0 +1,82 @@
+"""
+Per-request solve budget: overall deadline, MIP gap, thread count and node limit.
+
+The deadline covers the whole request (model build, first solve and every relaxation
+attempt), so each solve gets a TimeLimit carved from whatever time is left instead of a
+fixed per-phase value. Without a deadline the historical per-phase limits apply.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from config import logger, SOLVE_MAX_DEADLINE_MS, SOLVE_MAX_THREADS, SOLVE_MAX_NODE_LIMIT
+
+
+@dataclass
+class SolveBudget:
+    """Solver limits for one optimization request, clamped to the server-side caps."""
+    deadline_ms: Optional[int] = None    # Overall wall-clock budget (None = per-phase defaults)
+    mip_gap: Optional[float] = None      # Relative MIP gap to stop at (None = Gurobi default)
+    threads: Optional[int] = None        # Solver threads (None = server cap)
+    node_limit: Optional[int] = None     # Branch-and-bound node limit (None = unlimited)
+    started_at: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        if self.deadline_ms is not None:
+            self.deadline_ms = max(0, min(self.deadline_ms, SOLVE_MAX_DEADLINE_MS))
+        if self.mip_gap is not None:
+            self.mip_gap = min(max(self.mip_gap, 0.0), 1.0)
+        if SOLVE_MAX_THREADS > 0:
+            self.threads = min(self.threads, SOLVE_MAX_THREADS) if self.threads else SOLVE_MAX_THREADS
+        if SOLVE_MAX_NODE_LIMIT > 0:
+            self.node_limit = min(self.node_limit, SOLVE_MAX_NODE_LIMIT) if self.node_limit else SOLVE_MAX_NODE_LIMIT
+
+    def elapsed(self) -> float:
+        """Seconds since the budget started."""
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None when there is no overall deadline)."""
+        if self.deadline_ms is None:
+            return None
+        return max(0.0, self.deadline_ms / 1000.0 - self.elapsed())
+
+    def exhausted(self) -> bool:
+        """Whether the overall deadline has passed."""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def time_limit(self, default_seconds: float, share: float = 1.0) -> float:
+        """
+        TimeLimit for the next solve.
+
+        Args:
+            default_seconds: Phase limit used when the request has no deadline
+            share: Fraction of the remaining time this solve may use (the rest is kept
+                for later phases such as relaxation attempts)
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default_seconds
+        return remaining * share
+
+    def apply(self, model, default_seconds: float, share: float = 1.0, phase: str = "solve") -> float:
+        """Set TimeLimit, MIPGap, Threads and NodeLimit on a model; returns the TimeLimit used."""
+        time_limit = self.time_limit(default_seconds, share)
+        model.setParam('TimeLimit', time_limit)
+        if self.mip_gap is not None:
+            model.setParam('MIPGap', self.mip_gap)
+        if self.threads:
+            model.setParam('Threads', self.threads)
+        if self.node_limit:
+            model.setParam('NodeLimit', self.node_limit)
+
+        logger.info(
+            f"⏱️ {phase} budget: TimeLimit {time_limit:.2f}s"
+            + (f" (of {self.remaining():.2f}s left)" if self.deadline_ms is not None else "")
+            + (f", MIPGap {self.mip_gap}" if self.mip_gap is not None else "")
+            + (f", Threads {self.threads}" if self.threads else "")
+            + (f", NodeLimit {self.node_limit}" if self.node_limit else "")
+        )
+        return time_limit
@@ -0,0 +1,102 @@
+"""
+Per-request logging for one optimization: phase summaries, opt-in detail and solver output.
+
+Each solve phase (preference compilation, model build, solve, extraction, relaxation
+attempts) writes a single summary record with its duration and counters. Per-item logging
+inside the model-building loops only happens when the request sets debug_logging (or the
+logger itself runs at DEBUG), and is formatted lazily so it costs nothing otherwise. The
+Gurobi log is captured through a MESSAGE callback into a per-request buffer instead of being
+written to stdout.
+"""
+
+import io
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Callable
+
+from gurobipy import GRB
+
+from config import logger
+
+
+class SolveLog:
+    """Structured log of one optimization request."""
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self.phases: List[Dict[str, Any]] = []  # One {"phase", "ms", **counters} record per phase
+        self.solver_output = io.StringIO()  # Captured Gurobi log of every solve in this request
+        self._open: List[Dict[str, Any]] = []  # Counters of the running phases (innermost last)
+        self.telemetry: List[Dict[str, Any]] = []  # One services.solver_telemetry record per Gurobi solve
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a phase and log one summary record for it when it ends.
+
+        Yields a dict the phase fills with counters (e.g. variables, constraints, status).
+        """
+        counters: Dict[str, Any] = {}
+        started = time.perf_counter()
+        self._open.append(counters)
+        try:
+            yield counters
+        finally:
+            self._open.pop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.phases.append({"phase": name, "ms": round(elapsed_ms, 1), **counters})
+            logger.info(
+                "📊 %s: %.1f ms%s", name, elapsed_ms,
+                "".join(f", {key}={value}" for key, value in counters.items())
+            )
+
+    @contextmanager
+    def step(self, counters: Dict[str, Any], name: str):
+        """Time part of a phase into its counters as "<name>_ms" (e.g. variables, constraints, objective)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            counters[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def lap_timer(self, counter: str = "families_ms") -> Callable[[str], None]:
+        """
+        Split part of the running phase into consecutive sections (e.g. constraint families).
+        
+        Each lap(name) call adds the time since the previous call (or since lap_timer) to
+        counters[counter][name] of the innermost open phase; outside a phase nothing is kept.
+        """
+        sections = self._open[-1].setdefault(counter, {}) if self._open else {}
+        last = [time.perf_counter()]
+        
+        def lap(name: str):
+            now = time.perf_counter()
+            sections[name] = round(sections.get(name, 0.0) + (now - last[0]) * 1000, 1)
+            last[0] = now
+        return lap
+    
+    def detail(self, msg: str, *args):
+        """Per-item message, only formatted and emitted when verbose logging is on."""
+        if self.debug:
+            logger.info(msg, *args)
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(msg, *args)
+
+    def capture_solver_output(self, model, where):
+        """Gurobi callback appending solver log lines to the request's buffer."""
+        if where == GRB.Callback.MESSAGE:
+            self.solver_output.write(model.cbGet(GRB.Callback.MSG_STRING))
+
+    def solver_log(self, since: int = 0) -> str:
+        """Everything Gurobi logged during this request, or from a log_position() on."""
+        return self.solver_output.getvalue()[since:]
+    
+    def log_position(self) -> int:
+        """Current end of the captured log, to slice out a single solve's output."""
+        return self.solver_output.tell()
+
+    def flush(self):
+        """Write the captured solver log as a single record (debug requests only)."""
+        if self.debug and self.solver_output.tell():
+            logger.info("🧾 Gurobi log:\n%s", self.solver_log().rstrip())
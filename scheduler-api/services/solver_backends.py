@@ -0,0 +1,313 @@
+"""
+Solver backends for the solver-neutral LinearModel (see services.schedule_model).
+
+Every backend solves a LinearModel under a time limit, relative MIP gap, thread count and
+seed and returns a BackendResult, so the optimizer and the benchmarks can switch solvers
+by name. Backends are registered in BACKENDS; one whose package is not installed stays
+registered but reports available() False, and asking for it fails with a clear error.
+
+    highs  - HiGHS through scipy.optimize.milp (ships with SciPy, always available)
+    cpsat  - OR-Tools CP-SAT, multi-core portfolio search (optional: pip install ortools)
+    gurobi - gurobipy on the neutral model, for like-for-like comparisons; requests with
+             optimizer="gurobi" keep using GurobiScheduleOptimizer's own model
+"""
+
+import importlib.util
+import math
+import threading
+import time
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import logger
+from services.schedule_model import LinearModel
+
+# Largest common denominator CP-SAT scaling accepts before giving up on a model
+CPSAT_MAX_SCALE = 10 ** 6
+
+# Backend statuses with a solution
+SOLUTION_STATUSES = ("optimal", "feasible")
+
+
+@dataclass
+class BackendResult:
+    """Outcome of one backend solve."""
+    status: str                          # optimal, feasible (limit reached), infeasible, no_solution, error
+    values: Optional[np.ndarray] = None  # Solution vector in LinearModel column order
+    objective: Optional[float] = None    # Objective of values (LinearModel.objective_value)
+    bound: Optional[float] = None        # Best proven upper bound, when the solver reports one
+    runtime_s: float = 0.0
+    message: str = ""
+
+    @property
+    def has_solution(self) -> bool:
+        return self.status in SOLUTION_STATUSES and self.values is not None
+
+    @property
+    def gap(self) -> Optional[float]:
+        """Relative MIP gap |bound - objective| / |objective| (Gurobi's definition), None without both."""
+        if self.objective is None or self.bound is None:
+            return None
+        if self.objective == 0:
+            return 0.0 if self.bound == 0 else math.inf
+        return abs(self.bound - self.objective) / abs(self.objective)
+
+    def stats(self) -> Dict[str, object]:
+        """Counters for logs and benchmark reports."""
+        return {
+            "status": self.status,
+            "objective": self.objective,
+            "bound": None if self.bound is None else round(self.bound, 6),
+            "gap": None if self.gap is None else round(self.gap, 6),
+            "runtime_s": round(self.runtime_s, 3),
+        }
+
+
+class SolverBackend:
+    """Base class: subclasses set name / package and implement _solve."""
+    name = ""
+    package = ""  # Top-level module the backend imports
+
+    def available(self) -> bool:
+        """Whether the backend's package is installed."""
+        return importlib.util.find_spec(self.package) is not None
+
+    def solve(self, model: LinearModel, time_limit: float, mip_gap: Optional[float] = None,
+              threads: Optional[int] = None, seed: Optional[int] = None,
+              stop_event: Optional[threading.Event] = None) -> BackendResult:
+        """
+        Solve a LinearModel.
+
+        Args:
+            model: Model to maximize
+            time_limit: Wall-clock limit in seconds
+            mip_gap: Relative MIP gap to stop at (None = solver default)
+            threads: Solver threads (None = solver default; ignored by single-threaded backends)
+            seed: Random seed
+            stop_event: threading.Event that stops the search early (where the solver supports it)
+
+        Returns:
+            BackendResult; solver exceptions are reported as status "error"
+        """
+        started = time.perf_counter()
+        if np.any(model.lower > model.upper):
+            # A required cell that is also blocked: no solver needed to prove infeasibility
+            result = BackendResult(status="infeasible", message="conflicting variable bounds")
+        else:
+            try:
+                result = self._solve(model, max(time_limit, 0.01), mip_gap, threads, seed, stop_event)
+            except Exception as e:
+                logger.error(f"Solver backend {self.name} failed: {str(e)}")
+                result = BackendResult(status="error", message=str(e))
+        if result.values is not None:
+            result.objective = model.objective_value(result.values)
+        result.runtime_s = time.perf_counter() - started
+        return result
+
+    def _solve(self, model: LinearModel, time_limit: float, mip_gap: Optional[float], threads: Optional[int],
+               seed: Optional[int], stop_event: Optional[threading.Event]) -> BackendResult:
+        raise NotImplementedError
+
+
+class HighsBackend(SolverBackend):
+    """HiGHS branch-and-cut via scipy.optimize.milp (single-threaded, no early stop)."""
+    name = "highs"
+    package = "scipy"
+
+    def _solve(self, model, time_limit, mip_gap, threads, seed, stop_event):
+        from scipy.optimize import milp, Bounds, LinearConstraint
+
+        options = {"time_limit": time_limit, "disp": False}
+        if mip_gap is not None:
+            options["mip_rel_gap"] = mip_gap
+        # milp minimizes: negate the objective and the reported bound
+        res = milp(
+            -model.objective,
+            integrality=model.integrality,
+            bounds=Bounds(model.lower, model.upper),
+            constraints=LinearConstraint(model.matrix, model.row_lower, model.row_upper),
+            options=options,
+        )
+        bound = getattr(res, "mip_dual_bound", None)
+        bound = None if bound is None or not np.isfinite(bound) else -float(bound)
+        if res.status == 0:
+            return BackendResult(status="optimal", values=res.x, bound=bound, message=res.message)
+        if res.status == 2:
+            return BackendResult(status="infeasible", message=res.message)
+        if res.x is not None:
+            return BackendResult(status="feasible", values=res.x, bound=bound, message=res.message)
+        return BackendResult(status="no_solution" if res.status == 1 else "error", message=res.message)
+
+
+class CpSatBackend(SolverBackend):
+    """
+    OR-Tools CP-SAT.
+
+    CP-SAT only has integer variables and coefficients. Rows, bounds and the objective are
+    multiplied by the common denominator F of the integer-column coefficients and row
+    bounds, and continuous columns become integers in units of 1/F, which is exact for this
+    model (work% targets and experience are rational with small denominators).
+    """
+    name = "cpsat"
+    package = "ortools"
+
+    def _solve(self, model, time_limit, mip_gap, threads, seed, stop_event):
+        from ortools.sat.python import cp_model
+
+        if not (np.isfinite(model.lower).all() and np.isfinite(model.upper).all()):
+            return BackendResult(status="error", message="CP-SAT needs finite variable bounds")
+        scale = self._scale(model)
+        continuous = model.integrality == 0
+
+        # Continuous columns count 1/scale units; every row and the objective are multiplied
+        # by scale, so integer columns get coefficient * scale and continuous ones keep theirs
+        column_scale = np.where(continuous, scale, 1)
+        coefficient_scale = np.where(continuous, 1, scale)
+        lower = np.ceil(model.lower * column_scale - 1e-9).astype(np.int64)
+        upper = np.floor(model.upper * column_scale + 1e-9).astype(np.int64)
+        matrix = model.matrix.tocsr()
+        scaled_data = matrix.data * coefficient_scale[matrix.indices]
+        scaled_objective = model.objective * coefficient_scale
+        coefficients = np.rint(scaled_data).astype(np.int64)
+        objective = np.rint(scaled_objective).astype(np.int64)
+        if not (np.allclose(coefficients, scaled_data) and np.allclose(objective, scaled_objective)):
+            return BackendResult(status="error", message="CP-SAT needs integer coefficients on continuous columns")
+
+        cp = cp_model.CpModel()
+        variables = [cp.new_int_var(int(lo), int(hi), f"v{j}") for j, (lo, hi) in enumerate(zip(lower.tolist(), upper.tolist()))]
+        for i in range(matrix.shape[0]):
+            start, stop = matrix.indptr[i], matrix.indptr[i + 1]
+            expr = cp_model.LinearExpr.weighted_sum([variables[j] for j in matrix.indices[start:stop]], coefficients[start:stop].tolist())
+            row_lower, row_upper = model.row_lower[i], model.row_upper[i]
+            if np.isfinite(row_lower) and np.isfinite(row_upper):
+                cp.add_linear_constraint(expr, math.ceil(row_lower * scale - 1e-9), math.floor(row_upper * scale + 1e-9))
+            elif np.isfinite(row_upper):
+                cp.add(expr <= math.floor(row_upper * scale + 1e-9))
+            elif np.isfinite(row_lower):
+                cp.add(expr >= math.ceil(row_lower * scale - 1e-9))
+        nonzero = np.flatnonzero(objective)
+        cp.maximize(cp_model.LinearExpr.weighted_sum([variables[j] for j in nonzero], objective[nonzero].tolist()))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        if mip_gap is not None:
+            solver.parameters.relative_gap_limit = mip_gap
+        if threads:
+            solver.parameters.num_workers = threads
+        if seed is not None:
+            solver.parameters.random_seed = seed % (2 ** 31)
+
+        # CP-SAT has no stop flag of its own: a watcher thread calls stop_search
+        done = threading.Event()
+        if stop_event is not None:
+            def watch():
+                while not done.wait(0.1):
+                    if stop_event.is_set():
+                        solver.stop_search()
+                        return
+            threading.Thread(target=watch, daemon=True).start()
+        try:
+            status = solver.solve(cp)
+        finally:
+            done.set()
+
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            values = np.array([solver.value(v) for v in variables], dtype=float) / column_scale
+            return BackendResult(
+                status="optimal" if status == cp_model.OPTIMAL else "feasible",
+                values=values,
+                bound=solver.best_objective_bound / scale,
+                message=solver.status_name(status),
+            )
+        if status == cp_model.INFEASIBLE:
+            return BackendResult(status="infeasible", message=solver.status_name(status))
+        return BackendResult(status="no_solution" if status == cp_model.UNKNOWN else "error", message=solver.status_name(status))
+
+    def _scale(self, model: LinearModel) -> int:
+        """Common denominator of the integer-column coefficients, row bounds and objective."""
+        matrix = model.matrix.tocsr()
+        values = np.concatenate([
+            matrix.data[model.integrality[matrix.indices] == 1],
+            model.row_lower[np.isfinite(model.row_lower)],
+            model.row_upper[np.isfinite(model.row_upper)],
+            model.objective[model.integrality == 1],
+        ])
+        scale = 1
+        for value in np.unique(values).tolist():
+            scale = math.lcm(scale, Fraction(value).limit_denominator(CPSAT_MAX_SCALE).denominator)
+            if scale > CPSAT_MAX_SCALE:
+                raise ValueError(f"coefficients need a scale above {CPSAT_MAX_SCALE}")
+        return scale
+
+
+class GurobiBackend(SolverBackend):
+    """gurobipy on the neutral model (one MVar, two matrix constraints)."""
+    name = "gurobi"
+    package = "gurobipy"
+
+    def _solve(self, model, time_limit, mip_gap, threads, seed, stop_event):
+        from gurobipy import GRB
+        from services.gurobi_env_pool import get_env_pool
+
+        with get_env_pool().model("NeutralScheduleModel") as gmodel:
+            gmodel.setParam('OutputFlag', 0)
+            gmodel.setParam('TimeLimit', time_limit)
+            if mip_gap is not None:
+                gmodel.setParam('MIPGap', mip_gap)
+            if threads:
+                gmodel.setParam('Threads', threads)
+            if seed is not None:
+                gmodel.setParam('Seed', seed % 2000000000)
+
+            vtypes = np.where(model.integrality == 1, GRB.INTEGER, GRB.CONTINUOUS)
+            v = gmodel.addMVar(model.objective.size, lb=model.lower, ub=model.upper, vtype=vtypes)
+            upper_rows = np.flatnonzero(np.isfinite(model.row_upper))
+            lower_rows = np.flatnonzero(np.isfinite(model.row_lower))
+            gmodel.addMConstr(model.matrix[upper_rows], v, '<', model.row_upper[upper_rows])
+            gmodel.addMConstr(model.matrix[lower_rows], v, '>', model.row_lower[lower_rows])
+            gmodel.setObjective(model.objective @ v, GRB.MAXIMIZE)
+
+            def terminate(m, where):
+                if where == GRB.Callback.MIP and stop_event.is_set():
+                    m.terminate()
+            gmodel.optimize(terminate if stop_event is not None else None)
+
+            bound = gmodel.ObjBound if gmodel.SolCount > 0 and gmodel.IsMIP else None
+            if gmodel.Status == GRB.OPTIMAL:
+                return BackendResult(status="optimal", values=v.X, bound=bound)
+            if gmodel.Status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD):
+                return BackendResult(status="infeasible", message=f"status {gmodel.Status}")
+            if gmodel.SolCount > 0:
+                return BackendResult(status="feasible", values=v.X, bound=bound, message=f"status {gmodel.Status}")
+            return BackendResult(status="no_solution", message=f"status {gmodel.Status}")
+
+
+BACKENDS: Dict[str, SolverBackend] = {}
+
+
+def register_backend(backend: SolverBackend) -> SolverBackend:
+    """Add a backend to the registry under its name (replacing any previous one)."""
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name: str) -> SolverBackend:
+    """Registered, installed backend by name; ValueError otherwise."""
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown solver backend '{name}': expected one of {', '.join(BACKENDS)}")
+    if not backend.available():
+        raise ValueError(f"Solver backend '{name}' is not installed (missing package '{backend.package}')")
+    return backend
+
+
+def available_backends() -> List[str]:
+    """Names of the registered backends whose package is installed."""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+
+for _backend in (HighsBackend(), CpSatBackend(), GurobiBackend()):
+    register_backend(_backend)
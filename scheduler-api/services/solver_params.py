@@ -0,0 +1,75 @@
+"""
+Tuned Gurobi parameters per instance size class.
+
+tools/tune_solver_params.py searches MIPFocus, Heuristics, Presolve, Cuts and Symmetry on
+a corpus of schedule instances bucketed by size class (employees x days x min staff per
+shift) and writes the best set of each class to SOLVER_PARAMS_FILE:
+
+    {"created_at": "...", "classes": {"e100_d14_s2": {"params": {"MIPFocus": 1, "Cuts": 2}, ...}}}
+
+GurobiScheduleOptimizer applies the set of the incoming instance's class on top of Seed and
+the solve budget (TimeLimit, MIPGap, Threads, NodeLimit); classes without a tuned set keep
+Gurobi's defaults. The file is re-read when it changes, so a new tuning run takes effect
+without a restart.
+"""
+
+import json
+import os
+from typing import Dict, Any, Tuple
+
+from config import logger, SOLVER_PARAMS_FILE
+
+# Upper bounds of the size classes; larger instances fall in an open-ended "<last>+" class
+EMPLOYEE_CLASSES = (25, 50, 100, 250, 500)
+DAY_CLASSES = (7, 14, 31)
+MIN_STAFF_CLASSES = (1, 2, 4)
+
+# Search space of the tuning tool (-1 = Gurobi's automatic choice)
+TUNABLE_PARAMS = {
+    "MIPFocus": (0, 1, 2, 3),
+    "Heuristics": (0.05, 0.2, 0.5),
+    "Presolve": (-1, 0, 1, 2),
+    "Cuts": (-1, 0, 1, 2),
+    "Symmetry": (-1, 0, 2),
+}
+
+_loaded = {"path": None, "mtime": None, "classes": {}}
+
+
+def _bucket(value: int, bounds: Tuple[int, ...], prefix: str) -> str:
+    for bound in bounds:
+        if value <= bound:
+            return f"{prefix}{bound}"
+    return f"{prefix}{bounds[-1]}+"
+
+
+def size_class(employees: int, days: int, min_staff: int) -> str:
+    """Size class of an instance, e.g. size_class(80, 14, 2) == "e100_d14_s2"."""
+    return "_".join((
+        _bucket(employees, EMPLOYEE_CLASSES, "e"),
+        _bucket(days, DAY_CLASSES, "d"),
+        _bucket(min_staff, MIN_STAFF_CLASSES, "s"),
+    ))
+
+
+def load_params_file(path: str = SOLVER_PARAMS_FILE) -> Dict[str, Dict[str, Any]]:
+    """Tuned classes of the parameter file (empty when it does not exist or is invalid), cached until it changes."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if _loaded["path"] != path or _loaded["mtime"] != mtime:
+        try:
+            with open(path) as f:
+                classes = json.load(f).get("classes", {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"⚠️ Ignoring solver parameter file {path}: {str(e)}")
+            classes = {}
+        _loaded.update(path=path, mtime=mtime, classes=classes)
+    return _loaded["classes"]
+
+
+def tuned_params(employees: int, days: int, min_staff: int) -> Tuple[str, Dict[str, Any]]:
+    """Size class of an instance and its tuned parameters ({} = Gurobi defaults)."""
+    name = size_class(employees, days, min_staff)
+    return name, dict(load_params_file().get(name, {}).get("params", {}))
@@ -0,0 +1,191 @@
+"""
+Solver telemetry: statistics of each Gurobi solve, parsed from its captured log.
+
+SolveLog captures every solve's log into the request's buffer; after each optimize() the
+optimizer parses that solve's slice (presolve reductions, root relaxation, incumbent
+timeline, cuts, explored nodes) and adds the final model attributes (Runtime, Work, node
+count, gap, status, whether the time limit was hit). The record's bottleneck hint tells
+the usual reasons for a slow or poor solve apart:
+
+    solved            - finished (optimal or within the MIP gap)
+    infeasible        - no schedule satisfies the hard constraints
+    model_size        - presolve and the root relaxation took most of the time
+    weak_formulation  - time limit hit with the gap barely below the root relaxation gap
+    search            - time limit hit while branching was closing the gap (seed / luck
+                        dependent: another seed or more time usually helps)
+
+Records are returned in the response's solver_telemetry field when requested and appended
+to a rotating JSON-lines file (SOLVER_TELEMETRY_LOG) for offline analysis.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, List, Optional
+
+from gurobipy import GRB
+
+from config import logger, SOLVER_TELEMETRY_LOG, SOLVER_TELEMETRY_LOG_MAX_MB, SOLVER_TELEMETRY_LOG_BACKUPS
+
+STATUS_NAMES = {getattr(GRB.Status, name): name.lower() for name in dir(GRB.Status) if name.isupper()}
+
+# Share of the runtime spent in presolve + root relaxation above which the model size is the bottleneck
+MODEL_SIZE_SHARE = 0.5
+# Final gap / root gap above which branching is considered to have achieved little
+WEAK_BOUND_SHARE = 0.5
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+PRESOLVE_REMOVED = re.compile(r"Presolve removed (\d+) rows and (\d+) columns")
+PRESOLVE_TIME = re.compile(rf"Presolve time: ({_NUMBER})s")
+PRESOLVED = re.compile(r"Presolved: (\d+) rows, (\d+) columns, (\d+) nonzeros")
+ROOT_RELAXATION = re.compile(
+    rf"Root relaxation: objective ({_NUMBER}), (\d+) iterations, ({_NUMBER}) seconds(?: \(({_NUMBER}) work units\))?"
+)
+HEURISTIC_SOLUTION = re.compile(rf"Found heuristic solution: objective ({_NUMBER})")
+EXPLORED = re.compile(rf"Explored (\d+) nodes \((\d+) simplex iterations\) in ({_NUMBER}) seconds")
+CUT = re.compile(r"^\s+([A-Za-z][\w -]*): (\d+)$")
+
+_rolling_log: Optional[logging.Logger] = None
+
+
+def _node_line_incumbent(line: str) -> Optional[Dict[str, Any]]:
+    """Incumbent from a node log line marked H (heuristic) or * (branching), e.g.
+    'H    0     0                    5335.0000000 6362.60399  19.3%     -    0s'."""
+    tokens = line[1:].split()
+    gap_index = next((i for i, token in enumerate(tokens) if token.endswith("%")), None)
+    if gap_index is None or gap_index < 2 or not tokens[-1].endswith("s"):
+        return None
+    try:
+        return {
+            "objective": float(tokens[gap_index - 2]),
+            "time_s": float(tokens[-1][:-1]),
+            "source": "heuristic" if line.startswith("H") else "branching",
+        }
+    except ValueError:
+        return None
+
+
+def parse_gurobi_log(log: str) -> Dict[str, Any]:
+    """Presolve, root relaxation, incumbent timeline, cuts and search totals of one solve's log."""
+    parsed: Dict[str, Any] = {"presolve": {}, "root_relaxation": None, "incumbents": [], "cuts": {}}
+    in_cuts = False
+    for line in log.splitlines():
+        if in_cuts:
+            match = CUT.match(line)
+            if match:
+                parsed["cuts"][match.group(1)] = int(match.group(2))
+                continue
+            in_cuts = False
+        if line.startswith("Cutting planes:"):
+            in_cuts = True
+        elif match := PRESOLVE_REMOVED.search(line):
+            parsed["presolve"].update(removed_rows=int(match.group(1)), removed_columns=int(match.group(2)))
+        elif match := PRESOLVE_TIME.search(line):
+            parsed["presolve"]["time_s"] = float(match.group(1))
+        elif match := PRESOLVED.search(line):
+            parsed["presolve"].update(rows=int(match.group(1)), columns=int(match.group(2)), nonzeros=int(match.group(3)))
+        elif match := ROOT_RELAXATION.search(line):
+            parsed["root_relaxation"] = {
+                "objective": float(match.group(1)),
+                "iterations": int(match.group(2)),
+                "time_s": float(match.group(3)),
+                "work": float(match.group(4)) if match.group(4) else None,
+            }
+        elif match := HEURISTIC_SOLUTION.search(line):
+            # Found before the node log starts: at the end of presolve at the latest
+            parsed["incumbents"].append({
+                "objective": float(match.group(1)),
+                "time_s": parsed["presolve"].get("time_s", 0.0),
+                "source": "heuristic",
+            })
+        elif line[:1] in ("H", "*") and (incumbent := _node_line_incumbent(line)):
+            parsed["incumbents"].append(incumbent)
+        elif match := EXPLORED.search(line):
+            parsed["explored_nodes"] = int(match.group(1))
+            parsed["simplex_iterations"] = int(match.group(2))
+    return parsed
+
+
+def _bottleneck(record: Dict[str, Any]) -> str:
+    """Coarse reason for where the solve's time went (see module docstring)."""
+    status = record["status"]
+    if status in ("infeasible", "inf_or_unbd"):
+        return "infeasible"
+    runtime = record["runtime_s"]
+    root = record["root_relaxation"] or {}
+    setup_s = record["presolve"].get("time_s", 0.0) + root.get("time_s", 0.0)
+    if runtime >= 1.0 and setup_s >= MODEL_SIZE_SHARE * runtime:
+        return "model_size"
+    if not record["time_limit_hit"]:
+        return "solved"
+    objective, gap = record.get("objective"), record.get("gap")
+    if root.get("objective") is not None and objective is not None and gap is not None:
+        root_gap = abs(root["objective"] - objective) / max(abs(objective), 1e-10)
+        if root_gap > 0 and gap >= WEAK_BOUND_SHARE * root_gap:
+            return "weak_formulation"
+    return "search"
+
+
+def collect_telemetry(model, log: str, phase: str) -> Dict[str, Any]:
+    """Telemetry record of the solve that just finished on model, from its log slice and attributes."""
+    record: Dict[str, Any] = {
+        "phase": phase,
+        "status": STATUS_NAMES.get(model.Status, str(model.Status)),
+        "time_limit_hit": model.Status == GRB.TIME_LIMIT,
+        "time_limit_s": model.Params.TimeLimit,
+        "runtime_s": round(model.Runtime, 3),
+        "work": round(model.Work, 3),
+        "nodes": int(model.NodeCount),
+        "simplex_iterations": int(model.IterCount),
+        "solutions": model.SolCount,
+        "model": {"vars": model.NumVars, "constrs": model.NumConstrs, "nonzeros": model.NumNZs},
+    }
+    if model.SolCount > 0:
+        record.update(
+            objective=round(model.ObjVal, 6),
+            bound=round(model.ObjBound, 6),
+            gap=round(model.MIPGap, 6),
+        )
+    parsed = parse_gurobi_log(log)
+    parsed.pop("simplex_iterations", None)  # IterCount is exact
+    record.update(parsed)
+    record["bottleneck"] = _bottleneck(record)
+    return record
+
+
+def _get_rolling_log() -> Optional[logging.Logger]:
+    """JSON-lines logger rotating at SOLVER_TELEMETRY_LOG_MAX_MB (None when SOLVER_TELEMETRY_LOG is empty)."""
+    global _rolling_log
+    if _rolling_log is None and SOLVER_TELEMETRY_LOG:
+        directory = os.path.dirname(SOLVER_TELEMETRY_LOG)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            SOLVER_TELEMETRY_LOG,
+            maxBytes=int(SOLVER_TELEMETRY_LOG_MAX_MB * 1024 * 1024),
+            backupCount=SOLVER_TELEMETRY_LOG_BACKUPS,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _rolling_log = logging.getLogger("scheduler-api.solver-telemetry")
+        _rolling_log.addHandler(handler)
+        _rolling_log.setLevel(logging.INFO)
+        _rolling_log.propagate = False
+    return _rolling_log
+
+
+def write_rolling_log(records: List[Dict[str, Any]], context: Dict[str, Any]):
+    """Append one JSON line per solve, with the request context (size, engine, mode) attached."""
+    if not records:
+        return
+    try:
+        rolling_log = _get_rolling_log()
+        if rolling_log is None:
+            return
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        for record in records:
+            rolling_log.info(json.dumps({"timestamp": timestamp, "pid": os.getpid(), **context, **record}, default=str))
+    except OSError as e:
+        logger.warning(f"Solver telemetry log not written: {str(e)}")
@@ -0,0 +1 @@
+"""Maintenance tools for the scheduler API (see tools/replay_capture.py)."""
@@ -0,0 +1,199 @@
+"""
+Replay slow requests captured by services.slow_capture.
+
+Usage (from scheduler-api/):
+    python -m tools.replay_capture --list
+    python -m tools.replay_capture /tmp/scheduler-captures/20250303-101500-schedule-1a2b3c
+    python -m tools.replay_capture CASE --repeat 3 --deadline-ms 60000 --optimizer highs
+    python -m tools.replay_capture CASE --model-only
+
+By default the captured inputs run through the full optimizer again (GurobiScheduleOptimizer
+or RouteOptimizerService) and every stage is timed as in the Server-Timing header. With
+--model-only the captured model files are solved directly with their captured parameters,
+which isolates the solver from model building and does not need the inputs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Replays run offline: config only needs placeholder Supabase credentials, nothing connects
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "replay")
+
+from config import logger, SLOW_CAPTURE_DIR
+
+
+def load_case(case_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(case_dir, "case.json")) as f:
+        return json.load(f)
+
+
+def schedule_arguments(inputs: Dict[str, Any], deadline_ms: Optional[int], optimizer: Optional[str]) -> Dict[str, Any]:
+    """Keyword arguments for GurobiScheduleOptimizer.optimize_schedule from captured inputs."""
+    from models import EmployeePreference
+    from services.solve_budget import SolveBudget
+
+    arguments = dict(inputs)
+    arguments["start_date"] = datetime.fromisoformat(inputs["start_date"])
+    arguments["end_date"] = datetime.fromisoformat(inputs["end_date"])
+    arguments["employee_preferences"] = [EmployeePreference(**preference) for preference in inputs.get("employee_preferences") or []]
+    budget = dict(inputs.get("solve_budget") or {})
+    if deadline_ms is not None:
+        budget["deadline_ms"] = deadline_ms
+    arguments["solve_budget"] = SolveBudget(**budget)
+    if optimizer:
+        arguments["optimizer"] = optimizer
+    return arguments
+
+
+def replay_inputs(case: Dict[str, Any], deadline_ms: Optional[int], optimizer: Optional[str]) -> Dict[str, Any]:
+    """
+    Run a case's inputs through its optimizer once.
+
+    Returns:
+        Run record: wall time, time breakdown and outcome
+    """
+    from fastapi import HTTPException
+    from services.request_timing import start_request, end_request
+
+    timings, token = start_request()  # Collects the same stages as the request's Server-Timing header
+    started = time.perf_counter()
+    run: Dict[str, Any] = {"error": None}
+    try:
+        if case["kind"] == "schedule":
+            from services.gurobi_env_pool import get_env_pool
+            from services.gurobi_optimizer_service import GurobiScheduleOptimizer
+            get_env_pool().start()
+            result = GurobiScheduleOptimizer().optimize_schedule(**schedule_arguments(case["inputs"], deadline_ms, optimizer))
+            run.update({
+                "optimizer": result.get("optimizer"),
+                "status": result.get("optimization_status") or ("optimal" if result.get("objective_value") is not None else "unknown"),
+                "objective": result.get("objective_value"),
+            })
+        else:
+            from services.route_optimizer_service import RouteOptimizerService
+            result = RouteOptimizerService().optimize_route(**case["inputs"])
+            run.update({
+                "status": "optimal" if result.get("success") else "failed",
+                "objective": result.get("objective_value"),
+                "error": result.get("error"),
+            })
+    except HTTPException as e:
+        run.update({"status": "failed", "error": f"{e.status_code}: {e.detail}"[:500]})
+    finally:
+        end_request(token)
+    run["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    run["timings"] = timings.entries
+    return run
+
+
+def replay_models(case_dir: str, case: Dict[str, Any], deadline_ms: Optional[int]) -> List[Dict[str, Any]]:
+    """Solve every captured model file with its captured parameters."""
+    import gurobipy as gp
+
+    runs = []
+    for captured in case.get("models") or []:
+        run: Dict[str, Any] = {"label": captured["label"], "error": None}
+        started = time.perf_counter()
+        try:
+            with gp.Env(params={"OutputFlag": 0}) as env, gp.read(os.path.join(case_dir, captured["model"]), env) as model:
+                model.read(os.path.join(case_dir, captured["params"]))
+                if deadline_ms is not None:
+                    model.setParam("TimeLimit", deadline_ms / 1000)
+                read_ms = (time.perf_counter() - started) * 1000
+                model.optimize()
+                run.update({
+                    "status": model.Status,
+                    "objective": model.ObjVal if model.SolCount > 0 else None,
+                    "gap": model.MIPGap if model.SolCount > 0 and model.IsMIP else None,
+                    "read_ms": round(read_ms, 1),
+                    "runtime_ms": round(model.Runtime * 1000, 1),
+                })
+        except gp.GurobiError as e:
+            run["error"] = str(e)
+        run["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        runs.append(run)
+    return runs
+
+
+def list_cases(directory: str):
+    if not os.path.isdir(directory):
+        print(f"No captures in {directory}")
+        return
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name, "case.json")
+        if not os.path.isfile(path):
+            continue
+        case = load_case(os.path.join(directory, name))
+        inputs = case.get("inputs") or {}
+        size = (
+            f"{len(inputs.get('employees') or [])} employees" if case["kind"] == "schedule"
+            else f"{len(inputs.get('customers') or [])} customers"
+        )
+        print(f"{name:<40} {case['kind']:<9} {case['elapsed_ms'] / 1000:>7.1f}s  {size:<15} models={len(case.get('models') or [])}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a slow request captured by services.slow_capture")
+    parser.add_argument("case", nargs="?", help="Case directory (see --list)")
+    parser.add_argument("--list", action="store_true", help="List the captured cases")
+    parser.add_argument("--dir", default=SLOW_CAPTURE_DIR, help="Capture directory for --list")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs of the case")
+    parser.add_argument("--deadline-ms", type=int, help="Override the captured solve budget / TimeLimit")
+    parser.add_argument("--optimizer", help="Override the captured engine (schedule cases)")
+    parser.add_argument("--model-only", action="store_true", help="Solve the captured model files instead of the inputs")
+    parser.add_argument("--output", help="Also write the runs as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep the optimizer's INFO logging")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        list_cases(args.dir)
+        return 0
+    if not args.case:
+        parser.error("a case directory (or --list) is required")
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+        logging.getLogger("services.route_optimizer_service").setLevel(logging.WARNING)
+
+    case = load_case(args.case)
+    print(f"{case['case_id']}: {case['kind']}, captured {case['captured_at']} taking {case['elapsed_ms']}ms, outcome {case.get('outcome')}")
+    runs = []
+    for attempt in range(1, args.repeat + 1):
+        if args.model_only:
+            for run in replay_models(args.case, case, args.deadline_ms):
+                runs.append(run)
+                print(
+                    f"#{attempt} {run['label']:<28} status={run.get('status')} obj={run.get('objective')} "
+                    f"gap={run.get('gap')} read={run.get('read_ms')}ms solve={run.get('runtime_ms')}ms"
+                    + (f" error={run['error']}" if run["error"] else ""),
+                    flush=True,
+                )
+            continue
+        if case.get("inputs") is None:
+            print("Case has no captured inputs; use --model-only")
+            return 1
+        run = replay_inputs(case, args.deadline_ms, args.optimizer)
+        runs.append(run)
+        print(
+            f"#{attempt} status={run.get('status')} obj={run.get('objective')} wall={run['wall_ms']}ms"
+            + (f" error={run['error']}" if run["error"] else ""),
+            flush=True,
+        )
+        for name, ms in run["timings"]:
+            print(f"    {name:<52} {ms:>10.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"case_id": case["case_id"], "model_only": args.model_only, "runs": runs}, f, indent=2, default=str)
+        print(f"Runs written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
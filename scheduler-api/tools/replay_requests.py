@@ -0,0 +1,253 @@
+"""
+Replay a recorded request log against the API in-process, as a repeatable load test.
+
+Usage (from scheduler-api/):
+    python -m tools.replay_requests requests.jsonl
+    python -m tools.replay_requests requests.jsonl --concurrency 8 --rate 4 --repeat 5
+    python -m tools.replay_requests requests.jsonl --employees 200 --output replay.json
+
+Every line of the log is one JSON request, either explicit or a bare payload recognized by
+its fields:
+
+    {"method": "POST", "path": "/optimize-schedule", "body": {...}}
+    {"start_date": ..., "end_date": ..., ...}     ScheduleRequest    → POST /optimize-schedule
+    {"customers": [...], ...}                     route request      → POST /api/route/optimize-route
+    {"text": "...", ...}                          constraint text    → POST /api/constraints/parse
+
+Other lines (blank, malformed or unrelated JSON) are skipped and counted. Requests go
+through the whole FastAPI app (middleware, validation, thread pool, optimizers) over
+httpx's ASGI transport, so no server, port or network is involved: Supabase is replaced by
+a stub serving a fixed generated roster (per department named in the log, no published
+shifts, default settings) and the OpenAI constraint parser by an offline stub with a fixed
+latency. The report has throughput, p50/p95/p99 latency and error rate per endpoint.
+
+With --rate, requests start on a fixed schedule (open loop) and latency is measured from
+each request's scheduled start, so time spent waiting for a free --concurrency slot counts;
+without it the log is sent as fast as the concurrency allows.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Tuple
+
+# Replays run offline: config only needs placeholder credentials, nothing connects
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "replay")
+os.environ.setdefault("OPENAI_API_KEY", "replay")  # The parse endpoint rejects requests without a key
+
+import httpx
+import numpy as np
+
+from config import logger
+
+SCHEDULE_PATH = "/optimize-schedule"
+ROUTE_PATH = "/api/route/optimize-route"
+CONSTRAINT_PATH = "/api/constraints/parse"
+# Modules that imported get_supabase_client by name
+SUPABASE_CLIENT_USERS = ("utils", "app", "controllers.optimization_controller", "routes.constraint_routes")
+
+
+def classify(entry: Any) -> Optional[Tuple[str, str, Any]]:
+    """(method, path, body) of a log line's JSON, None when it is not a request."""
+    if not isinstance(entry, dict):
+        return None
+    if isinstance(entry.get("path"), str) and entry["path"].startswith("/"):
+        return entry.get("method", "POST").upper(), entry["path"], entry.get("body")
+    if "start_date" in entry and "end_date" in entry:
+        return "POST", SCHEDULE_PATH, entry
+    if isinstance(entry.get("customers"), list):
+        return "POST", ROUTE_PATH, entry
+    if isinstance(entry.get("text"), str):
+        return "POST", CONSTRAINT_PATH, entry
+    return None
+
+
+def load_log(path: str, limit: Optional[int] = None) -> Tuple[List[Tuple[str, str, Any]], Counter]:
+    """Requests of a JSONL log, plus counts of the skipped lines by reason."""
+    requests, skipped = [], Counter()
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                skipped["blank"] += 1
+                continue
+            try:
+                request = classify(json.loads(line))
+            except json.JSONDecodeError:
+                skipped["invalid_json"] += 1
+                continue
+            if request is None:
+                skipped["not_a_request"] += 1
+                continue
+            requests.append(request)
+            if limit and len(requests) >= limit:
+                break
+    return requests, skipped
+
+
+def build_roster(employees: int, departments: List[Optional[str]]) -> List[Dict[str, Any]]:
+    """The same generated workforce (benchmarks.instances) once per department named in the log."""
+    from benchmarks.instances import InstanceSpec, generate_instance
+
+    workforce = generate_instance(InstanceSpec(employees, 7, seed=0))["employees"]
+    roster = []
+    for department in sorted({department or "General" for department in departments}):
+        for employee in workforce:
+            roster.append({**employee, "id": f"{department}-{employee['id']}", "department": department})
+    return roster
+
+
+class StubQuery:
+    """Supabase query builder that ignores filters and returns the table's fixed rows."""
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __getattr__(self, name):
+        # select / eq / gte / lt / limit / order / single / ...: chainable no-ops
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.data)
+
+
+class StubSupabase:
+    """Supabase client serving a fixed roster, default settings and no published shifts."""
+
+    def __init__(self, roster: List[Dict[str, Any]]):
+        self.tables = {"employees": roster, "schedule_settings": {}, "shifts": []}
+
+    def table(self, name: str) -> StubQuery:
+        return StubQuery(self.tables.get(name, []))
+
+
+def install_stubs(roster: List[Dict[str, Any]], openai_latency_ms: float):
+    """Point every Supabase client lookup at the stub and replace the OpenAI constraint parser."""
+    client = StubSupabase(roster)
+    for module_name in SUPABASE_CLIENT_USERS:
+        setattr(importlib.import_module(module_name), "get_supabase_client", lambda: client)
+
+    def parse_offline(user_input: str, employees: List[Dict[str, Any]], context_date: Optional[str] = None):
+        time.sleep(openai_latency_ms / 1000)  # The real call blocks the same way
+        return {"success": False, "constraint": None, "message": "Offline replay: constraint not parsed", "reason": "replay"}
+
+    importlib.import_module("routes.constraint_routes").parse_natural_language_constraint = parse_offline
+
+
+async def replay(app, requests: List[Tuple[str, str, Any]], concurrency: int, rate: Optional[float]) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Send the requests through the app.
+
+    Returns:
+        One result (endpoint, status, latency) per request and the wall time in seconds
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[Dict[str, Any]] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=None) as client:
+        started = time.perf_counter()
+
+        async def send(i: int, method: str, path: str, body: Any):
+            scheduled = started + i / rate if rate else None
+            if scheduled is not None:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            async with semaphore:
+                sent = scheduled if scheduled is not None else time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status, error = response.status_code, None
+                except Exception as e:
+                    status, error = None, f"{type(e).__name__}: {str(e)}"[:200]
+                results.append({
+                    "endpoint": f"{method} {path}",
+                    "status": status,
+                    "error": error,
+                    "latency_ms": (time.perf_counter() - sent) * 1000,
+                })
+
+        await asyncio.gather(*(send(i, *request) for i, request in enumerate(requests)))
+        return results, time.perf_counter() - started
+
+
+def summarize(results: List[Dict[str, Any]], wall_s: float) -> Dict[str, Dict[str, Any]]:
+    """Throughput, latency percentiles and error rate per endpoint and over all requests."""
+    groups = defaultdict(list)
+    for result in results:
+        groups[result["endpoint"]].append(result)
+    groups["total"] = results
+    summary = {}
+    for endpoint, group in groups.items():
+        latencies = np.array([result["latency_ms"] for result in group])
+        errors = sum(1 for result in group if result["status"] is None or result["status"] >= 400)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary[endpoint] = {
+            "requests": len(group),
+            "throughput_rps": round(len(group) / wall_s, 2) if wall_s > 0 else None,
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+            "max_ms": round(float(latencies.max()), 1),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4),
+            "statuses": dict(Counter(str(result["status"] or result["error"]) for result in group)),
+        }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a JSONL request log against the API in-process")
+    parser.add_argument("log", help="JSONL request log")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at most")
+    parser.add_argument("--rate", type=float, help="Requests started per second (default: as fast as concurrency allows)")
+    parser.add_argument("--repeat", type=int, default=1, help="Send the log this many times")
+    parser.add_argument("--limit", type=int, help="Use only the first N requests of the log")
+    parser.add_argument("--employees", type=int, default=50, help="Size of the stub roster per department")
+    parser.add_argument("--openai-latency-ms", type=float, default=0.0, help="Latency of the offline constraint parser")
+    parser.add_argument("--output", help="Also write the summary and every result as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep the API's INFO logging")
+    args = parser.parse_args(argv)
+
+    requests, skipped = load_log(args.log, args.limit)
+    print(f"{len(requests)} requests in {args.log}" + (f", skipped {dict(skipped)}" if skipped else ""))
+    if not requests:
+        return 1
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+        logging.getLogger("services.route_optimizer_service").setLevel(logging.WARNING)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    from app import app
+    from services.gurobi_env_pool import get_env_pool
+
+    departments = [body.get("department") for _, path, body in requests if path == SCHEDULE_PATH and isinstance(body, dict)]
+    install_stubs(build_roster(args.employees, departments), args.openai_latency_ms)
+    get_env_pool().start()  # The ASGI transport does not run startup events
+    try:
+        results, wall_s = asyncio.run(replay(app, requests * args.repeat, args.concurrency, args.rate))
+    finally:
+        get_env_pool().close()
+
+    summary = summarize(results, wall_s)
+    print(f"{len(results)} requests in {wall_s:.2f}s (concurrency {args.concurrency}, rate {args.rate or 'unlimited'})")
+    print(f"{'endpoint':<36} {'n':>5} {'rps':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'errors':>7}")
+    for endpoint, row in summary.items():
+        print(
+            f"{endpoint:<36} {row['requests']:>5} {row['throughput_rps']:>7} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+            f"{row['p99_ms']:>9} {row['max_ms']:>9} {row['error_rate']:>7.1%}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": vars(args), "wall_s": round(wall_s, 3), "skipped": skipped, "summary": summary, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
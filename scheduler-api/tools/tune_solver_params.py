@@ -0,0 +1,200 @@
+"""
+Tune Gurobi parameters per instance size class and write them for GurobiScheduleOptimizer.
+
+Usage (from scheduler-api/):
+    python -m tools.tune_solver_params --captures /tmp/scheduler-captures
+    python -m tools.tune_solver_params --generate 50x14,100x31,250x31 --seeds 3 --trials 24
+    python -m tools.tune_solver_params --generate 100x14 --method grid --deadline-ms 20000
+
+The corpus is made of stored schedule instances (slow-request captures, see
+services.slow_capture) and/or generated ones (benchmarks.instances), bucketed by size class
+(services.solver_params.size_class). For every class, candidate parameter sets over
+MIPFocus, Heuristics, Presolve, Cuts and Symmetry (a random sample with --method random,
+every combination with --method grid) run every instance of the class through
+GurobiScheduleOptimizer. Gurobi's defaults always run first as the reference.
+
+A run is scored from the main solve's telemetry: its runtime when it finished, otherwise
+its time limit x (1 + MIP gap), so unfinished runs rank by how far they got. A candidate's
+score is the geometric mean over the class's instances (and --repeat seeds). The best set
+is written only if it beats the defaults by --min-improvement; classes of this run replace
+their entries in the output file, other classes are kept.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Tuning runs offline: config only needs placeholder Supabase credentials, nothing connects
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "tuning")
+
+from config import logger, SLOW_CAPTURE_DIR, SOLVER_PARAMS_FILE
+from services.solver_params import TUNABLE_PARAMS, size_class
+
+
+def load_corpus(captures: Optional[str], sizes: List[tuple], seeds: int) -> List[Dict[str, Any]]:
+    """Instances as {name, size_class, arguments} (arguments for GurobiScheduleOptimizer.optimize_schedule)."""
+    from benchmarks.instances import InstanceSpec, generate_instance
+    from tools.replay_capture import load_case, schedule_arguments
+
+    corpus = []
+    if captures and os.path.isdir(captures):
+        for name in sorted(os.listdir(captures)):
+            if not os.path.isfile(os.path.join(captures, name, "case.json")):
+                continue
+            case = load_case(os.path.join(captures, name))
+            if case["kind"] != "schedule" or not case.get("inputs"):
+                continue
+            corpus.append({"name": name, "arguments": schedule_arguments(case["inputs"], None, "gurobi")})
+    for employees, days in sizes:
+        for seed in range(seeds):
+            spec = InstanceSpec(employees, days, seed)
+            corpus.append({"name": spec.name, "arguments": generate_instance(spec)})
+    for instance in corpus:
+        arguments = instance["arguments"]
+        days = (arguments["end_date"] - arguments["start_date"]).days + 1
+        instance["size_class"] = size_class(len(arguments["employees"]), days, arguments.get("min_staff_per_shift") or 1)
+    return corpus
+
+
+def candidates(method: str, trials: int, seed: int) -> List[Dict[str, Any]]:
+    """Parameter sets to try after the defaults: every combination, or a random sample of them."""
+    names = list(TUNABLE_PARAMS)
+    grid = [dict(zip(names, values)) for values in itertools.product(*TUNABLE_PARAMS.values())]
+    if method == "grid":
+        return grid
+    return random.Random(seed).sample(grid, min(trials, len(grid)))
+
+
+def score_run(instance: Dict[str, Any], params: Dict[str, Any], deadline_ms: int, random_seed: int) -> Optional[float]:
+    """Score of one solve (lower is better); None when the main Gurobi solve did not run."""
+    from fastapi import HTTPException
+    from services.gurobi_optimizer_service import GurobiScheduleOptimizer
+    from services.solve_budget import SolveBudget
+
+    schedule_optimizer = GurobiScheduleOptimizer()
+    arguments = {
+        **instance["arguments"],
+        "random_seed": random_seed,
+        "optimizer": "gurobi",
+        "solver_params": params,
+        "solve_budget": SolveBudget(deadline_ms=deadline_ms),
+    }
+    try:
+        schedule_optimizer.optimize_schedule(**arguments)
+    except HTTPException:
+        pass
+    solve = next((record for record in schedule_optimizer.solve_log.telemetry if record["phase"] == "solve"), None)
+    if solve is None or solve["status"] in ("infeasible", "inf_or_unbd"):
+        return None
+    if not solve["time_limit_hit"] and solve["status"] != "node_limit":
+        return max(solve["runtime_s"], 0.001)
+    gap = solve.get("gap")
+    return solve["time_limit_s"] * (1 + (min(gap, 1.0) if gap is not None else 1.0))
+
+
+def evaluate(instances: List[Dict[str, Any]], params: Dict[str, Any], deadline_ms: int, repeat: int) -> Optional[float]:
+    """Geometric mean score of a parameter set over instances and seeds (None when nothing could be scored)."""
+    scores = []
+    for instance in instances:
+        base_seed = instance["arguments"].get("random_seed") or 1
+        for r in range(repeat):
+            score = score_run(instance, params, deadline_ms, base_seed + r)
+            if score is not None:
+                scores.append(score)
+    if not scores:
+        return None
+    return math.exp(sum(math.log(score) for score in scores) / len(scores))
+
+
+def tune_class(name: str, instances: List[Dict[str, Any]], sets: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Search one size class; returns its entry for the parameter file."""
+    started = time.perf_counter()
+    default_score = evaluate(instances, {}, args.deadline_ms, args.repeat)
+    print(f"{name:<16} {len(instances)} instances  defaults          score={default_score}", flush=True)
+    if default_score is None:
+        return {"params": {}, "note": "no instance produced a Gurobi solve (infeasible or over the license size limit)"}
+    best_params, best_score = {}, default_score
+    for params in sets:
+        score = evaluate(instances, params, args.deadline_ms, args.repeat)
+        marker = ""
+        if score is not None and score < best_score:
+            best_params, best_score = params, score
+            marker = " *"
+        print(f"{name:<16} {json.dumps(params):<80} score={score}{marker}", flush=True)
+    improvement = 1 - best_score / default_score
+    if improvement < args.min_improvement:
+        best_params = {}
+    return {
+        "params": best_params,
+        "score": round(best_score, 4),
+        "default_score": round(default_score, 4),
+        "improvement": round(improvement, 4),
+        "instances": [instance["name"] for instance in instances],
+        "candidates": len(sets) + 1,
+        "tuning_s": round(time.perf_counter() - started, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from benchmarks.run import parse_sizes
+
+    parser = argparse.ArgumentParser(description="Tune Gurobi parameters per instance size class")
+    parser.add_argument("--captures", nargs="?", const=SLOW_CAPTURE_DIR, help="Use the schedule cases of this capture directory")
+    parser.add_argument("--generate", type=parse_sizes, default=[], help="Generated instance sizes, e.g. 50x14,100x31")
+    parser.add_argument("--seeds", type=int, default=2, help="Generated instances per size")
+    parser.add_argument("--method", choices=("random", "grid"), default="random", help="Search strategy")
+    parser.add_argument("--trials", type=int, default=16, help="Parameter sets per class with --method random")
+    parser.add_argument("--repeat", type=int, default=1, help="Solver seeds per instance")
+    parser.add_argument("--deadline-ms", type=int, default=30000, help="Solve budget per run")
+    parser.add_argument("--min-improvement", type=float, default=0.05, help="Required relative gain over the defaults")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random search")
+    parser.add_argument("--output", default=SOLVER_PARAMS_FILE, help="Parameter file to update")
+    parser.add_argument("--verbose", action="store_true", help="Keep the optimizer's INFO logging")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+    from services.gurobi_env_pool import get_env_pool
+    get_env_pool().start()
+
+    corpus = load_corpus(args.captures, args.generate, args.seeds)
+    if not corpus:
+        parser.error("no instances: pass --captures and/or --generate")
+    classes = defaultdict(list)
+    for instance in corpus:
+        classes[instance["size_class"]].append(instance)
+    sets = candidates(args.method, args.trials, args.seed)
+    print(f"{len(corpus)} instances in {len(classes)} size classes, {len(sets) + 1} parameter sets each")
+
+    tuned = {name: tune_class(name, instances, sets, args) for name, instances in sorted(classes.items())}
+
+    existing = {}
+    if os.path.isfile(args.output):
+        with open(args.output) as f:
+            existing = json.load(f).get("classes", {})
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {"method": args.method, "deadline_ms": args.deadline_ms, "repeat": args.repeat, "min_improvement": args.min_improvement},
+        "classes": {**existing, **tuned},
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, entry in tuned.items():
+        print(f"{name:<16} → {entry['params'] or 'Gurobi defaults'}" + (f" ({entry['improvement']:.0%} better)" if entry["params"] else ""))
+    print(f"Parameters written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,25 @@
 
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 from supabase import create_client, Client
 from fastapi import HTTPException
-from config import SUPABASE_URL, SUPABASE_KEY, logger
+from config import SUPABASE_URL, SUPABASE_KEY, ADMIN_TOKEN, logger
 
 def get_supabase_client() -> Client:
     """Create and return a Supabase client instance"""
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether a request's X-Admin-Token matches ADMIN_TOKEN (always False while it is unset)"""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
 def fetch_employees(supabase: Client, department: Optional[str] = None):
     """Fetch employees from Supabase"""
+    from services.metrics import external_call  # services imports utils, so not at module level
     try:
-        employees_response = supabase.table("employees").select("*").execute()
+        with external_call("supabase", "fetch_employees"):
+            employees_response = supabase.table("employees").select("*").execute()
         employees = employees_response.data
         logger.info(f"Retrieved {len(employees)} employees from database")
         
@@ -28,8 +35,10 @@ def fetch_employees(supabase: Client, department: Optional[str] = None):
 
 def fetch_settings(supabase: Client, department: str = "General"):
     """Fetch schedule settings from Supabase"""
+    from services.metrics import external_call  # services imports utils, so not at module level
     try:
-        settings_response = supabase.table("schedule_settings").select("*").eq("department", department).single().execute()
+        with external_call("supabase", "fetch_settings"):
+            settings_response = supabase.table("schedule_settings").select("*").eq("department", department).single().execute()
         settings = settings_response.data
         logger.info("Retrieved settings from database")
         return settings
@@ -37,6 +46,30 @@ def fetch_settings(supabase: Client, department: str = "General"):
         logger.warning(f"Error fetching settings, using defaults: {str(e)}")
         return {}  # Return empty dict to use defaults
 
+def fetch_published_shifts(supabase: Client, start_date: datetime, end_date: datetime, department: Optional[str] = None):
+    """Fetch published shifts in the scheduling period from Supabase (used as warm start)"""
+    from services.metrics import external_call  # services imports utils, so not at module level
+    try:
+        with external_call("supabase", "fetch_published_shifts"):
+            shifts_response = (
+                supabase.table("shifts")
+                .select("employee_id, start_time, shift_type, department")
+                .eq("is_published", True)
+                .gte("start_time", start_date.strftime('%Y-%m-%d'))
+                .lt("start_time", (end_date + timedelta(days=1)).strftime('%Y-%m-%d'))
+                .execute()
+            )
+        shifts = shifts_response.data or []
+
+        if department:
+            shifts = [s for s in shifts if s.get('department') == department]
+
+        logger.info(f"Retrieved {len(shifts)} published shifts for warm start")
+        return shifts
+    except Exception as e:
+        logger.warning(f"Error fetching published shifts, solving without warm start: {str(e)}")
+        return []
+
 def create_date_list(start_date: datetime, end_date: datetime):
     """Create list of dates between start_date and end_date, inclusive"""
     # Ensure we work with date objects only to avoid time zone issues